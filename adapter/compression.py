@@ -0,0 +1,119 @@
+"""
+Configuración de la compresión permessage-deflate del adaptador WebSocket
+y medición de su relación de compresión frente al coste de CPU.
+"""
+
+import time
+import asyncio
+
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
+from websockets.frames import DATA_OPCODES
+
+# Valores predeterminados: ventana y memoria reducidas (mensajes cortos y repetitivos)
+DEFAULT_WINDOW_BITS = 12
+DEFAULT_MEM_LEVEL = 5
+DEFAULT_COMPRESSION_LEVEL = 6
+
+class CompressionStats:
+    """Acumula bytes y tiempo de CPU de la compresión y descompresión de mensajes."""
+    
+    def __init__(self):
+        """Inicializa los contadores a cero."""
+        self.reset()
+    
+    def reset(self):
+        """Reinicia los contadores."""
+        self.out_messages = 0
+        self.out_raw_bytes = 0
+        self.out_wire_bytes = 0
+        self.out_cpu_ns = 0
+        self.in_messages = 0
+        self.in_wire_bytes = 0
+        self.in_raw_bytes = 0
+        self.in_cpu_ns = 0
+    
+    def wrap_encode(self, encode):
+        """Envuelve el método encode de la extensión para medir los mensajes salientes."""
+        def measured_encode(frame):
+            start = time.perf_counter_ns()
+            encoded = encode(frame)
+            elapsed = time.perf_counter_ns() - start
+            if frame.opcode in DATA_OPCODES:
+                self.out_messages += 1
+                self.out_raw_bytes += len(frame.data)
+                self.out_wire_bytes += len(encoded.data)
+                self.out_cpu_ns += elapsed
+            return encoded
+        return measured_encode
+    
+    def wrap_decode(self, decode):
+        """Envuelve el método decode de la extensión para medir los mensajes entrantes."""
+        def measured_decode(frame, **kwargs):
+            start = time.perf_counter_ns()
+            decoded = decode(frame, **kwargs)
+            elapsed = time.perf_counter_ns() - start
+            if frame.opcode in DATA_OPCODES:
+                self.in_messages += 1
+                self.in_wire_bytes += len(frame.data)
+                self.in_raw_bytes += len(decoded.data)
+                self.in_cpu_ns += elapsed
+            return decoded
+        return measured_decode
+    
+    def summary(self):
+        """Devuelve un resumen legible de la relación de compresión y el coste de CPU."""
+        def ratio(wire, raw):
+            return wire / raw if raw else 1.0
+        
+        def per_message_us(cpu_ns, messages):
+            return cpu_ns / messages / 1000 if messages else 0.0
+        
+        return (
+            f"salida: {self.out_messages} msgs, {self.out_raw_bytes} -> {self.out_wire_bytes} bytes "
+            f"(ratio {ratio(self.out_wire_bytes, self.out_raw_bytes):.2f}, "
+            f"{per_message_us(self.out_cpu_ns, self.out_messages):.1f} us/msg) | "
+            f"entrada: {self.in_messages} msgs, {self.in_wire_bytes} -> {self.in_raw_bytes} bytes "
+            f"(ratio {ratio(self.in_wire_bytes, self.in_raw_bytes):.2f}, "
+            f"{per_message_us(self.in_cpu_ns, self.in_messages):.1f} us/msg)"
+        )
+    
+    async def report_periodically(self, interval):
+        """Imprime el resumen cada `interval` segundos."""
+        while True:
+            await asyncio.sleep(interval)
+            print(f"Compresión WebSocket: {self.summary()}")
+
+class MeasuredPerMessageDeflateFactory(ServerPerMessageDeflateFactory):
+    """Fábrica permessage-deflate que instrumenta cada extensión negociada."""
+    
+    def __init__(self, stats, **kwargs):
+        """Configura la fábrica con las estadísticas donde acumular las mediciones."""
+        super().__init__(**kwargs)
+        self.stats = stats
+    
+    def process_request_params(self, params, accepted_extensions):
+        """Negocia la extensión y envuelve su codificación y decodificación."""
+        response_params, extension = super().process_request_params(params, accepted_extensions)
+        extension.encode = self.stats.wrap_encode(extension.encode)
+        extension.decode = self.stats.wrap_decode(extension.decode)
+        return response_params, extension
+
+def build_extensions(window_bits=DEFAULT_WINDOW_BITS, mem_level=DEFAULT_MEM_LEVEL,
+                     compression_level=DEFAULT_COMPRESSION_LEVEL, stats=None):
+    """
+    Crea la lista de extensiones de servidor con permessage-deflate ajustado.
+    
+    Args:
+        window_bits: Tamaño de la ventana LZ77 (9-15) en ambos sentidos
+        mem_level: Memoria de zlib para el compresor (1-9)
+        compression_level: Nivel de compresión de zlib (0-9)
+        stats: CompressionStats para medir la compresión, o None
+    """
+    settings = {
+        "server_max_window_bits": window_bits,
+        "client_max_window_bits": window_bits,
+        "compress_settings": {"memLevel": mem_level, "level": compression_level},
+    }
+    if stats is not None:
+        return [MeasuredPerMessageDeflateFactory(stats, **settings)]
+    return [ServerPerMessageDeflateFactory(**settings)]
@@ -10,6 +10,12 @@ import threading
 import json
 import sys
 import os
+import argparse
+
+from compression import (
+    CompressionStats, build_extensions,
+    DEFAULT_WINDOW_BITS, DEFAULT_MEM_LEVEL, DEFAULT_COMPRESSION_LEVEL
+)
 
 # Modificar ruta para encontrar el módulo protocol
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
@@ -30,12 +36,22 @@ class WebSocketToTCPBridge:
     Mantiene una conexión TCP por cada conexión WebSocket.
     """
     
-    def __init__(self, ws_port=8765, tcp_host='localhost', tcp_port=9000):
+    def __init__(self, ws_port=8765, tcp_host='localhost', tcp_port=9000, compression='deflate',
+                 window_bits=DEFAULT_WINDOW_BITS, mem_level=DEFAULT_MEM_LEVEL,
+                 compression_level=DEFAULT_COMPRESSION_LEVEL, stats_interval=0):
         """Inicializa el puente WebSocket a TCP."""
         self.ws_port = ws_port
         self.tcp_host = tcp_host
         self.tcp_port = tcp_port
         
+        # Compresión permessage-deflate ('deflate' o 'none') y su medición periódica
+        self.compression = compression
+        self.window_bits = window_bits
+        self.mem_level = mem_level
+        self.compression_level = compression_level
+        self.stats_interval = stats_interval
+        self.compression_stats = CompressionStats() if stats_interval > 0 else None
+        
         # Mapeo de conexiones WebSocket a sockets TCP
         self.connections = {}
         
@@ -52,9 +68,21 @@ class WebSocketToTCPBridge:
             self.main_loop = asyncio.get_running_loop()
             
             print(f"DEBUG: Intentando iniciar servidor WebSocket en 0.0.0.0:{self.ws_port}")
-            server = await websockets.serve(self.handle_websocket, "0.0.0.0", self.ws_port)
+            if self.compression == 'deflate':
+                extensions = build_extensions(self.window_bits, self.mem_level,
+                                              self.compression_level, self.compression_stats)
+            else:
+                extensions = None
+            server = await websockets.serve(self.handle_websocket, "0.0.0.0", self.ws_port,
+                                            compression=None, extensions=extensions)
             print(f"Servidor WebSocket iniciado en el puerto {self.ws_port}")
             print(f"Conectando con servidor TCP en {self.tcp_host}:{self.tcp_port}")
+            if extensions:
+                print(f"Compresión permessage-deflate: ventana {self.window_bits} bits, "
+                      f"memLevel {self.mem_level}, nivel {self.compression_level}")
+            
+            if self.compression_stats:
+                asyncio.create_task(self.compression_stats.report_periodically(self.stats_interval))
             
             # Mantener el servidor en ejecución
             await server.wait_closed()
@@ -75,6 +103,8 @@ class WebSocketToTCPBridge:
             # Conectar al servidor TCP
             print(f"DEBUG: Intentando conectar a servidor TCP {self.tcp_host}:{self.tcp_port}")
             tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Mensajes cortos e interactivos: sin esperar al ACK retardado (algoritmo de Nagle)
+            tcp_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             tcp_socket.connect((self.tcp_host, self.tcp_port))
             print(f"DEBUG: Conexión TCP establecida correctamente")
             
@@ -204,13 +234,21 @@ class WebSocketToTCPBridge:
                 pass
 
 if __name__ == "__main__":
-    # Obtener puertos de los argumentos o usar valores por defecto
-    ws_port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
-    tcp_host = sys.argv[2] if len(sys.argv) > 2 else 'localhost'
-    tcp_port = int(sys.argv[3]) if len(sys.argv) > 3 else 9000
+    parser = argparse.ArgumentParser(description='Adaptador WebSocket a TCP del juego Tic-Tac-Toe')
+    parser.add_argument('ws_port', type=int, nargs='?', default=8765, help='Puerto WebSocket (predeterminado: 8765)')
+    parser.add_argument('tcp_host', nargs='?', default='localhost', help='Host del servidor TCP (predeterminado: localhost)')
+    parser.add_argument('tcp_port', type=int, nargs='?', default=9000, help='Puerto del servidor TCP (predeterminado: 9000)')
+    parser.add_argument('--compression', choices=['deflate', 'none'], default='deflate', help='Compresión de mensajes WebSocket')
+    parser.add_argument('--window-bits', type=int, default=DEFAULT_WINDOW_BITS, help='Ventana de deflate en bits (9-15)')
+    parser.add_argument('--mem-level', type=int, default=DEFAULT_MEM_LEVEL, help='memLevel de zlib (1-9)')
+    parser.add_argument('--compression-level', type=int, default=DEFAULT_COMPRESSION_LEVEL, help='Nivel de compresión de zlib (0-9)')
+    parser.add_argument('--stats-interval', type=float, default=0, help='Segundos entre informes de compresión (0 = desactivado)')
+    args = parser.parse_args()
     
     # Crear e iniciar el puente
-    bridge = WebSocketToTCPBridge(ws_port, tcp_host, tcp_port)
+    bridge = WebSocketToTCPBridge(args.ws_port, args.tcp_host, args.tcp_port, args.compression,
+                                  args.window_bits, args.mem_level, args.compression_level,
+                                  args.stats_interval)
     
     try:
         asyncio.run(bridge.start())
@@ -10,6 +10,11 @@ import webbrowser
 import signal
 import glob
 import shutil
+import socket
+import hashlib
+import threading
+import importlib.util
+import json
 
 try:
     import psutil
@@ -17,6 +22,38 @@ try:
 except ImportError:
     PSUTIL_AVAILABLE = False
 
+# Directorio raíz del proyecto (absoluto, independiente del directorio de trabajo)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Archivo donde se recuerda la última verificación de dependencias exitosa
+DEPS_CACHE = os.path.join(BASE_DIR, '.deps_cache')
+
+def _dependency_fingerprint():
+    """Huella del intérprete y de requirements.txt que invalida la caché de dependencias."""
+    digest = hashlib.sha1(sys.executable.encode('utf-8'))
+    try:
+        with open(os.path.join(BASE_DIR, 'requirements.txt'), 'rb') as f:
+            digest.update(f.read())
+    except OSError:
+        pass
+    return digest.hexdigest()
+
+def dependencies_cached():
+    """Indica si las dependencias ya se verificaron con este intérprete y estos requisitos."""
+    try:
+        with open(DEPS_CACHE, encoding='utf-8') as f:
+            return f.read().strip() == _dependency_fingerprint()
+    except OSError:
+        return False
+
+def save_dependency_cache():
+    """Guarda la huella de la verificación de dependencias exitosa."""
+    try:
+        with open(DEPS_CACHE, 'w', encoding='utf-8') as f:
+            f.write(_dependency_fingerprint())
+    except OSError:
+        pass
+
 def ensure_dependencies():
     """
     Verifica y asegura que todas las dependencias estén instaladas.
@@ -26,18 +63,19 @@ def ensure_dependencies():
     """
     global PSUTIL_AVAILABLE
     
+    # Verificación ya realizada con este intérprete: no volver a comprobar nada
+    if dependencies_cached():
+        return True
+    
     # Verificar si estamos en un entorno virtual
     in_venv = hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix)
     
-    # Verificar si el módulo websockets está disponible
-    try:
-        import websockets
-        websockets_available = True
-    except ImportError:
-        websockets_available = False
+    # Verificar si el módulo websockets está disponible (sin importarlo, es costoso)
+    websockets_available = importlib.util.find_spec('websockets') is not None
     
     # Si ya estamos en un entorno virtual y todas las dependencias están disponibles, no hacemos nada
     if in_venv and PSUTIL_AVAILABLE and websockets_available:
+        save_dependency_cache()
         return True
     
     # Si no estamos en un entorno virtual o faltan dependencias, proceder con la creación/activación
@@ -96,21 +134,28 @@ def ensure_dependencies():
         except ImportError:
             pass
     
+    save_dependency_cache()
     return True
 
-def run_server(tcp_port, wait=False):
-    """Ejecuta el servidor TCP."""
+def run_server(tcp_port, wait=False, admin_socket=None, admin_port=None):
+    """Ejecuta el servidor TCP (con canal de administración solo si se indica)."""
     print(f"Iniciando servidor TCP en el puerto {tcp_port}...")
     
-    # Obtener la ruta del script server.py
-    server_script = os.path.join(os.path.dirname(__file__), 'server', 'server.py')
+    # Obtener la ruta del script server.py (absoluta: el proceso puede haber cambiado de directorio)
+    server_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server', 'server.py')
+    
+    command = [sys.executable, server_script, str(tcp_port)]
+    if admin_socket:
+        command += ['--admin-socket', os.path.abspath(admin_socket)]
+    if admin_port:
+        command += ['--admin-port', str(admin_port)]
     
     # Ejecutar el servidor como un proceso separado
-    server_process = subprocess.Popen([sys.executable, server_script, str(tcp_port)])
+    server_process = subprocess.Popen(command)
     
     if wait:
-        # Esperar un momento para que el servidor se inicie
-        time.sleep(1)
+        # Esperar a que el servidor escuche en su puerto
+        wait_for_port(tcp_port)
     
     return server_process
 
@@ -120,7 +165,7 @@ def run_bridge(ws_port, tcp_host, tcp_port, wait=False):
     print(f"Conectando con servidor TCP en {tcp_host}:{tcp_port}...")
     
     # Obtener la ruta del script de puente
-    bridge_script = os.path.join(os.path.dirname(__file__), 'adapter', 'ws_to_tcp_bridge.py')
+    bridge_script = os.path.join(BASE_DIR, 'adapter', 'ws_to_tcp_bridge.py')
     
     # Ejecutar el puente como un proceso separado
     bridge_process = subprocess.Popen([
@@ -128,28 +173,73 @@ def run_bridge(ws_port, tcp_host, tcp_port, wait=False):
     ])
     
     if wait:
-        # Esperar un momento para que el puente se inicie
-        time.sleep(1)
+        # Esperar a que el puente escuche en su puerto
+        wait_for_port(ws_port)
     
     return bridge_process
 
 def run_http_server(http_port):
-    """Ejecuta un servidor HTTP simple para servir los archivos web."""
+    """Ejecuta el servidor de archivos estáticos para la interfaz web."""
     print(f"Iniciando servidor HTTP en el puerto {http_port}...")
     
-    # Obtener la ruta del directorio web
-    web_dir = os.path.join(os.path.dirname(__file__), 'web')
-    
-    # Cambiar al directorio web
-    os.chdir(web_dir)
+    # Obtener las rutas del servidor estático y del directorio web
+    static_script = os.path.join(BASE_DIR, 'server', 'static_server.py')
+    web_dir = os.path.join(BASE_DIR, 'web')
     
-    # Ejecutar el servidor HTTP como un proceso separado
+    # Ejecutar el servidor HTTP como un proceso separado (sin cambiar de directorio)
     http_process = subprocess.Popen([
-        sys.executable, '-m', 'http.server', str(http_port)
+        sys.executable, static_script, str(http_port), web_dir
     ])
     
     return http_process
 
+def wait_for_port(port, host='localhost', timeout=10.0):
+    """
+    Sonda de disponibilidad: espera hasta que el puerto acepte conexiones.
+    
+    Returns:
+        bool: True si el puerto está escuchando antes del tiempo límite
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.2):
+                return True
+        except OSError:
+            time.sleep(0.02)
+    print(f"El puerto {port} no respondió en {timeout:.0f} s")
+    return False
+
+def run_in_process(tcp_port, ws_port, tcp_host, http_port, admin_socket=None, admin_port=None):
+    """
+    Ejecuta servidor, adaptador y archivos estáticos como hilos de este mismo proceso,
+    evitando arrancar tres intérpretes.
+    """
+    sys.path.insert(0, os.path.join(BASE_DIR, 'server'))
+    sys.path.insert(0, os.path.join(BASE_DIR, 'adapter'))
+    
+    from server import TicTacToeServer, DEFAULT_SNAPSHOT
+    from static_server import StaticServer
+    
+    game_server = TicTacToeServer(port=tcp_port, snapshot_path=DEFAULT_SNAPSHOT,
+                                  admin_port=admin_port, admin_socket=admin_socket)
+    threading.Thread(target=game_server.start, daemon=True).start()
+    
+    def run_bridge_loop():
+        import asyncio
+        from ws_to_tcp_bridge import WebSocketToTCPBridge
+        asyncio.run(WebSocketToTCPBridge(ws_port, tcp_host, tcp_port).start())
+    
+    threading.Thread(target=run_bridge_loop, daemon=True).start()
+    
+    http_server = StaticServer(http_port, os.path.join(BASE_DIR, 'web'))
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    
+    for port in (tcp_port, ws_port, http_port):
+        wait_for_port(port)
+    
+    return game_server
+
 def cleanup_resources(tcp_port, ws_port, http_port, processes=None):
     """
     Limpia recursos, libera puertos y elimina archivos temporales.
@@ -162,14 +252,12 @@ def cleanup_resources(tcp_port, ws_port, http_port, processes=None):
     """
     print("\nLimpiando recursos...")
     
-    # Matar todos los procesos Python
-    try:
-        print("Terminando todos los procesos Python...")
-        subprocess.run(["pkill", "-f", "python"], check=False)
-        # Damos un pequeño tiempo para que los procesos terminen
-        time.sleep(1) 
-    except Exception as e:
-        print(f"Error al terminar procesos Python: {e}")
+    # Terminar el supervisor y los procesos hijos registrados por una ejecución anterior de run.py
+    state = read_supervisor_state()
+    if state.get('supervisor') != os.getpid():
+        terminate_pid(state.get('supervisor'), 'supervisor', state.get('supervisor_identity'))
+    for name, info in state.get('components', {}).items():
+        terminate_pid(info.get('pid'), name, info)
     
     if processes:
         for process in processes:
@@ -244,17 +332,289 @@ def kill_processes_by_port(port):
     except Exception as e:
         print(f"Error al intentar liberar el puerto {port}: {e}")
 
+def process_identity(pid):
+    """Instante de creación y línea de comandos de un proceso, para reconocerlo más tarde."""
+    if not pid or not PSUTIL_AVAILABLE:
+        return {}
+    try:
+        proc = psutil.Process(pid)
+        return {"create_time": proc.create_time(), "cmdline": proc.cmdline()}
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return {}
+
+def is_same_process(proc, identity):
+    """Indica si el proceso es el registrado y no otro que reutiliza su PID (p. ej. tras reiniciar el equipo)."""
+    if not identity or "create_time" not in identity:
+        return False
+    return (abs(proc.create_time() - identity["create_time"]) < 0.01
+            and proc.cmdline() == identity.get("cmdline"))
+
+def terminate_pid(pid, name='', identity=None):
+    """
+    Termina un proceso por PID, primero con SIGTERM y luego SIGKILL, solo si sigue vivo
+    y coincide con la identidad registrada (instante de creación y línea de comandos).
+    """
+    if not pid or not PSUTIL_AVAILABLE:
+        return
+    try:
+        proc = psutil.Process(pid)
+        if not is_same_process(proc, identity):
+            print(f"El PID {pid} ({name}) ya no pertenece a un proceso del juego; no se termina")
+            return
+        print(f"Terminando proceso {pid} ({name or proc.name()})")
+        proc.terminate()
+        try:
+            proc.wait(timeout=3)
+        except psutil.TimeoutExpired:
+            proc.kill()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        pass
+
+# Archivo con los PID de los componentes supervisados (usado por --status y --cleanup)
+STATE_FILE = os.path.join(BASE_DIR, '.run_state.json')
+
+def read_supervisor_state():
+    """Lee el estado publicado por el supervisor en ejecución."""
+    try:
+        with open(STATE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def port_is_listening(pid, port):
+    """Comprueba si el proceso indicado escucha en el puerto."""
+    if PSUTIL_AVAILABLE:
+        try:
+            proc = psutil.Process(pid)
+            get_connections = getattr(proc, 'net_connections', proc.connections)
+            return any(conn.status == psutil.CONN_LISTEN and conn.laddr.port == port
+                       for conn in get_connections(kind='inet'))
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return False
+        except psutil.AccessDenied:
+            pass
+    # Sin psutil (o sin permisos) se usa una sonda de conexión
+    try:
+        with socket.create_connection(('localhost', port), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+class ProcessSupervisor:
+    """
+    Supervisa los procesos hijos de run.py: comprueba que sigan vivos y escuchando
+    en su puerto, y los reinicia con espera exponencial si fallan.
+    """
+    
+    # Espera inicial y máxima entre reinicios (segundos)
+    BACKOFF_INITIAL = 0.5
+    BACKOFF_MAX = 30.0
+    
+    # Tiempo estable tras el cual se reinicia la espera exponencial
+    STABLE_AFTER = 60.0
+    
+    # Comprobaciones fallidas del puerto antes de considerar caído un componente
+    PORT_FAILURES_LIMIT = 3
+    
+    def __init__(self):
+        """Inicializa el supervisor sin componentes."""
+        self.components = {}
+    
+    def add(self, name, launcher, port):
+        """Registra un componente con su función de arranque y su puerto."""
+        self.components[name] = {
+            "launcher": launcher,
+            "port": port,
+            "process": None,
+            "started_at": 0.0,
+            "restarts": 0,
+            "backoff": self.BACKOFF_INITIAL,
+            "next_restart": None,
+            "port_failures": 0
+        }
+    
+    def start_all(self):
+        """Lanza todos los componentes en paralelo y espera a que escuchen."""
+        for name in self.components:
+            self._launch(name)
+        for component in self.components.values():
+            wait_for_port(component["port"])
+        self.write_state()
+    
+    def process(self, name):
+        """Devuelve el proceso actual de un componente."""
+        return self.components[name]["process"]
+    
+    def _launch(self, name):
+        """Arranca (o rearranca) un componente."""
+        component = self.components[name]
+        component["process"] = component["launcher"]()
+        component["started_at"] = time.time()
+        component["next_restart"] = None
+        component["port_failures"] = 0
+    
+    def check(self):
+        """Comprueba la salud de los componentes y reinicia los caídos."""
+        now = time.time()
+        changed = False
+        
+        for name, component in self.components.items():
+            process = component["process"]
+            
+            if component["next_restart"] is not None:
+                if now >= component["next_restart"]:
+                    print(f"Reiniciando {name} (reinicio #{component['restarts']})...")
+                    self._launch(name)
+                    changed = True
+                continue
+            
+            failure = None
+            if process.poll() is not None:
+                failure = f"terminó con código {process.returncode}"
+            elif now - component["started_at"] > 2 and not port_is_listening(process.pid, component["port"]):
+                component["port_failures"] += 1
+                if component["port_failures"] >= self.PORT_FAILURES_LIMIT:
+                    failure = f"no escucha en el puerto {component['port']}"
+            else:
+                component["port_failures"] = 0
+                if now - component["started_at"] > self.STABLE_AFTER:
+                    component["backoff"] = self.BACKOFF_INITIAL
+            
+            if failure:
+                print(f"El componente {name} {failure}; reinicio en {component['backoff']:.1f} s")
+                self._stop_process(process)
+                component["restarts"] += 1
+                component["next_restart"] = now + component["backoff"]
+                component["backoff"] = min(component["backoff"] * 2, self.BACKOFF_MAX)
+        
+        if changed:
+            self.write_state()
+    
+    def restart(self, name):
+        """Reinicia un componente de forma ordenada (SIGTERM y nuevo proceso)."""
+        self._stop_process(self.components[name]["process"], timeout=5)
+        self._launch(name)
+        self.write_state()
+    
+    def stop_all(self):
+        """Termina únicamente los procesos hijos de este supervisor."""
+        for component in self.components.values():
+            self._stop_process(component["process"])
+        try:
+            os.remove(STATE_FILE)
+        except OSError:
+            pass
+    
+    def _stop_process(self, process, timeout=2):
+        """Termina un proceso hijo, forzándolo si no responde."""
+        if not process or process.poll() is not None:
+            return
+        try:
+            process.terminate()
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        except OSError:
+            pass
+    
+    def write_state(self):
+        """
+        Publica los PID de los componentes para --status y --cleanup, con la identidad
+        de cada proceso para que --cleanup no termine otro que reutilice el PID.
+        """
+        state = {
+            "supervisor": os.getpid(),
+            "supervisor_identity": process_identity(os.getpid()),
+            "components": {}
+        }
+        for name, component in self.components.items():
+            pid = component["process"].pid if component["process"] else None
+            state["components"][name] = {
+                "pid": pid,
+                "port": component["port"],
+                "restarts": component["restarts"],
+                **process_identity(pid)
+            }
+        try:
+            with open(STATE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+        except OSError as e:
+            print(f"No se pudo guardar el estado del supervisor: {e}")
+
+def print_status():
+    """Muestra el estado de los componentes supervisados con su uso de CPU y memoria."""
+    state = read_supervisor_state()
+    if not state:
+        print("No hay ningún supervisor en ejecución.")
+        return
+    
+    if not PSUTIL_AVAILABLE:
+        print("psutil no disponible: no se puede medir CPU ni memoria")
+    
+    entries = [("supervisor", state.get("supervisor"), None, 0)]
+    entries.extend((name, info.get("pid"), info.get("port"), info.get("restarts", 0))
+                   for name, info in state.get("components", {}).items())
+    
+    # Primera lectura de CPU: psutil mide el porcentaje entre dos llamadas
+    procs = {}
+    if PSUTIL_AVAILABLE:
+        for _, pid, _, _ in entries:
+            try:
+                procs[pid] = psutil.Process(pid)
+                procs[pid].cpu_percent(None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, TypeError, ValueError):
+                pass
+        time.sleep(0.5)
+    
+    print(f"{'Componente':<12} {'PID':>7} {'Puerto':>7} {'Estado':<10} {'CPU %':>6} {'RSS MB':>8} {'Reinicios':>9}")
+    for name, pid, port, restarts in entries:
+        proc = procs.get(pid)
+        cpu, rss, alive = "-", "-", "?"
+        if proc:
+            try:
+                with proc.oneshot():
+                    cpu = f"{proc.cpu_percent(None):.1f}"
+                    rss = f"{proc.memory_info().rss / (1024 * 1024):.1f}"
+                alive = "activo" if port is None or port_is_listening(pid, port) else "sin puerto"
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                alive = "caído"
+            except psutil.AccessDenied:
+                pass
+        print(f"{name:<12} {pid or '-':>7} {port or '-':>7} {alive:<10} {cpu:>6} {rss:>8} {restarts:>9}")
+
 def signal_handler(sig, frame):
     """
     Maneja señales de interrupción (Ctrl+C) para realizar limpieza.
     """
     print("\nInterrupción recibida. Finalizando procesos...")
-    cleanup_resources(args.tcp_port, args.ws_port, args.http_port, [server_process, bridge_process, http_process])
+    if supervisor:
+        supervisor.stop_all()
     sys.exit(0)
 
+# Reinicio en caliente pedido con SIGHUP; lo atiende el bucle de supervisión
+restart_requested = threading.Event()
+
+def restart_server_handler(sig, frame):
+    """
+    Pide el reinicio en caliente del servidor TCP (SIGHUP). Solo marca la petición:
+    la señal puede llegar mientras el bucle de supervisión reinicia un componente.
+    """
+    restart_requested.set()
+
+def restart_server():
+    """
+    Reinicio en caliente del servidor TCP: el proceso actual drena y guarda las salas
+    en una instantánea y el nuevo proceso las restaura al arrancar.
+    """
+    print("\nReinicio en caliente del servidor TCP...")
+    start = time.time()
+    supervisor.restart('server')
+    print(f"Servidor TCP reiniciado en {(time.time() - start) * 1000:.0f} ms")
+
 def main():
     """Función principal que inicia todos los componentes."""
-    global args, server_process, bridge_process, http_process
+    global args, supervisor
     
     parser = argparse.ArgumentParser(description='Iniciar el juego Tic-Tac-Toe multijugador')
     parser.add_argument('--tcp-port', type=int, default=9000, help='Puerto del servidor TCP (predeterminado: 9000)')
@@ -263,8 +623,20 @@ def main():
     parser.add_argument('--tcp-host', type=str, default='localhost', help='Host del servidor TCP (predeterminado: localhost)')
     parser.add_argument('--open-browser', action='store_true', help='Abrir el navegador automáticamente')
     parser.add_argument('--cleanup', action='store_true', help='Realizar limpieza de recursos y salir')
+    parser.add_argument('--status', action='store_true', help='Mostrar el estado, CPU y memoria de los componentes')
+    parser.add_argument('--single-process', action='store_true', help='Ejecutar servidor, adaptador y archivos web en un solo proceso')
+    parser.add_argument('--admin-socket', default=None,
+                        help='Socket Unix (permisos 0600) del canal de administración del servidor (predeterminado: desactivado)')
+    parser.add_argument('--admin-port', type=int, default=None,
+                        help='Puerto del canal de administración en 127.0.0.1, sin autenticación (predeterminado: desactivado)')
     
     args = parser.parse_args()
+    supervisor = None
+    
+    # El estado solo lee el archivo del supervisor y usa psutil si está disponible
+    if args.status:
+        print_status()
+        return
     
     # Verificar dependencias siempre, excepto para cleanup
     if not args.cleanup and not ensure_dependencies():
@@ -278,25 +650,34 @@ def main():
     
     # Establecer el manejador de señales para Ctrl+C
     signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+    
+    # SIGHUP reinicia el servidor TCP conservando las partidas en curso
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, restart_server_handler)
     
     # Si solo se requiere limpieza, ejecutar y salir
     if args.cleanup:
         cleanup_resources(args.tcp_port, args.ws_port, args.http_port)
         return
     
-    server_process = None
-    bridge_process = None
-    http_process = None
-    
     try:
-        # Iniciar el servidor TCP
-        server_process = run_server(args.tcp_port, wait=True)
+        start = time.time()
         
-        # Iniciar el adaptador WebSocket
-        bridge_process = run_bridge(args.ws_port, args.tcp_host, args.tcp_port, wait=True)
+        if args.single_process:
+            run_in_process(args.tcp_port, args.ws_port, args.tcp_host, args.http_port,
+                           args.admin_socket, args.admin_port)
+        else:
+            # Lanzar los tres componentes en paralelo (el adaptador solo conecta
+            # con el servidor TCP al recibir clientes) y esperar a sus puertos
+            supervisor = ProcessSupervisor()
+            supervisor.add('server', lambda: run_server(args.tcp_port, admin_socket=args.admin_socket,
+                                                        admin_port=args.admin_port), args.tcp_port)
+            supervisor.add('bridge', lambda: run_bridge(args.ws_port, args.tcp_host, args.tcp_port), args.ws_port)
+            supervisor.add('http', lambda: run_http_server(args.http_port), args.http_port)
+            supervisor.start_all()
         
-        # Iniciar el servidor HTTP
-        http_process = run_http_server(args.http_port)
+        print(f"Componentes listos en {(time.time() - start) * 1000:.0f} ms")
         
         # Abrir el navegador si se solicita
         if args.open_browser:
@@ -311,15 +692,22 @@ def main():
         print(f"Interfaz web disponible en: http://localhost:{args.http_port}")
         print("\nPresiona Ctrl+C para detener todos los servidores\n")
         
-        # Mantener el script en ejecución
+        # Supervisar los componentes mientras el script está en ejecución; la espera
+        # termina antes si llega un SIGHUP
         while True:
-            time.sleep(1)
+            if supervisor:
+                if restart_requested.is_set():
+                    restart_requested.clear()
+                    restart_server()
+                supervisor.check()
+            restart_requested.wait(1)
             
     except KeyboardInterrupt:
         print("\nDeteniendo servidores...")
     finally:
-        # Terminar todos los procesos
-        cleanup_resources(args.tcp_port, args.ws_port, args.http_port, [server_process, bridge_process, http_process])
+        # Terminar solo los procesos propios
+        if supervisor:
+            supervisor.stop_all()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,306 @@
+"""
+Canal de administración local del servidor.
+
+Es opcional y no tiene autenticación: escucha en un socket Unix con permisos 0600 (solo
+el usuario del servidor puede conectarse) o, donde no hay sockets Unix, en un puerto de
+127.0.0.1. Responde, con una línea JSON por comando, a:
+
+- ``ROOMS``: salas con estado, jugadores, antigüedad y partidas jugadas
+- ``CONN [id]``: conexiones activas, o el detalle de una (inactividad, cola de envío)
+- ``CLOSE código``: cierra una sala y avisa a sus jugadores
+- ``STATS``: contadores agregados del servidor
+- ``PROFILE``: guarda el informe del perfilador de locks (si está activo)
+
+Las respuestas salen de índices en memoria (sesiones por id, contadores incrementales)
+y de copias atómicas de los diccionarios, sin tomar rooms_lock ni recorrer las salas
+bajo lock.
+"""
+
+import json
+import os
+import socket
+import stat
+import struct
+import threading
+import time
+
+import lock_profiler
+from room_codes import normalize
+
+# TIOCOUTQ (bytes pendientes en la cola de envío del socket) solo existe en Linux
+try:
+    import fcntl
+    import termios
+    TIOCOUTQ = termios.TIOCOUTQ
+except (ImportError, AttributeError):
+    TIOCOUTQ = None
+
+def queue_depth(sock):
+    """Bytes escritos en el socket que el kernel aún no ha enviado, o None si no se puede medir."""
+    if TIOCOUTQ is None:
+        return None
+    try:
+        return struct.unpack("I", fcntl.ioctl(sock.fileno(), TIOCOUTQ, struct.pack("I", 0)))[0]
+    except (OSError, ValueError):
+        return None
+
+class ClientSession:
+    """Conexión de un cliente con sus contadores de actividad."""
+    
+    __slots__ = ("session_id", "socket", "address", "name", "connected_at", "last_activity",
+                 "messages_in", "bytes_in")
+    
+    def __init__(self, session_id, sock, address, name):
+        """Registra la conexión en el instante actual."""
+        self.session_id = session_id
+        self.socket = sock
+        self.address = address
+        self.name = name
+        self.connected_at = time.time()
+        self.last_activity = self.connected_at
+        self.messages_in = 0
+        self.bytes_in = 0
+    
+    def touch(self, size):
+        """Anota un bloque recibido del cliente."""
+        self.last_activity = time.time()
+        self.bytes_in += size
+
+class SessionRegistry:
+    """Índice de sesiones por id y por socket."""
+    
+    def __init__(self):
+        """Inicializa el registro vacío."""
+        self.by_id = {}
+        self.by_socket = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+    
+    def register(self, sock, address, name):
+        """Crea y registra la sesión de una conexión identificada."""
+        with self.lock:
+            session = ClientSession(self.next_id, sock, address, name)
+            self.next_id += 1
+            self.by_id[session.session_id] = session
+            self.by_socket[sock] = session
+        return session
+    
+    def unregister(self, sock):
+        """Elimina la sesión de un socket (si estaba registrada)."""
+        with self.lock:
+            session = self.by_socket.pop(sock, None)
+            if session:
+                self.by_id.pop(session.session_id, None)
+        return session
+    
+    def get(self, session_id):
+        """Devuelve una sesión por su id (consulta O(1))."""
+        return self.by_id.get(session_id)
+    
+    def for_socket(self, sock):
+        """Devuelve la sesión de un socket (consulta O(1))."""
+        return self.by_socket.get(sock)
+    
+    def __len__(self):
+        """Número de sesiones activas."""
+        return len(self.by_id)
+
+class ServerStats:
+    """Contadores agregados que el servidor incrementa en cada evento."""
+    
+    def __init__(self):
+        """Inicializa los contadores a cero."""
+        self.started_at = time.time()
+        self.counters = {
+            "connections": 0,
+            "messages": 0,
+            "rooms_created": 0,
+            "moves": 0,
+            "games_finished": 0,
+            "rooms_closed_by_admin": 0
+        }
+        self.lock = threading.Lock()
+    
+    def incr(self, name, amount=1):
+        """Incrementa un contador."""
+        with self.lock:
+            self.counters[name] += amount
+    
+    def snapshot(self):
+        """Copia de los contadores con el tiempo en marcha."""
+        with self.lock:
+            data = dict(self.counters)
+        data["uptime"] = round(time.time() - self.started_at, 1)
+        return data
+
+class AdminServer:
+    """Servidor de administración local de un TicTacToeServer, en un socket Unix o en un puerto de 127.0.0.1."""
+    
+    def __init__(self, server, path=None, port=None, host="127.0.0.1"):
+        """Prepara el canal sin empezar a escuchar (con `path` usa un socket Unix)."""
+        self.server = server
+        self.path = path
+        self.host = host
+        self.port = port
+        self.listener = None
+        self.owns_path = False
+        self.running = False
+    
+    def start(self):
+        """Abre el socket de administración y atiende conexiones en un hilo."""
+        if self.path:
+            self.listener = self._bind_unix(self.path)
+            self.owns_path = True
+            where = self.path
+        else:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind((self.host, self.port))
+            where = f"{self.host}:{self.port}"
+        self.listener.listen(5)
+        self.running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"Canal de administración en {where}")
+    
+    @staticmethod
+    def _bind_unix(path):
+        """Crea el socket Unix accesible solo para el usuario del servidor (0600)."""
+        # Un socket que quedó de una ejecución anterior se sustituye; cualquier otro archivo no
+        try:
+            if stat.S_ISSOCK(os.lstat(path).st_mode):
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # El socket se crea ya sin permisos para otros usuarios: con chmod posterior
+        # quedaría un instante accesible
+        previous_umask = os.umask(0o177)
+        try:
+            listener.bind(path)
+        finally:
+            os.umask(previous_umask)
+        os.chmod(path, 0o600)
+        return listener
+    
+    def stop(self):
+        """Cierra el socket de administración (y elimina el archivo del socket Unix)."""
+        self.running = False
+        if self.listener:
+            try:
+                self.listener.close()
+            except OSError:
+                pass
+            if self.owns_path:
+                self.owns_path = False
+                try:
+                    os.unlink(self.path)
+                except OSError:
+                    pass
+    
+    def _accept_loop(self):
+        """Acepta conexiones de administración."""
+        while self.running:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+    
+    def _handle(self, conn):
+        """Responde a los comandos de una conexión, uno por línea."""
+        try:
+            with conn, conn.makefile("r", encoding="utf-8") as lines:
+                for line in lines:
+                    parts = line.split()
+                    if not parts:
+                        continue
+                    response = self.execute(parts[0].upper(), parts[1:])
+                    conn.sendall((json.dumps(response, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8"))
+        except OSError:
+            pass
+    
+    def execute(self, command, args):
+        """Ejecuta un comando de administración y devuelve la respuesta serializable."""
+        handlers = {
+            "ROOMS": self.rooms,
+            "CONN": self.connections,
+            "CLOSE": self.close_room,
+            "STATS": self.stats,
+            "PROFILE": self.profile
+        }
+        handler = handlers.get(command)
+        if handler is None:
+            return {"error": f"Comando desconocido: {command}", "commands": sorted(handlers)}
+        try:
+            return handler(args)
+        except Exception as e:
+            return {"error": str(e)}
+    
+    def rooms(self, args):
+        """Salas con estado, jugadores, antigüedad y partidas jugadas."""
+        rooms = self.server.rooms.copy()
+        return {"rooms": [
+            {
+                "code": code,
+                "name": room.room_name,
+                "status": room.status,
+                "players": [p.name for p in (room.player1, room.player2) if p],
+                # Con el reloj de la sala, el mismo que marcó created_at (virtual en los escenarios)
+                "age": round(room.clock.time() - room.created_at, 1),
+                "games": room.games_played
+            }
+            for code, room in rooms.items()
+        ]}
+    
+    def connections(self, args):
+        """Lista de conexiones, o el detalle de una con `CONN id`."""
+        now = time.time()
+        if not args:
+            sessions = list(self.server.sessions.by_id.values())
+            return {"connections": [
+                {"id": s.session_id, "name": s.name, "idle": round(now - s.last_activity, 1)}
+                for s in sessions
+            ]}
+        
+        session = self.server.sessions.get(int(args[0])) if args[0].isdigit() else None
+        if session is None:
+            return {"error": "Conexión no encontrada"}
+        return {
+            "id": session.session_id,
+            "name": session.name,
+            "address": f"{session.address[0]}:{session.address[1]}" if session.address else None,
+            "room": self.server.client_rooms.get(session.socket),
+            "connected": round(now - session.connected_at, 1),
+            "idle": round(now - session.last_activity, 1),
+            "messages_in": session.messages_in,
+            "bytes_in": session.bytes_in,
+            "send_queue": queue_depth(session.socket)
+        }
+    
+    def close_room(self, args):
+        """Cierra una sala por su código."""
+        if not args:
+            return {"error": "Uso: CLOSE código"}
+        room = self.server.rooms.get(normalize(args[0]))
+        if room is None:
+            return {"error": "Sala no encontrada"}
+        room.close("La sala ha sido cerrada por el administrador")
+        self.server.stats.incr("rooms_closed_by_admin")
+        return {"closed": room.room_id}
+    
+    def stats(self, args):
+        """Contadores agregados del servidor."""
+        data = self.server.stats.snapshot()
+        data["active_connections"] = len(self.server.sessions)
+        data["active_rooms"] = len(self.server.rooms)
+        data["room_pool"] = self.server.room_pool.stats()
+        return data
+    
+    def profile(self, args):
+        """Guarda el informe del perfilador de locks."""
+        profiler = lock_profiler.get_profiler()
+        if profiler is None:
+            return {"error": "El perfilado de locks no está activo (usa --profile)"}
+        report_path, stacks_path = profiler.dump()
+        return {"report": report_path, "stacks": stacks_path}
@@ -0,0 +1,184 @@
+"""
+Análisis vectorizado del espacio completo de posiciones de tres en línea con NumPy.
+
+Cada tablero se codifica como un vector de 9 enteros (0 vacío, 1 X, 2 O) y como una
+clave en base 3 (casilla i con peso 3**i). Como en GameRoom puede empezar cualquiera
+de los dos símbolos, las tablas se indexan por (jugador que mueve, clave).
+"""
+
+import time
+
+import numpy as np
+
+# Codificación de casillas
+EMPTY, X, O = 0, 1, 2
+SYMBOL_CODES = {" ": EMPTY, "X": X, "O": O}
+
+# Número de claves posibles (3**9) y pesos de cada casilla
+NUM_KEYS = 3 ** 9
+POW3 = 3 ** np.arange(9, dtype=np.int32)
+
+# Combinaciones ganadoras (filas, columnas y diagonales)
+LINES = np.array([
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],
+    [0, 4, 8], [2, 4, 6]
+], dtype=np.int8)
+
+# Valor de puntuación para posiciones no alcanzables
+ILLEGAL = -128
+
+def board_key(board):
+    """Convierte un tablero de símbolos (" ", "X", "O") en su clave en base 3."""
+    key = 0
+    weight = 1
+    for cell in board:
+        key += SYMBOL_CODES[cell] * weight
+        weight *= 3
+    return key
+
+def decode_keys(keys):
+    """Convierte un arreglo de claves en una matriz (N, 9) de casillas."""
+    return ((np.asarray(keys, dtype=np.int32)[:, None] // POW3) % 3).astype(np.int8)
+
+def winners(boards):
+    """Devuelve el ganador de cada tablero (0 ninguno, 1 X, 2 O)."""
+    lines = boards[:, LINES]
+    x_wins = (lines == X).all(axis=2).any(axis=1)
+    o_wins = (lines == O).all(axis=2).any(axis=1)
+    return np.where(x_wins, X, np.where(o_wins, O, EMPTY)).astype(np.int8)
+
+def threats(boards, player):
+    """Cuenta las líneas con dos fichas del jugador y la tercera casilla vacía."""
+    lines = boards[:, LINES]
+    own = (lines == player).sum(axis=2)
+    empty = (lines == EMPTY).sum(axis=2)
+    return ((own == 2) & (empty == 1)).sum(axis=1).astype(np.int8)
+
+class PositionTables:
+    """
+    Tablas precalculadas del espacio de estados:
+    
+    - ``winner[key]``: ganador de cualquier tablero (0, 1 o 2)
+    - ``score[mover - 1, key]``: valor minimax desde el punto de vista de X
+      (positivo gana X, negativo gana O, 0 tablas; mayor magnitud = victoria más rápida),
+      ``ILLEGAL`` si la posición no es alcanzable
+    - ``best_move[mover - 1, key]``: mejor casilla para quien mueve (-1 si es terminal)
+    - ``keys``, ``movers``, ``boards``: estados legales enumerados
+    - ``x_threats``, ``o_threats``: amenazas por estado legal
+    """
+    
+    def __init__(self):
+        """Enumera los estados y calcula todas las tablas."""
+        all_boards = decode_keys(np.arange(NUM_KEYS))
+        self.winner = winners(all_boards)
+        self.filled = (all_boards != EMPTY).sum(axis=1).astype(np.int8)
+        
+        layers = self._enumerate_layers()
+        self.keys = np.concatenate([keys for keys, _ in layers])
+        self.movers = np.concatenate([movers for _, movers in layers])
+        self.boards = all_boards[self.keys]
+        self.x_threats = threats(self.boards, X)
+        self.o_threats = threats(self.boards, O)
+        
+        self.score = np.full((2, NUM_KEYS), ILLEGAL, dtype=np.int8)
+        self.best_move = np.full((2, NUM_KEYS), -1, dtype=np.int8)
+        self._solve(layers, all_boards)
+    
+    def _terminal(self, keys):
+        """Indica qué claves corresponden a posiciones terminales."""
+        return (self.winner[keys] != EMPTY) | (self.filled[keys] == 9)
+    
+    def _children(self, keys, movers, boards):
+        """
+        Claves hijas de cada estado: matriz (N, 9) con -1 donde la casilla está ocupada.
+        """
+        children = keys[:, None] + movers[:, None].astype(np.int32) * POW3[None, :]
+        return np.where(boards == EMPTY, children, -1)
+    
+    def _enumerate_layers(self):
+        """Enumera por capas (número de fichas) los estados alcanzables con ambos inicios."""
+        keys = np.array([0, 0], dtype=np.int32)
+        movers = np.array([X, O], dtype=np.int8)
+        layers = [(keys, movers)]
+        
+        for _ in range(9):
+            open_states = ~self._terminal(keys)
+            keys, movers = keys[open_states], movers[open_states]
+            if keys.size == 0:
+                break
+            children = self._children(keys, movers, decode_keys(keys))
+            next_movers = np.broadcast_to((3 - movers)[:, None], children.shape)
+            valid = children >= 0
+            # Identificador único de estado: clave * 2 + (jugador que mueve - 1)
+            state_ids = np.unique(children[valid] * 2 + (next_movers[valid] - 1))
+            keys = (state_ids // 2).astype(np.int32)
+            movers = (state_ids % 2 + 1).astype(np.int8)
+            layers.append((keys, movers))
+        
+        return layers
+    
+    def _solve(self, layers, all_boards):
+        """Calcula los valores minimax capa a capa, de los tableros llenos al vacío."""
+        for keys, movers in reversed(layers):
+            rows = movers - 1
+            terminal = self._terminal(keys)
+            
+            # Posiciones terminales: victoria más rápida vale más
+            speed = (10 - self.filled[keys]).astype(np.int8)
+            terminal_score = np.where(self.winner[keys] == X, speed,
+                                      np.where(self.winner[keys] == O, -speed, 0)).astype(np.int8)
+            self.score[rows[terminal], keys[terminal]] = terminal_score[terminal]
+            
+            keys, movers, rows = keys[~terminal], movers[~terminal], rows[~terminal]
+            if keys.size == 0:
+                continue
+            
+            children = self._children(keys, movers, all_boards[keys])
+            child_rows = (2 - movers)[:, None]  # tras mover, mueve el otro jugador
+            child_scores = self.score[np.broadcast_to(child_rows, children.shape),
+                                      np.maximum(children, 0)].astype(np.int16)
+            
+            # X maximiza y O minimiza; las casillas ocupadas no cuentan
+            x_to_move = (movers == X)[:, None]
+            masked = np.where(children < 0, np.where(x_to_move, -1000, 1000), child_scores)
+            best = np.where(x_to_move[:, 0], masked.argmax(axis=1), masked.argmin(axis=1))
+            
+            self.score[rows, keys] = masked[np.arange(keys.size), best].astype(np.int8)
+            self.best_move[rows, keys] = best
+    
+    def outcome(self, key, mover):
+        """Resultado con juego perfecto: 1 gana X, 2 gana O, 0 tablas."""
+        value = int(self.score[mover - 1, key])
+        return X if value > 0 else O if value < 0 else EMPTY
+
+_tables = None
+
+def get_tables():
+    """Devuelve las tablas compartidas, calculándolas la primera vez."""
+    global _tables
+    if _tables is None:
+        _tables = PositionTables()
+    return _tables
+
+def winner_by_key():
+    """
+    Lista Python del ganador por clave, para consultas escalares O(1) desde el servidor.
+    Solo evalúa las líneas de cada tablero, sin el minimax (salvo que las tablas ya existan).
+    """
+    if _tables is not None:
+        return _tables.winner.tolist()
+    return winners(decode_keys(np.arange(NUM_KEYS))).tolist()
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    tables = get_tables()
+    elapsed = time.perf_counter() - start
+    
+    x_first = tables.outcome(0, X)
+    print(f"Tablas calculadas en {elapsed * 1000:.1f} ms")
+    print(f"Estados legales (ambos inicios): {tables.keys.size}")
+    print(f"Estados con X empezando: {np.count_nonzero((tables.filled[tables.keys] % 2 == 0) == (tables.movers == X))}")
+    print(f"Resultado con juego perfecto desde el tablero vacío: {'tablas' if x_first == EMPTY else x_first}")
+    print(f"Mejor primera jugada: casilla {tables.best_move[0, 0]}")
+    print(f"Estados con doble amenaza de X: {np.count_nonzero(tables.x_threats >= 2)}")
@@ -0,0 +1,192 @@
+"""
+Micro-benchmarks del camino de los mensajes del servidor.
+
+- codec: parse_message + create_message
+- dispatch: process_block -> GameRoom -> sockets en memoria, en el hilo que llama
+  (servidor de escenarios: sin hilos de sala y con reloj virtual)
+- memory / tcp: servidor completo con sus hilos (conexiones y salas) y clientes que
+  juegan partidas con revancha, sobre MemoryTransport o sobre TCP en 127.0.0.1
+"""
+
+import io
+import time
+import socket
+import argparse
+import threading
+import contextlib
+
+from events import EventBus, set_bus
+from game_room import winner_table
+from move_table import get_move_table
+from protocol import parse_message, create_message
+from scenarios import Scenario
+from server import TicTacToeServer
+from transport import MemoryTransport, TcpTransport
+
+# Orden de las casillas jugadas en cada partida (siempre legal; gana quien empieza)
+MOVE_ORDER = (0, 3, 1, 4, 2, 5, 6, 7, 8)
+
+class LineClient:
+    """Cliente de protocolo sobre un socket (real o en memoria) que lee línea a línea."""
+    
+    def __init__(self, sock, name):
+        """Se identifica con su nombre."""
+        self.socket = sock
+        self.buffer = b""
+        self.send(name)
+    
+    def send(self, message):
+        """Envía un mensaje terminado en salto de línea."""
+        self.socket.sendall((message + "\n").encode("utf-8"))
+    
+    def expect(self, command):
+        """Lee hasta recibir un mensaje con el comando indicado y devuelve sus partes."""
+        while True:
+            while b"\n" not in self.buffer:
+                data = self.socket.recv(4096)
+                if not data:
+                    raise ConnectionError(f"Conexión cerrada esperando {command}")
+                self.buffer += data
+            line, _, self.buffer = self.buffer.partition(b"\n")
+            parts = line.decode("utf-8").split("|")
+            if parts[0] == command:
+                return parts
+    
+    def close(self):
+        """Cierra la conexión."""
+        self.socket.close()
+
+def play_games(a, b, games):
+    """Juega `games` partidas entre dos clientes en una sala, con revancha entre ellas. Devuelve los movimientos."""
+    a.send("CREATE|bench")
+    code = a.expect("CREATE")[1]
+    b.send(f"JOIN|{code}")
+    turn = a if a.expect("UPDATE")[3] == "True" else b
+    b.expect("UPDATE")
+    
+    moves = 0
+    for game in range(games):
+        for position in MOVE_ORDER:
+            turn.send(f"MOVE|{position}")
+            status = a.expect("DELTA")[5]
+            b.expect("DELTA")
+            moves += 1
+            if status != "PLAYING":
+                break
+            turn = b if turn is a else a
+        a.expect("END")
+        b.expect("END")
+        
+        if game + 1 < games:
+            a.send("REMATCH")
+            b.expect("REMATCH")
+            b.send("REMATCH")
+            turn = a if a.expect("UPDATE")[3] == "True" else b
+            b.expect("UPDATE")
+    return moves
+
+def bench_codec(count):
+    """Mensajes por segundo de parse_message + create_message."""
+    start = time.perf_counter()
+    for i in range(count):
+        command, args = parse_message(f"MOVE|{i % 9}")
+        create_message("DELTA", i, args[0], "X", True, "PLAYING")
+    return count / (time.perf_counter() - start)
+
+def bench_dispatch(games):
+    """Movimientos por segundo procesados en el hilo que llama, sin red ni hilos de sala."""
+    scenario = Scenario(seed=0)
+    # Las tablas de jugadas y ganadores se construyen en el primer uso: fuera de la medida
+    get_move_table()
+    winner_table()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            a, b = scenario.connect(), scenario.connect()
+            scenario.send(a, "CREATE|bench")
+            code = next(iter(scenario.server.rooms))
+            scenario.send(b, f"JOIN|{code}")
+            room = scenario.server.rooms[code]
+            
+            moves = 0
+            start = time.perf_counter()
+            for _ in range(games):
+                for position in MOVE_ORDER:
+                    player = a if room.current_turn == 1 else b
+                    scenario.send(player, f"MOVE|{position}")
+                    moves += 1
+                    if room.status != "PLAYING":
+                        break
+                scenario.send(a, "REMATCH")
+                scenario.send(b, "REMATCH")
+                # Los clientes descartan lo recibido para no acumularlo en memoria
+                a.socket.read_available()
+                b.socket.read_available()
+            elapsed = time.perf_counter() - start
+    finally:
+        scenario.close()
+    return moves / elapsed
+
+def bench_server(transport_name, pairs, games, port):
+    """Partidas y movimientos por segundo con el servidor completo y `pairs` parejas en paralelo."""
+    previous_bus = set_bus(EventBus())
+    if transport_name == "memory":
+        transport = MemoryTransport()
+        connect = transport.connect
+    else:
+        transport = TcpTransport("127.0.0.1", port)
+        connect = lambda: socket.create_connection(("127.0.0.1", port))
+    
+    server = TicTacToeServer("127.0.0.1", port, snapshot_path=None, transport=transport)
+    results = []
+    
+    def pair(index):
+        a = LineClient(connect(), f"a{index}")
+        b = LineClient(connect(), f"b{index}")
+        results.append(play_games(a, b, games))
+        a.close()
+        b.close()
+    
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            server_thread = threading.Thread(target=server.start, daemon=True)
+            server_thread.start()
+            while not server.running:
+                time.sleep(0.01)
+            
+            start = time.perf_counter()
+            threads = [threading.Thread(target=pair, args=(i,)) for i in range(pairs)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            
+            # Detener el servidor cuando ya ha atendido el cierre de todos los clientes, y
+            # esperar a su hilo para que nada escriba fuera de la salida redirigida
+            while len(server.sessions):
+                time.sleep(0.01)
+            server.stop()
+            server_thread.join(5)
+    finally:
+        set_bus(previous_bus)
+    
+    if len(results) < pairs:
+        raise RuntimeError("Alguna pareja no terminó sus partidas")
+    return pairs * games / elapsed, sum(results) / elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Micro-benchmarks del camino de los mensajes')
+    parser.add_argument('--messages', type=int, default=200000, help='Mensajes del benchmark del códec')
+    parser.add_argument('--games', type=int, default=200, help='Partidas por pareja de clientes')
+    parser.add_argument('--pairs', type=int, default=8, help='Parejas de clientes en paralelo')
+    parser.add_argument('--port', type=int, default=9700, help='Puerto del servidor TCP de prueba')
+    parser.add_argument('--no-tcp', action='store_true', help='Omitir el benchmark sobre TCP')
+    args = parser.parse_args()
+    
+    print(f"codec:    {bench_codec(args.messages):>10.0f} mensajes/s")
+    print(f"dispatch: {bench_dispatch(args.games * args.pairs):>10.0f} movimientos/s")
+    
+    for name in ("memory",) + (() if args.no_tcp else ("tcp",)):
+        games_per_second, moves_per_second = bench_server(name, args.pairs, args.games, args.port)
+        print(f"{name + ':':<9} {moves_per_second:>10.0f} movimientos/s  ({games_per_second:.0f} partidas/s, "
+              f"{args.pairs} parejas)")
@@ -0,0 +1,205 @@
+"""
+Bus interno de eventos de las salas.
+
+GameRoom publica los cambios de estado (inicio de partida, movimientos, fin de partida,
+salida de jugadores...) y no escribe en ningún socket: los transportes y observadores se
+suscriben. Hay dos modos de entrega:
+
+- Asíncrono (por defecto): publicar solo añade el evento a una cola y un hilo despachador
+  lo entrega por lotes, de modo que añadir observadores (torneos, estadísticas, registro)
+  no ralentiza el procesamiento de los movimientos.
+- Síncrono (sync=True): el callback se llama en el hilo que publica, en orden y sin
+  esperar al siguiente lote. Es el modo de los mensajes a los jugadores (messenger.py),
+  suscritos por sala.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Eventos publicados por las salas
+GAME_STARTED = "game_started"  # players, starter
+MOVE_MADE = "move_made"        # player, position, symbol, seq
+GAME_ENDED = "game_ended"      # winner (0 empate, 1/2 ganador, None sin resultado), forfeit
+PLAYER_LEFT = "player_left"    # player, name, status
+PLAYER_JOINED = "player_joined"          # player, name
+STATE_REQUESTED = "state_requested"      # player (al reanudar o con SYNC)
+REMATCH_REQUESTED = "rematch_requested"  # player
+CHAT_MESSAGES = "chat_messages"          # player, messages [(nombre, texto), ...]
+PLAYER_NOTICE = "player_notice"          # player (None = ambos), command, args
+ROOM_CLOSED = "room_closed"              # name
+
+# Suscripción a todos los eventos
+ALL_EVENTS = "*"
+
+# Intervalo entre entregas (segundos) y máximo de eventos pendientes
+BATCH_INTERVAL = 0.05
+MAX_PENDING = 100000
+
+class Event:
+    """Evento de una sala."""
+    
+    __slots__ = ("name", "room_id", "data", "timestamp")
+    
+    def __init__(self, name, room_id, data):
+        """Crea el evento con la hora actual."""
+        self.name = name
+        self.room_id = room_id
+        self.data = data
+        self.timestamp = time.time()
+
+class EventBus:
+    """Bus de publicación/suscripción con entrega asíncrona por lotes o síncrona por sala."""
+    
+    def __init__(self, batch_interval=BATCH_INTERVAL, max_pending=MAX_PENDING):
+        """Inicializa el bus sin suscriptores."""
+        self.batch_interval = batch_interval
+        self.max_pending = max_pending
+        
+        # {evento: ((callback, por_lotes), ...)}; se reemplaza la tupla al suscribir
+        self.subscribers = {}
+        # Suscripciones síncronas: {(evento, sala o None): (callback, ...)}; se reemplaza el
+        # diccionario al cambiarlas, así publish() lo lee sin tomar el cerrojo
+        self.sync_subscribers = {}
+        self.lock = threading.Lock()
+        
+        self.pending = deque()
+        self.running = False
+        
+        # Contadores
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+    
+    def subscribe(self, name, callback, batch=False, sync=False, room_id=None):
+        """
+        Suscribe un callback a un evento (o a todos con ALL_EVENTS).
+        Con batch=True recibe la lista de eventos de cada lote en una sola llamada.
+        Con sync=True se llama en el hilo que publica, dentro de publish(); con room_id
+        solo recibe los eventos de esa sala. Un callback síncrono lento retrasa a la sala.
+        """
+        if batch and sync:
+            raise ValueError("Una suscripción síncrona no recibe lotes")
+        if room_id is not None and not sync:
+            raise ValueError("Solo las suscripciones síncronas se filtran por sala")
+        with self.lock:
+            if sync:
+                key = (name, room_id)
+                sync_subscribers = dict(self.sync_subscribers)
+                sync_subscribers[key] = sync_subscribers.get(key, ()) + (callback,)
+                self.sync_subscribers = sync_subscribers
+            else:
+                self.subscribers[name] = self.subscribers.get(name, ()) + ((callback, batch),)
+    
+    def unsubscribe(self, name, callback, room_id=None):
+        """Cancela una suscripción."""
+        with self.lock:
+            remaining = tuple(s for s in self.subscribers.get(name, ()) if s[0] != callback)
+            if remaining:
+                self.subscribers[name] = remaining
+            else:
+                self.subscribers.pop(name, None)
+            
+            key = (name, room_id)
+            sync_subscribers = dict(self.sync_subscribers)
+            remaining = tuple(c for c in sync_subscribers.get(key, ()) if c != callback)
+            if remaining:
+                sync_subscribers[key] = remaining
+            else:
+                sync_subscribers.pop(key, None)
+            self.sync_subscribers = sync_subscribers
+    
+    def unsubscribe_room(self, room_id):
+        """Cancela las suscripciones síncronas de una sala (al cerrarse, antes de reciclar su código)."""
+        with self.lock:
+            self.sync_subscribers = {key: callbacks for key, callbacks in self.sync_subscribers.items()
+                                     if key[1] != room_id}
+    
+    def publish(self, name, room_id, /, **data):
+        """
+        Entrega el evento a los suscriptores síncronos (en este hilo) y lo encola para los
+        asíncronos, que no se llaman desde el hilo que publica.
+        """
+        event = None
+        sync = self.sync_subscribers
+        if sync:
+            callbacks = (sync.get((name, room_id), ()) + sync.get((ALL_EVENTS, room_id), ()) +
+                         sync.get((name, None), ()) + sync.get((ALL_EVENTS, None), ()))
+            if callbacks:
+                event = Event(name, room_id, data)
+                for callback in callbacks:
+                    try:
+                        callback(event)
+                    except Exception as e:
+                        print(f"Error al entregar el evento {name}: {e}")
+        
+        if name not in self.subscribers and ALL_EVENTS not in self.subscribers:
+            return
+        if len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self.pending.append(event or Event(name, room_id, data))
+        self.published += 1
+    
+    def start(self):
+        """Arranca el hilo despachador."""
+        if self.running:
+            return
+        self.running = True
+        threading.Thread(target=self._run, name="event-bus", daemon=True).start()
+    
+    def stop(self):
+        """Detiene el despachador entregando los eventos pendientes."""
+        self.running = False
+        self.flush()
+    
+    def _run(self):
+        """Entrega los eventos acumulados en cada intervalo."""
+        while self.running:
+            time.sleep(self.batch_interval)
+            self.flush()
+    
+    def flush(self):
+        """Entrega a los suscriptores los eventos pendientes, agrupados por tipo."""
+        count = len(self.pending)
+        if not count:
+            return
+        
+        by_name = {}
+        delivered = 0
+        for _ in range(count):
+            try:
+                event = self.pending.popleft()
+            except IndexError:
+                # Otro hilo (stop) vació la cola a la vez
+                break
+            by_name.setdefault(event.name, []).append(event)
+            delivered += 1
+        
+        subscribers = self.subscribers
+        for name, events in by_name.items():
+            for callback, batch in subscribers.get(name, ()) + subscribers.get(ALL_EVENTS, ()):
+                try:
+                    if batch:
+                        callback(events)
+                    else:
+                        for event in events:
+                            callback(event)
+                except Exception as e:
+                    print(f"Error al entregar el evento {name}: {e}")
+        self.delivered += delivered
+
+_bus = None
+
+def get_bus():
+    """Devuelve el bus compartido del proceso, creándolo la primera vez."""
+    global _bus
+    if _bus is None:
+        _bus = EventBus()
+    return _bus
+
+def set_bus(bus):
+    """Sustituye el bus compartido (las salas y el servidor lo toman al crearse). Devuelve el anterior."""
+    global _bus
+    previous, _bus = _bus, bus
+    return previous
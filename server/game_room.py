@@ -1,6 +1,20 @@
 import threading
-import time
 import random
+import hmac
+import secrets
+from collections import deque
+
+from events import (
+    get_bus, GAME_STARTED, MOVE_MADE, GAME_ENDED, PLAYER_LEFT, PLAYER_JOINED,
+    STATE_REQUESTED, REMATCH_REQUESTED, CHAT_MESSAGES, PLAYER_NOTICE, ROOM_CLOSED
+)
+from lock_profiler import make_lock
+from move_table import get_move_table
+from transport import get_clock
+from protocol import (
+    CMD_HINT, REJECT_MESSAGES, REJECT_NOT_PLAYING, REJECT_NOT_YOUR_TURN,
+    REJECT_OUT_OF_RANGE, REJECT_OCCUPIED, REJECT_NO_REMATCH, REJECT_CHAT_RATE
+)
 
 # Estados del juego
 STATUS_WAITING = "WAITING"
@@ -15,95 +29,463 @@ CMD_END = "END"
 CMD_ERROR = "ERROR"
 CMD_ROOM_CLOSED = "ROOM_CLOSED"
 
-def create_message(command, *args):
-    return command + '|' + '|'.join(str(arg) for arg in args)
+# Peso de cada casilla en la clave en base 3 del tablero (X = 1, O = 2)
+CELL_WEIGHTS = [3 ** i for i in range(9)]
+SYMBOL_VALUES = {" ": 0, "X": 1, "O": 2}
+
+# Tabla de ganadores por clave de tablero (opcional, requiere NumPy). Se calcula en la
+# primera consulta, no al importar: el arranque del servidor no espera a NumPy
+_winner_by_key = None
+
+def winner_table():
+    """Devuelve la lista del ganador por clave de tablero, o None si NumPy no está disponible."""
+    global _winner_by_key
+    if _winner_by_key is None:
+        try:
+            from analysis import winner_by_key
+            _winner_by_key = winner_by_key()
+        except ImportError:
+            _winner_by_key = False
+    return _winner_by_key or None
+
+# Tiempo máximo (segundos) para que los jugadores de una sala restaurada se reconecten
+RESUME_TIMEOUT = 60
+
+# Bytes aleatorios del token de reanudación de cada puesto
+RESUME_TOKEN_BYTES = 16
+
+# Tiempo máximo (segundos) para acordar la revancha antes de cerrar la sala
+REMATCH_TIMEOUT = 30
+
+# Intervalo entre pasos del hilo de la sala (segundos): esperando rival y con jugadores
+WAITING_POLL = 0.5
+PLAYING_POLL = 0.1
+
+# Chat: mensajes guardados por sala, longitud máxima y límite de mensajes por ventana de tiempo
+CHAT_HISTORY = 50
+CHAT_MAX_LENGTH = 200
+CHAT_RATE_LIMIT = 5
+CHAT_RATE_WINDOW = 10
+
+class Player:
+    """
+    Jugador de una sala: conexión (None si está pendiente de reconexión), nombre, símbolo
+    y token secreto de su puesto, que exige RESUME para volver a ocuparlo.
+    """
+    
+    __slots__ = ("socket", "name", "symbol", "token")
+    
+    def __init__(self, socket, name, symbol, token=None):
+        """Asocia el jugador a su conexión; sin token se genera uno aleatorio."""
+        self.socket = socket
+        self.name = name
+        self.symbol = symbol
+        self.token = token or secrets.token_urlsafe(RESUME_TOKEN_BYTES)
 
 class GameRoom(threading.Thread):  
-    def __init__(self, room_id, room_name, creator_socket, creator_name, on_room_closed=None):
+    def __init__(self, room_id, room_name, creator_socket, creator_name, on_room_closed=None,
+                 allow_rematch=True):
         """Inicializa una nueva sala de juego."""
         super().__init__()
+        
+        # Control de hilo
+        self.daemon = True
+        self.lock = make_lock("GameRoom.lock")
+        
+        # Reserva de salas: al cerrarse, el hilo espera a ser reasignado en lugar de terminar
+        self.pool = None
+        self.reassigned = threading.Event()
+        
+        # Bus de eventos: la sala publica sus cambios y no escribe en los sockets; los
+        # mensajes a los jugadores los envía su PlayerMessenger (messenger.py)
+        self.bus = get_bus()
+        
+        # Reloj de plazos y marcas de tiempo (virtual al reproducir escenarios)
+        self.clock = get_clock()
+        
+        self._reset(room_id, room_name, creator_socket, creator_name, on_room_closed, allow_rematch)
+    
+    def _reset(self, room_id, room_name, creator_socket, creator_name, on_room_closed, allow_rematch):
+        """Prepara la sala para una nueva sesión con un creador."""
         self.room_id = room_id
         self.room_name = room_name
+        self.created_at = self.clock.time()
+        self.games_played = 0
         
         # Información de los jugadores
-        self.player1 = {
-            "socket": creator_socket,
-            "name": creator_name,
-            "symbol": "X"
-        }
+        self.player1 = Player(creator_socket, creator_name, "X")
         self.player2 = None
         
         # Callback para cuando la sala se cierra
         self.on_room_closed = on_room_closed
         
+        # El resultado de cada partida se publica una sola vez (evento game_ended)
+        self.result_reported = False
+        
         # Estado del juego
         self.board = [" " for _ in range(9)]
+        self.board_key = 0
+        self.move_seq = 0
         self.current_turn = None
+        self.starting_turn = None
         self.status = STATUS_WAITING
         self.winner = None
-        
-        # Control de hilo
-        self.daemon = True
-        self.lock = threading.Lock()
         self.running = True
+        
+        # Revancha: jugadores que la han pedido tras terminar la partida
+        self.allow_rematch = allow_rematch
+        self.rematch_votes = set()
+        self.rematch_deadline = None
+        
+        # Chat: historial acotado de (nombre, texto), mensajes pendientes de envío por jugador
+        # e instantes de envío recientes
+        self.chat_history = deque(maxlen=CHAT_HISTORY)
+        self.chat_outbox = {1: [], 2: []}
+        self.chat_times = {1: deque(), 2: deque()}
+        
+        # Reinicio en caliente: sala suspendida (no notifica cierre) y plazo de reconexión
+        self.suspended = False
+        self.resume_deadline = None
     
-    def add_player(self, player_socket, player_name):
-        """Añade un segundo jugador a la sala."""
+    def reassign(self, room_id, room_name, creator_socket, creator_name, on_room_closed=None,
+                 allow_rematch=True):
+        """Reutiliza una sala cerrada de la reserva para un nuevo creador y despierta su hilo."""
+        with self.lock:
+            self._reset(room_id, room_name, creator_socket, creator_name, on_room_closed, allow_rematch)
+        self.reassigned.set()
+    
+    def to_snapshot(self):
+        """Devuelve el estado de la sala en un diccionario serializable."""
+        with self.lock:
+            return {
+                "id": self.room_id,
+                "name": self.room_name,
+                "players": [p.name if p else None for p in (self.player1, self.player2)],
+                "tokens": [p.token if p else None for p in (self.player1, self.player2)],
+                "board": "".join(self.board),
+                "turn": self.current_turn,
+                "starter": self.starting_turn,
+                "status": self.status,
+                "winner": self.winner
+            }
+    
+    @classmethod
+    def from_snapshot(cls, data, on_room_closed=None):
+        """Reconstruye una sala a partir de una instantánea, con los jugadores desconectados."""
+        p1_name, p2_name = data["players"]
+        # Instantáneas sin tokens: se generan nuevos y esos puestos no se pueden reanudar
+        p1_token, p2_token = data.get("tokens") or (None, None)
+        room = cls(data["id"], data["name"], None, p1_name, on_room_closed)
+        room.player1.token = p1_token or room.player1.token
+        if p2_name is not None:
+            room.player2 = Player(None, p2_name, "O", p2_token)
+        room.board = list(data["board"])
+        room.board_key = sum(SYMBOL_VALUES[cell] * weight for cell, weight in zip(room.board, CELL_WEIGHTS))
+        room.move_seq = 9 - room.board.count(" ")
+        room.current_turn = data["turn"]
+        room.starting_turn = data.get("starter", data["turn"])
+        room.status = data["status"]
+        room.winner = data["winner"]
+        room.resume_deadline = room.clock.time() + RESUME_TIMEOUT
+        return room
+    
+    def resume_player(self, token, player_socket):
+        """Reasocia un jugador reconectado al puesto de su token. Devuelve su número o None."""
+        with self.lock:
+            if not self.running:
+                return None
+                
+            for player_num, player in ((1, self.player1), (2, self.player2)):
+                # Comparación en tiempo constante (en bytes: el token recibido puede no ser ASCII)
+                if player and player.socket is None and \
+                        hmac.compare_digest(player.token.encode('utf-8'), token.encode('utf-8')):
+                    player.socket = player_socket
+                    self._queue_chat_history(player_num)
+                    if self._all_players_connected():
+                        self.resume_deadline = None
+                    return player_num
+            return None
+    
+    def send_state(self, player_num):
+        """Envía el estado completo de la partida a un jugador (al reanudar o al pedir SYNC)."""
+        with self.lock:
+            self.bus.publish(STATE_REQUESTED, self.room_id, player=player_num)
+    
+    def _status_for(self, player_num):
+        """Estado de la partida visto por un jugador (WIN/LOSS según el ganador)."""
+        if self.status == STATUS_WIN:
+            return STATUS_WIN if self.winner == player_num else STATUS_LOSS
+        return self.status
+    
+    def suspend(self):
+        """Detiene la sala sin notificar a los jugadores, para restaurarla en otro proceso."""
+        with self.lock:
+            self.suspended = True
+            self.running = False
+    
+    def close(self, reason):
+        """Cierra la sala a petición del administrador, avisando a los jugadores."""
+        with self.lock:
+            self.bus.publish(PLAYER_NOTICE, self.room_id, player=None, command=CMD_ERROR, args=(reason,))
+            self.running = False
+    
+    def _all_players_connected(self):
+        """Indica si todos los jugadores de la sala tienen una conexión activa."""
+        return all(p.socket is not None for p in (self.player1, self.player2) if p)
+    
+    def _resume_expired(self):
+        """Indica si venció el plazo de reconexión de una sala restaurada."""
+        return self.resume_deadline is not None and self.clock.time() > self.resume_deadline
+    
+    def add_player(self, player_socket, player_name, starter=None):
+        """Añade un segundo jugador a la sala; starter fija quién empieza (si no, se sortea)."""
         with self.lock:
             if self.player2 is not None:
                 return False
                 
-            self.player2 = {
-                "socket": player_socket,
-                "name": player_name,
-                "symbol": "O"
-            }
+            self.player2 = Player(player_socket, player_name, "O")
             
             # Sala llena, comenzar juego
             self.status = STATUS_PLAYING
-            self.current_turn = random.choice([1, 2])
+            self.current_turn = starter or random.choice([1, 2])
+            self.starting_turn = self.current_turn
             
+            # JOIN (con el token de reanudación) antes de la primera actualización del tablero
+            self.bus.publish(PLAYER_JOINED, self.room_id, player=2, name=player_name)
             self._notify_game_start()
+            self._queue_chat_history(2)
             return True
     
     def run(self):
-        """Método principal del hilo. Gestiona el ciclo de vida del juego."""
-        try:
-            while self.player2 is None and self.running:
-                time.sleep(0.5)
-                
-            if self.running:
-                self._update_game_state()
-                
-                while self.status == STATUS_PLAYING and self.running:
-                    time.sleep(0.1)
+        """Método principal del hilo. Si la sala pertenece a una reserva, espera a ser reasignada al cerrarse."""
+        while True:
+            while self.step():
+                self.clock.sleep(WAITING_POLL if self.player2 is None else PLAYING_POLL)
             
+            if not self.release_to_pool():
+                break
+                
+            self.reassigned.wait()
+            self.reassigned.clear()
+    
+    def release_to_pool(self):
+        """Devuelve la sala cerrada a su reserva. False si no se reutilizará."""
+        return not self.suspended and self.pool is not None and self.pool.release(self)
+    
+    def step(self):
+        """
+        Avanza un paso el ciclo de vida de la sesión: espera, partidas y revanchas.
+        Devuelve False cuando la sesión ha terminado (la sala ya está cerrada).
+        """
+        try:
+            if self._tick():
+                return True
         except Exception as e:
             print(f"Error en sala {self.room_id}: {e}")
-        finally:
-            self._cleanup()
+        self._cleanup()
+        return False
     
-    def process_move(self, player_num, position):
-        """Procesa un movimiento de un jugador."""
+    def _tick(self):
+        """Comprueba los plazos de la sesión y entrega el chat. False si la sesión debe terminar."""
+        if not self.running:
+            return False
+            
+        if self.status in (STATUS_WIN, STATUS_DRAW):
+            if not (self.allow_rematch and self._await_rematch()):
+                return False
+        elif self._resume_expired():
+            if self.player2 is None:
+                self.running = False
+            else:
+                self._forfeit_absent_players()
+            return False
+            
+        self._flush_chat()
+        return self.running
+    
+    def _await_rematch(self):
+        """Vigila el plazo para acordar la revancha. Devuelve False si venció sin acuerdo."""
+        now = self.clock.time()
+        if self.rematch_deadline is None:
+            self.rematch_deadline = now + REMATCH_TIMEOUT
+        elif now > self.rematch_deadline:
+            with self.lock:
+                # Evita que una petición tardía reinicie una sala que se está cerrando
+                if self.status != STATUS_PLAYING:
+                    self.running = False
+                    return False
+        return True
+    
+    def request_rematch(self, player_num):
+        """Registra la petición de revancha de un jugador; con ambas, reinicia el tablero."""
         with self.lock:
-            if player_num != self.current_turn:
+            if not (self.running and self.allow_rematch and self.status in (STATUS_WIN, STATUS_DRAW)):
+                self._reject(player_num, REJECT_NO_REMATCH)
                 return False
                 
-            if not (0 <= position <= 8) or self.board[position] != " ":
+            self.rematch_votes.add(player_num)
+            
+            if len(self.rematch_votes) < 2:
+                self.bus.publish(REMATCH_REQUESTED, self.room_id, player=player_num)
+                return True
+                
+            self._start_rematch()
+            return True
+    
+    def _start_rematch(self):
+        """Reinicia la partida en la misma sala, alternando quién empieza."""
+        self.board = [" " for _ in range(9)]
+        self.board_key = 0
+        self.move_seq = 0
+        self.winner = None
+        self.result_reported = False
+        self.rematch_votes.clear()
+        self.rematch_deadline = None
+        
+        self.starting_turn = 2 if self.starting_turn == 1 else 1
+        self.current_turn = self.starting_turn
+        self.status = STATUS_PLAYING
+        
+        print(f"Revancha en sala {self.room_name} (ID: {self.room_id})")
+        self._notify_game_start()
+    
+    def process_move(self, player_num, position):
+        """Procesa un movimiento de un jugador."""
+        with self.lock:
+            reason = self._validate_move(player_num, position)
+            if reason:
+                self._reject(player_num, reason)
                 return False
                 
             symbol = "X" if player_num == 1 else "O"
             self.board[position] = symbol
+            self.board_key += player_num * CELL_WEIGHTS[position]
+            self.move_seq += 1
             
             self.current_turn = 2 if player_num == 1 else 1
             
             self._check_game_state()
-            self._update_game_state()
+            self.bus.publish(MOVE_MADE, self.room_id, player=player_num, position=position, symbol=symbol,
+                             seq=self.move_seq)
+            self._finish_game()
+            
+            return True
+    
+    def _validate_move(self, player_num, position):
+        """Devuelve el motivo de rechazo de un movimiento, o None si es válido."""
+        if self.status != STATUS_PLAYING:
+            return REJECT_NOT_PLAYING
+        if player_num != self.current_turn:
+            return REJECT_NOT_YOUR_TURN
+        if not (0 <= position <= 8):
+            return REJECT_OUT_OF_RANGE
+        legal_mask, _, _ = get_move_table().lookup(self.board_key, player_num)
+        if not legal_mask & (1 << position):
+            return REJECT_OCCUPIED
+        return None
+    
+    def _reject(self, player_num, reason):
+        """Informa al jugador del motivo por el que se rechazó su petición."""
+        self.bus.publish(PLAYER_NOTICE, self.room_id, player=player_num, command=CMD_ERROR,
+                         args=(REJECT_MESSAGES[reason], reason))
+    
+    def hint(self, player_num):
+        """Envía al jugador la mejor jugada, las casillas libres y el resultado esperado."""
+        with self.lock:
+            if self.status != STATUS_PLAYING:
+                self._reject(player_num, REJECT_NOT_PLAYING)
+                return
+            if player_num != self.current_turn:
+                self._reject(player_num, REJECT_NOT_YOUR_TURN)
+                return
+                
+            move_table = get_move_table()
+            legal_mask, best_move, outcome = move_table.lookup(self.board_key, player_num)
             
+            if outcome == 0:
+                expected = STATUS_DRAW
+            else:
+                expected = STATUS_WIN if outcome == player_num else STATUS_LOSS
+                
+            legal = ",".join(str(p) for p in move_table.mask_to_positions(legal_mask))
+            self.bus.publish(PLAYER_NOTICE, self.room_id, player=player_num, command=CMD_HINT,
+                             args=(best_move, legal, expected))
+    
+    def chat(self, player_num, text):
+        """
+        Guarda un mensaje de chat y lo encola para ambos jugadores.
+        No escribe en los sockets: el hilo de la sala envía los mensajes pendientes agrupados.
+        """
+        text = text.replace("|", " ").replace("\n", " ").strip()[:CHAT_MAX_LENGTH]
+        if not text:
+            return False
+            
+        with self.lock:
+            now = self.clock.time()
+            recent = self.chat_times[player_num]
+            while recent and now - recent[0] > CHAT_RATE_WINDOW:
+                recent.popleft()
+            if len(recent) >= CHAT_RATE_LIMIT:
+                self._reject(player_num, REJECT_CHAT_RATE)
+                return False
+            recent.append(now)
+            
+            player = self.player1 if player_num == 1 else self.player2
+            message = (player.name, text)
+            self.chat_history.append(message)
+            for num in (1, 2):
+                self.chat_outbox[num].append(message)
             return True
     
+    def _queue_chat_history(self, player_num):
+        """Encola el historial del chat para un jugador que llega (o vuelve) a la sala."""
+        self.chat_outbox[player_num] = list(self.chat_history)
+    
+    def _flush_chat(self):
+        """Envía a cada jugador sus mensajes de chat pendientes en una sola escritura."""
+        if not (self.chat_outbox[1] or self.chat_outbox[2]):
+            return
+            
+        with self.lock:
+            for num in (1, 2):
+                pending = self.chat_outbox[num]
+                if not pending:
+                    continue
+                self.chat_outbox[num] = []
+                self.bus.publish(CHAT_MESSAGES, self.room_id, player=num, messages=pending)
+    
+    def _forfeit_absent_players(self):
+        """Cierra una sala restaurada cuyos jugadores no volvieron a tiempo."""
+        with self.lock:
+            present = [num for num, player in ((1, self.player1), (2, self.player2))
+                       if player and player.socket is not None]
+            # Los presentes reciben END de victoria por abandono
+            self._report_result(present[0] if len(present) == 1 else None, forfeit=True)
+            self.running = False
+    
+    def _report_result(self, winner, forfeit=False):
+        """
+        Publica una única vez el resultado de la partida (0 empate, 1/2 ganador, None sin
+        resultado); forfeit indica una victoria por abandono del rival.
+        """
+        if self.result_reported:
+            return
+        self.result_reported = True
+        self.bus.publish(GAME_ENDED, self.room_id, winner=winner, forfeit=forfeit)
+    
     def _check_game_state(self):
         """Comprueba si hay un ganador o un empate."""
+        winners = winner_table()
+        if winners is not None:
+            # Consulta directa en la tabla precalculada (1 = X = jugador 1, 2 = O = jugador 2)
+            winner = winners[self.board_key]
+            if winner:
+                self.winner = winner
+                self.status = STATUS_WIN
+            elif " " not in self.board:
+                self.status = STATUS_DRAW
+            return
+        
         win_combinations = [
             [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Filas
             [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Columnas
@@ -121,110 +503,73 @@ class GameRoom(threading.Thread):
             self.status = STATUS_DRAW
             return
     
-    def _update_game_state(self):
-        """Envía actualizaciones del estado del juego a ambos jugadores."""
-        if not self.running:
-            return
-            
-        if self.player2 is None:
-            self._send_to_player(self.player1["socket"], CMD_UPDATE, 
-                               STATUS_WAITING, self._board_to_string(), 0, "-")
-            return
-        
-        p1_status = self.status
-        p2_status = self.status
-        
-        if self.status == STATUS_WIN:
-            p1_status = STATUS_WIN if self.winner == 1 else STATUS_LOSS
-            p2_status = STATUS_WIN if self.winner == 2 else STATUS_LOSS
-        
-        self._send_to_player(self.player1["socket"], CMD_UPDATE, 
-                           p1_status, self._board_to_string(), 
-                           self.current_turn == 1, self.player2["name"])
-                           
-        self._send_to_player(self.player2["socket"], CMD_UPDATE, 
-                           p2_status, self._board_to_string(), 
-                           self.current_turn == 2, self.player1["name"])
-        
+    def _finish_game(self):
+        """
+        Si el último movimiento terminó la partida, la cuenta y publica el resultado. Se decide
+        por el estado de la partida aunque la sala se esté cerrando (p. ej. falló el envío del
+        último DELTA): los torneos esperan el resultado.
+        """
         if self.status in [STATUS_WIN, STATUS_DRAW]:
-            winner_name = None
-            if self.winner:
-                winner_name = self.player1["name"] if self.winner == 1 else self.player2["name"]
-                
-            end_message = "Empate" if self.status == STATUS_DRAW else f"Ganador: {winner_name}"
-            
-            self._send_to_player(self.player1["socket"], CMD_END, end_message)
-            self._send_to_player(self.player2["socket"], CMD_END, end_message)
+            self.games_played += 1
+            self._report_result(self.winner if self.status == STATUS_WIN else 0)
     
     def _notify_game_start(self):
-        """Notifica a ambos jugadores que el juego ha comenzado."""
-        self._send_to_player(self.player1["socket"], CMD_UPDATE, 
-                           STATUS_PLAYING, self._board_to_string(), 
-                           self.current_turn == 1, self.player2["name"])
-                           
-        self._send_to_player(self.player2["socket"], CMD_UPDATE, 
-                           STATUS_PLAYING, self._board_to_string(), 
-                           self.current_turn == 2, self.player1["name"])
+        """Publica el inicio de la partida (los jugadores reciben el estado completo)."""
+        self.bus.publish(GAME_STARTED, self.room_id, players=(self.player1.name, self.player2.name),
+                         starter=self.current_turn)
     
     def _board_to_string(self):
         """Convierte el tablero a una representación de cadena."""
         return ",".join(self.board)
     
-    def _send_to_player(self, socket, command, *args):
-        """Envía un mensaje a un jugador."""
-        try:
-            message = create_message(command, *args)
-            socket.sendall((message + "\n").encode('utf-8'))
-        except Exception as e:
-            print(f"Error al enviar mensaje: {e}")
-            self.running = False
-    
     def player_left(self, player_socket):
         """Gestiona la salida de un jugador."""
         with self.lock:
+            if self.player1 and self.player1.socket == player_socket:
+                player_num, leaving = 1, self.player1
+            elif self.player2 and self.player2.socket == player_socket:
+                player_num, leaving = 2, self.player2
+            else:
+                return
+            
+            # Quien sale no recibe más mensajes de la sala (el aviso al rival, el final ni el
+            # cierre): puede estar ya en otra, aunque esta se esté cerrando
+            leaving.socket = None
             if not self.running:
                 return
                 
-            if self.player1 and self.player1["socket"] == player_socket:
-                player_num = 1
-                other_socket = self.player2["socket"] if self.player2 else None
-                left_name = self.player1["name"]
-            elif self.player2 and self.player2["socket"] == player_socket:
-                player_num = 2
-                other_socket = self.player1["socket"]
-                left_name = self.player2["name"]
-            else:
-                return
+            self.bus.publish(PLAYER_LEFT, self.room_id, player=player_num, name=leaving.name, status=self.status)
             
-            if other_socket:
-                self._send_to_player(other_socket, CMD_ERROR, f"El jugador {left_name} ha abandonado la partida")
-                self._send_to_player(other_socket, CMD_END, f"Victoria por abandono")
+            if self.status == STATUS_PLAYING:
+                self._report_result(2 if player_num == 1 else 1, forfeit=True)
             
             self.running = False
     
     def _cleanup(self):
         self.running = False
         
-        # Notificar a los jugadores que la sala ha sido cerrada
-        try:
-            if self.player1 and self.player1["socket"]:
-                self._send_to_player(self.player1["socket"], CMD_ROOM_CLOSED, f"La sala {self.room_name} ha sido cerrada. Puedes crear o unirte a otra sala.")
-        except Exception as e:
-            print(f"Error al notificar al jugador 1: {e}")
+        if self.suspended:
+            # La sala continuará en el nuevo proceso; no se avisa a nadie
+            print(f"Sala {self.room_id} suspendida para reinicio.")
+            return
         
-        try:
-            if self.player2 and self.player2["socket"]:
-                self._send_to_player(self.player2["socket"], CMD_ROOM_CLOSED, f"La sala {self.room_name} ha sido cerrada. Puedes crear o unirte a otra sala.")
-        except Exception as e:
-            print(f"Error al notificar al jugador 2: {e}")
+        # Partida cerrada sin resultado (p. ej. error de envío); una terminada publica el suyo
+        # si no llegó a hacerlo (_report_result solo publica una vez)
+        if self.status == STATUS_PLAYING:
+            self._report_result(None)
+        elif self.status in (STATUS_WIN, STATUS_DRAW):
+            self._report_result(self.winner if self.status == STATUS_WIN else 0)
+        
+        # Notificar a los jugadores que la sala ha sido cerrada
+        self.bus.publish(ROOM_CLOSED, self.room_id, name=self.room_name)
         
         # Notificar al servidor que la sala se ha cerrado
         if self.on_room_closed:
             players = []
             if self.player1:
-                players.append((self.player1["socket"], self.player1["name"]))
+                players.append((self.player1.socket, self.player1.name))
             if self.player2:
-                players.append((self.player2["socket"], self.player2["name"]))
+                players.append((self.player2.socket, self.player2.name))
             
             self.on_room_closed(self.room_id, players)
         
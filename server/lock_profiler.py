@@ -0,0 +1,235 @@
+"""
+Perfilador opcional de contención de locks y latencia del servidor.
+
+Con el perfilado activo, los locks creados con `make_lock` registran por punto de
+llamada el tiempo de espera hasta adquirirlos y el tiempo que se retienen, y un hilo
+muestrea periódicamente la pila de cada hilo. El informe incluye las tablas de
+contención y las pilas en formato "collapsed" (una línea `pila;...;función cuenta`),
+compatible con flamegraph.pl y speedscope.
+Sin perfilado, `make_lock` devuelve un threading.Lock normal y no añade ningún coste.
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+# Intervalo por defecto entre muestras de pila (segundos)
+SAMPLE_INTERVAL = 0.01
+
+# Espera a partir de la cual una adquisición cuenta como contendida (segundos)
+CONTENDED_THRESHOLD = 0.0001
+
+# Perfilador activo (None = perfilado desactivado)
+_active = None
+
+def make_lock(name):
+    """Crea un lock con nombre: perfilado si el perfilador está activo, normal si no."""
+    if _active is not None:
+        return _active.wrap(name)
+    return threading.Lock()
+
+def enable(interval=SAMPLE_INTERVAL, output_dir=None):
+    """Activa el perfilado para los locks que se creen a partir de ahora y arranca el muestreo."""
+    global _active
+    if _active is None:
+        _active = LockProfiler(interval, output_dir)
+        _active.start()
+    return _active
+
+def get_profiler():
+    """Devuelve el perfilador activo, o None."""
+    return _active
+
+def _call_site(frame):
+    """Describe un punto de llamada como archivo:línea (función)."""
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{frame.f_lineno} ({code.co_name})"
+
+class LockStats:
+    """Tiempos acumulados de un lock en un punto de llamada."""
+    
+    __slots__ = ("acquisitions", "contended", "wait_total", "wait_max", "hold_total", "hold_max")
+    
+    def __init__(self):
+        """Inicializa los contadores a cero."""
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+
+class ProfiledLock:
+    """Lock que mide la espera y la retención de cada adquisición."""
+    
+    __slots__ = ("name", "profiler", "lock", "acquired_at", "site")
+    
+    def __init__(self, name, profiler):
+        """Envuelve un threading.Lock nuevo."""
+        self.name = name
+        self.profiler = profiler
+        self.lock = threading.Lock()
+        self.acquired_at = 0.0
+        self.site = None
+    
+    def _acquire(self, site, blocking=True, timeout=-1):
+        """Adquiere el lock registrando la espera desde el punto de llamada indicado."""
+        start = time.perf_counter()
+        acquired = self.lock.acquire(blocking, timeout)
+        now = time.perf_counter()
+        if acquired:
+            self.acquired_at = now
+            self.site = site
+            self.profiler.record_wait(self.name, site, now - start)
+        return acquired
+    
+    def acquire(self, blocking=True, timeout=-1):
+        """Adquiere el lock (misma interfaz que threading.Lock)."""
+        return self._acquire(_call_site(sys._getframe(1)), blocking, timeout)
+    
+    def release(self):
+        """Libera el lock registrando el tiempo de retención."""
+        held = time.perf_counter() - self.acquired_at
+        site = self.site
+        self.lock.release()
+        self.profiler.record_hold(self.name, site, held)
+    
+    def locked(self):
+        """Indica si el lock está adquirido."""
+        return self.lock.locked()
+    
+    def __enter__(self):
+        """Adquiere el lock en un bloque with (el punto de llamada es el with)."""
+        self._acquire(_call_site(sys._getframe(1)))
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Libera el lock al salir del bloque with."""
+        self.release()
+
+class LockProfiler:
+    """Acumula la contención de los locks perfilados y muestrea las pilas de los hilos."""
+    
+    def __init__(self, interval=SAMPLE_INTERVAL, output_dir=None):
+        """Inicializa los registros vacíos."""
+        self.interval = interval
+        self.output_dir = output_dir or os.getcwd()
+        self.stats = {}
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.running = False
+        
+        # Volcado pedido por señal; lo escribe el hilo de muestreo
+        self.dump_requested = threading.Event()
+    
+    def wrap(self, name):
+        """Crea un lock perfilado con el nombre indicado."""
+        return ProfiledLock(name, self)
+    
+    def _entry(self, name, site):
+        """Devuelve (creando si hace falta) las estadísticas de un lock en un punto de llamada."""
+        key = (name, site)
+        entry = self.stats.get(key)
+        if entry is None:
+            entry = self.stats[key] = LockStats()
+        return entry
+    
+    def record_wait(self, name, site, waited):
+        """Registra una adquisición y su tiempo de espera."""
+        with self.lock:
+            entry = self._entry(name, site)
+            entry.acquisitions += 1
+            entry.wait_total += waited
+            if waited > entry.wait_max:
+                entry.wait_max = waited
+            if waited >= CONTENDED_THRESHOLD:
+                entry.contended += 1
+    
+    def record_hold(self, name, site, held):
+        """Registra el tiempo de retención de una adquisición."""
+        with self.lock:
+            entry = self._entry(name, site)
+            entry.hold_total += held
+            if held > entry.hold_max:
+                entry.hold_max = held
+    
+    def start(self):
+        """Arranca el hilo de muestreo de pilas."""
+        self.running = True
+        threading.Thread(target=self._sample_loop, name="lock-profiler", daemon=True).start()
+    
+    def stop(self):
+        """Detiene el muestreo."""
+        self.running = False
+    
+    def _sample_loop(self):
+        """Toma una muestra de la pila de cada hilo en cada intervalo."""
+        own_ident = threading.get_ident()
+        while self.running:
+            threads = {thread.ident: type(thread).__name__ for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(threads.get(ident, "Thread"))
+                with self.lock:
+                    self.stacks[";".join(reversed(stack))] += 1
+            with self.lock:
+                self.samples += 1
+            if self.dump_requested.is_set():
+                self.dump_requested.clear()
+                try:
+                    self.dump()
+                except OSError as e:
+                    print(f"No se pudo guardar el perfil de locks: {e}")
+            time.sleep(self.interval)
+    
+    def contention_table(self):
+        """Tabla de contención ordenada por tiempo total de espera."""
+        with self.lock:
+            rows = sorted(self.stats.items(), key=lambda item: item[1].wait_total, reverse=True)
+            lines = [f"{'lock':<16} {'adq.':>8} {'contend.':>8} {'espera ms':>10} {'máx ms':>8} "
+                     f"{'retención ms':>12} {'máx ms':>8}  punto de llamada"]
+            for (name, site), entry in rows:
+                lines.append(f"{name:<16} {entry.acquisitions:>8} {entry.contended:>8} "
+                             f"{entry.wait_total * 1000:>10.2f} {entry.wait_max * 1000:>8.2f} "
+                             f"{entry.hold_total * 1000:>12.2f} {entry.hold_max * 1000:>8.2f}  {site}")
+        return "\n".join(lines)
+    
+    def collapsed_stacks(self):
+        """Pilas muestreadas en formato collapsed (una línea por pila con su número de muestras)."""
+        with self.lock:
+            return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+    
+    def report(self):
+        """Informe de texto con el resumen y la tabla de contención."""
+        elapsed = time.time() - self.started_at
+        return (f"Perfil de locks: {elapsed:.1f} s, {self.samples} muestras de pila\n\n"
+                f"{self.contention_table()}\n")
+    
+    def request_dump(self, signum=None, frame=None):
+        """
+        Manejador de SIGUSR1: solo pide el volcado. La señal puede llegar mientras el hilo
+        principal retiene self.lock (p. ej. al liberar un lock perfilado) y dump() lo toma.
+        """
+        self.dump_requested.set()
+    
+    def dump(self):
+        """Escribe el informe y las pilas collapsed en el directorio de salida. Devuelve las rutas."""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        report_path = os.path.join(self.output_dir, f"lock_profile_{stamp}.txt")
+        stacks_path = os.path.join(self.output_dir, f"lock_profile_{stamp}.folded")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(self.report())
+        with open(stacks_path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed_stacks() + "\n")
+        print(f"Perfil de locks guardado en {report_path} y {stacks_path}")
+        return report_path, stacks_path
@@ -0,0 +1,112 @@
+"""
+Medición del presupuesto de memoria por conexión del servidor.
+
+Arranca el servidor en un subproceso, abre N conexiones identificadas que quedan
+inactivas y mide el aumento de memoria residente (RSS) del proceso del servidor.
+Termina con código 1 si el coste por conexión supera el presupuesto indicado.
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+
+# Presupuesto por defecto (KB de RSS por conexión inactiva)
+DEFAULT_BUDGET_KB = 64
+
+def rss_kb(pid):
+    """Memoria residente de un proceso en KB (psutil si está disponible, si no /proc)."""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss // 1024
+    except ImportError:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    raise RuntimeError("No se puede medir la memoria del proceso")
+
+def raise_fd_limit(needed):
+    """Sube el límite de descriptores abiertos (lo heredan el servidor y este proceso)."""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = min(hard, max(soft, needed))
+    if target > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    if target < needed:
+        print(f"Aviso: el límite de descriptores ({target}) es menor que el necesario ({needed})")
+
+def wait_for_port(port, timeout=30):
+    """Espera a que el servidor acepte conexiones."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def measure(connections, port, settle):
+    """
+    Abre `connections` conexiones inactivas contra un servidor nuevo.
+    
+    Returns:
+        tuple: (RSS inicial KB, RSS con las conexiones KB, conexiones abiertas)
+    """
+    raise_fd_limit(connections + 256)
+    server = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, str(port), '--snapshot', ''],
+        stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT
+    )
+    clients = []
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError("El servidor no arrancó")
+        time.sleep(settle)
+        baseline = rss_kb(server.pid)
+        
+        for i in range(connections):
+            client = socket.create_connection(("127.0.0.1", port))
+            client.sendall(f"idle{i}".encode('utf-8'))
+            clients.append(client)
+        
+        time.sleep(settle)
+        loaded = rss_kb(server.pid)
+        return baseline, loaded, len(clients)
+    finally:
+        for client in clients:
+            client.close()
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Mide la memoria del servidor por conexión inactiva')
+    parser.add_argument('--connections', type=int, default=10000, help='Conexiones inactivas a abrir')
+    parser.add_argument('--port', type=int, default=9500, help='Puerto del servidor de prueba')
+    parser.add_argument('--budget-kb', type=float, default=DEFAULT_BUDGET_KB, help='Máximo de KB por conexión')
+    parser.add_argument('--settle', type=float, default=2.0, help='Segundos de espera antes de cada medición')
+    args = parser.parse_args()
+    
+    baseline, loaded, opened = measure(args.connections, args.port, args.settle)
+    per_connection = (loaded - baseline) / max(1, opened)
+    
+    print(f"Conexiones inactivas: {opened}")
+    print(f"RSS inicial: {baseline / 1024:.1f} MB  RSS con conexiones: {loaded / 1024:.1f} MB")
+    print(f"Coste por conexión: {per_connection:.1f} KB (presupuesto: {args.budget_kb:.0f} KB)")
+    print(f"Proyección para 10.000 conexiones: {per_connection * 10000 / 1024:.1f} MB")
+    
+    if per_connection > args.budget_kb:
+        print("Presupuesto de memoria superado")
+        sys.exit(1)
+    print("Dentro del presupuesto de memoria")
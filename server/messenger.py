@@ -0,0 +1,153 @@
+"""
+Mensajes del protocolo a los jugadores de una sala.
+
+GameRoom no escribe en los sockets: publica sus cambios en el bus de eventos y un
+PlayerMessenger, suscrito de forma síncrona a los eventos de su sala, los traduce a
+mensajes (JOIN, UPDATE, DELTA, END, CHAT...) y los envía en el hilo que publica. Así
+los jugadores reciben los mensajes en orden y sin esperar al lote del despachador,
+mientras los observadores (torneos, estadísticas, registro) siguen recibiendo los
+mismos eventos por lotes.
+"""
+
+from events import (
+    ALL_EVENTS, GAME_STARTED, MOVE_MADE, GAME_ENDED, PLAYER_LEFT, PLAYER_JOINED,
+    STATE_REQUESTED, REMATCH_REQUESTED, CHAT_MESSAGES, PLAYER_NOTICE, ROOM_CLOSED
+)
+from game_room import STATUS_WAITING, STATUS_PLAYING, CMD_UPDATE, CMD_END, CMD_ERROR, CMD_ROOM_CLOSED
+from protocol import (
+    CMD_JOIN, CMD_DELTA, CMD_REMATCH, CMD_CHAT, REMATCH_PENDING, REMATCH_OFFERED, create_message
+)
+
+class PlayerMessenger:
+    """Suscriptor síncrono que envía a los jugadores de una sala los mensajes de sus eventos."""
+    
+    def __init__(self, room):
+        """Asocia el mensajero a la sala (sin suscribirlo todavía)."""
+        self.room = room
+        self.room_id = None
+        self.handlers = {
+            GAME_STARTED: self._game_started,
+            MOVE_MADE: self._move_made,
+            GAME_ENDED: self._game_ended,
+            PLAYER_JOINED: self._player_joined,
+            PLAYER_LEFT: self._player_left,
+            STATE_REQUESTED: self._state_requested,
+            REMATCH_REQUESTED: self._rematch_requested,
+            CHAT_MESSAGES: self._chat_messages,
+            PLAYER_NOTICE: self._player_notice,
+            ROOM_CLOSED: self._room_closed
+        }
+    
+    def attach(self):
+        """Suscribe el mensajero a los eventos de la sala actual. Devuelve el mensajero."""
+        self.room_id = self.room.room_id
+        self.room.bus.subscribe(ALL_EVENTS, self.deliver, sync=True, room_id=self.room_id)
+        return self
+    
+    def detach(self):
+        """Cancela la suscripción (el servidor cancela las de la sala al cerrarse)."""
+        self.room.bus.unsubscribe(ALL_EVENTS, self.deliver, room_id=self.room_id)
+    
+    def deliver(self, event):
+        """Envía los mensajes que corresponden a un evento de la sala."""
+        handler = self.handlers.get(event.name)
+        if handler:
+            handler(**event.data)
+    
+    def _player(self, player_num):
+        """Jugador de la sala por número (None si el puesto está libre)."""
+        return self.room.player1 if player_num == 1 else self.room.player2
+    
+    def _send(self, player, command, *args):
+        """Envía un mensaje a un jugador conectado."""
+        self._send_raw(player, create_message(command, *args) + "\n")
+    
+    def _send_all(self, command, *args):
+        """Envía el mismo mensaje a todos los jugadores conectados."""
+        message = create_message(command, *args) + "\n"
+        for player in (self.room.player1, self.room.player2):
+            self._send_raw(player, message)
+    
+    def _send_raw(self, player, text):
+        """Escribe texto ya formateado en el socket del jugador; un error detiene la sala."""
+        if player is None or player.socket is None:
+            # Puesto libre o jugador pendiente de reconexión tras un reinicio
+            return
+        try:
+            player.socket.sendall(text.encode('utf-8'))
+        except Exception as e:
+            print(f"Error al enviar mensaje: {e}")
+            self.room.running = False
+    
+    def _send_state(self, player_num):
+        """Envía a un jugador UPDATE|estado|tablero|turno|oponente|secuencia|símbolo|token."""
+        room = self.room
+        player, other = self._player(player_num), self._player(3 - player_num)
+        if player is None:
+            return
+        self._send(player, CMD_UPDATE, room._status_for(player_num), room._board_to_string(),
+                   room.current_turn == player_num, other.name if other else "-", room.move_seq,
+                   player.symbol, player.token)
+    
+    def _game_started(self, players, starter):
+        """Estado completo de la nueva partida a ambos jugadores."""
+        self._send_state(1)
+        self._send_state(2)
+    
+    def _move_made(self, player, position, symbol, seq):
+        """Cambio del movimiento a ambos jugadores, con su turno y estado."""
+        room = self.room
+        if not room.running:
+            return
+        for player_num in (1, 2):
+            self._send(self._player(player_num), CMD_DELTA, seq, position, symbol,
+                       room.current_turn == player_num, room._status_for(player_num))
+    
+    def _game_ended(self, winner, forfeit=False):
+        """Final de la partida; una partida cerrada sin resultado no se anuncia."""
+        if forfeit:
+            self._send_all(CMD_END, "Victoria por abandono")
+        elif winner == 0:
+            self._send_all(CMD_END, "Empate")
+        elif winner is not None:
+            self._send_all(CMD_END, f"Ganador: {self._player(winner).name}")
+    
+    def _player_joined(self, player, name):
+        """JOIN con el token de reanudación, solo a quien ocupa el puesto."""
+        room = self.room
+        joined = self._player(player)
+        self._send(joined, CMD_JOIN, room.room_id, room.room_name, joined.token)
+    
+    def _player_left(self, player, name, status):
+        """Aviso al rival (quien sale ya no tiene conexión en la sala)."""
+        if status == STATUS_PLAYING:
+            self._send_all(CMD_ERROR, f"El jugador {name} ha abandonado la partida")
+        elif status != STATUS_WAITING and self.room.allow_rematch:
+            # Partida terminada: el rival ya no puede aceptar la revancha
+            self._send_all(CMD_ERROR, f"El jugador {name} ha abandonado la sala")
+    
+    def _state_requested(self, player):
+        """Estado completo a un jugador (al reanudar o al pedir SYNC)."""
+        self._send_state(player)
+    
+    def _rematch_requested(self, player):
+        """Confirmación a quien pide la revancha y oferta al rival."""
+        requester = self._player(player)
+        self._send(requester, CMD_REMATCH, REMATCH_PENDING)
+        self._send(self._player(3 - player), CMD_REMATCH, REMATCH_OFFERED, requester.name)
+    
+    def _chat_messages(self, player, messages):
+        """Mensajes de chat pendientes de un jugador en una sola escritura."""
+        self._send_raw(self._player(player),
+                       "".join(create_message(CMD_CHAT, name, text) + "\n" for name, text in messages))
+    
+    def _player_notice(self, player, command, args):
+        """Mensaje dirigido a un jugador (rechazos, pistas) o a ambos si player es None."""
+        if player is None:
+            self._send_all(command, *args)
+        else:
+            self._send(self._player(player), command, *args)
+    
+    def _room_closed(self, name):
+        """Aviso de cierre de la sala a los jugadores que siguen en ella."""
+        self._send_all(CMD_ROOM_CLOSED, f"La sala {name} ha sido cerrada. Puedes crear o unirte a otra sala.")
@@ -0,0 +1,131 @@
+"""
+Tabla precalculada de jugadas por estado del tablero.
+
+Para cada par (jugador que mueve, clave en base 3 del tablero) guarda en un entero
+las casillas libres, la mejor jugada y el resultado con juego perfecto, de modo que
+validar un MOVE o responder un HINT es una sola consulta a una lista.
+Usa las tablas de analysis.py si NumPy está disponible; si no, calcula el minimax
+en Python puro una única vez.
+"""
+
+# Número de claves posibles (3**9) y peso de cada casilla
+NUM_KEYS = 3 ** 9
+CELL_WEIGHTS = [3 ** i for i in range(9)]
+
+# Resultados con juego perfecto (ganador: 0 tablas, 1 X/jugador 1, 2 O/jugador 2)
+OUTCOME_DRAW = 0
+
+# Disposición de cada entrada: bits 0-8 casillas libres, 9-12 mejor jugada + 1, 13-14 resultado
+LEGAL_MASK = 0x1FF
+BEST_SHIFT = 9
+OUTCOME_SHIFT = 13
+
+WIN_LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6)
+)
+
+def _decode(key):
+    """Convierte una clave en la lista de casillas (0 vacío, 1 X, 2 O)."""
+    return [(key // weight) % 3 for weight in CELL_WEIGHTS]
+
+def _legal_mask(cells):
+    """Máscara de bits de las casillas libres."""
+    mask = 0
+    for position, cell in enumerate(cells):
+        if cell == 0:
+            mask |= 1 << position
+    return mask
+
+def _pack(legal_mask, best_move, outcome):
+    """Empaqueta una entrada de la tabla en un entero."""
+    return legal_mask | ((best_move + 1) << BEST_SHIFT) | (outcome << OUTCOME_SHIFT)
+
+def _build_from_analysis(tables):
+    """Construye las entradas a partir de las tablas vectorizadas de NumPy."""
+    entries = [0] * (2 * NUM_KEYS)
+    scores = tables.score.tolist()
+    best_moves = tables.best_move.tolist()
+    for key, mover in zip(tables.keys.tolist(), tables.movers.tolist()):
+        score = scores[mover - 1][key]
+        outcome = 1 if score > 0 else 2 if score < 0 else OUTCOME_DRAW
+        entries[(mover - 1) * NUM_KEYS + key] = _pack(_legal_mask(_decode(key)),
+                                                      best_moves[mover - 1][key], outcome)
+    return entries
+
+def _build_pure_python():
+    """Construye las entradas con un minimax memorizado (sin NumPy)."""
+    entries = [0] * (2 * NUM_KEYS)
+    scores = {}
+    
+    def solve(key, mover):
+        index = (mover - 1) * NUM_KEYS + key
+        if index in scores:
+            return scores[index]
+        
+        cells = _decode(key)
+        filled = 9 - cells.count(0)
+        winner = 0
+        for a, b, c in WIN_LINES:
+            if cells[a] and cells[a] == cells[b] == cells[c]:
+                winner = cells[a]
+                break
+        
+        best_move = -1
+        if winner:
+            score = (10 - filled) if winner == 1 else -(10 - filled)
+        elif filled == 9:
+            score = 0
+        else:
+            score = None
+            for position, cell in enumerate(cells):
+                if cell:
+                    continue
+                child = solve(key + mover * CELL_WEIGHTS[position], 3 - mover)
+                if score is None or (child > score if mover == 1 else child < score):
+                    score, best_move = child, position
+        
+        outcome = 1 if score > 0 else 2 if score < 0 else OUTCOME_DRAW
+        entries[index] = _pack(_legal_mask(cells), best_move, outcome)
+        scores[index] = score
+        return score
+    
+    solve(0, 1)
+    solve(0, 2)
+    return entries
+
+class MoveTable:
+    """Consulta O(1) de jugadas legales, mejor jugada y resultado por estado."""
+    
+    __slots__ = ("entries",)
+    
+    def __init__(self):
+        """Construye la tabla (con NumPy si está disponible)."""
+        try:
+            from analysis import get_tables
+            self.entries = _build_from_analysis(get_tables())
+        except ImportError:
+            self.entries = _build_pure_python()
+    
+    def lookup(self, key, mover):
+        """
+        Devuelve (máscara de casillas libres, mejor jugada, resultado) del estado.
+        La mejor jugada es -1 en posiciones terminales o inalcanzables.
+        """
+        entry = self.entries[(mover - 1) * NUM_KEYS + key]
+        return entry & LEGAL_MASK, ((entry >> BEST_SHIFT) & 0xF) - 1, entry >> OUTCOME_SHIFT
+    
+    @staticmethod
+    def mask_to_positions(mask):
+        """Convierte una máscara de casillas en la lista de posiciones."""
+        return [position for position in range(9) if mask & (1 << position)]
+
+_table = None
+
+def get_move_table():
+    """Devuelve la tabla compartida, construyéndola la primera vez."""
+    global _table
+    if _table is None:
+        _table = MoveTable()
+    return _table
@@ -13,6 +13,18 @@ CMD_ERROR = "ERROR"          # Mensaje de error
 CMD_LIST = "LIST"            # Listar salas disponibles
 CMD_LEAVE = "LEAVE"          # Abandonar una sala
 CMD_ROOM_CLOSED = "ROOM_CLOSED"  # Notificación de sala cerrada
+CMD_RESUME = "RESUME"        # Reanudar una partida tras un reinicio del servidor
+CMD_HINT = "HINT"            # Sugerencia de jugada (mejor casilla, libres, resultado)
+CMD_REMATCH = "REMATCH"      # Pedir (o notificar) la revancha tras terminar la partida
+CMD_CHAT = "CHAT"            # Mensaje de chat de la sala (CHAT|texto / CHAT|nombre|texto)
+CMD_DELTA = "DELTA"          # Cambio tras un movimiento (DELTA|secuencia|casilla|símbolo|turno|estado)
+CMD_SYNC = "SYNC"            # Pedir el estado completo (responde con UPDATE)
+CMD_TOURNAMENT_CREATE = "TOURNAMENT_CREATE"  # Crear un torneo (suizo o eliminación directa)
+CMD_TOURNAMENT_JOIN = "TOURNAMENT_JOIN"      # Inscribirse en un torneo
+CMD_TOURNAMENT_START = "TOURNAMENT_START"    # Iniciar un torneo (su creador)
+CMD_TOURNAMENT_LIST = "TOURNAMENT_LIST"      # Listar torneos en inscripción
+CMD_TOURNAMENT_ROUND = "TOURNAMENT_ROUND"    # Notificación de nueva ronda
+CMD_TOURNAMENT_END = "TOURNAMENT_END"        # Clasificación final
 
 # Separador para los mensajes
 SEP = "|"
@@ -24,6 +36,39 @@ STATUS_WIN = "WIN"           # Victoria
 STATUS_LOSS = "LOSS"         # Derrota
 STATUS_DRAW = "DRAW"         # Empate
 
+# Estados de una petición de revancha: REMATCH|PENDING o REMATCH|OFFERED|nombre
+REMATCH_PENDING = "PENDING"  # Esperando a que el rival acepte
+REMATCH_OFFERED = "OFFERED"  # El rival ha pedido la revancha
+
+# Motivos de rechazo de un movimiento: ERROR|mensaje|código
+REJECT_NOT_PLAYING = "NOT_PLAYING"      # La partida no está en curso
+REJECT_NOT_YOUR_TURN = "NOT_YOUR_TURN"  # No es el turno del jugador
+REJECT_OUT_OF_RANGE = "OUT_OF_RANGE"    # Posición fuera del tablero
+REJECT_OCCUPIED = "OCCUPIED"            # Casilla ocupada
+REJECT_BAD_POSITION = "BAD_POSITION"    # Posición no numérica
+REJECT_NOT_IN_ROOM = "NOT_IN_ROOM"      # El jugador no está en ninguna sala
+REJECT_NO_REMATCH = "NO_REMATCH"        # No hay revancha disponible en la sala
+REJECT_CHAT_RATE = "CHAT_RATE"          # Demasiados mensajes de chat seguidos
+
+REJECT_MESSAGES = {
+    REJECT_NOT_PLAYING: "La partida no está en curso",
+    REJECT_NOT_YOUR_TURN: "No es tu turno",
+    REJECT_OUT_OF_RANGE: "Posición fuera del tablero",
+    REJECT_OCCUPIED: "La casilla ya está ocupada",
+    REJECT_BAD_POSITION: "Posición no válida",
+    REJECT_NOT_IN_ROOM: "No estás en ninguna sala",
+    REJECT_NO_REMATCH: "No hay revancha disponible",
+    REJECT_CHAT_RATE: "Estás enviando mensajes demasiado rápido"
+}
+
+# Comandos del protocolo por nombre, para reutilizar la constante al analizar un mensaje
+KNOWN_COMMANDS = {command: command for command in (
+    CMD_CREATE, CMD_JOIN, CMD_MOVE, CMD_UPDATE, CMD_END, CMD_ERROR, CMD_LIST, CMD_LEAVE,
+    CMD_ROOM_CLOSED, CMD_RESUME, CMD_HINT, CMD_REMATCH, CMD_CHAT, CMD_DELTA, CMD_SYNC,
+    CMD_TOURNAMENT_CREATE, CMD_TOURNAMENT_JOIN, CMD_TOURNAMENT_START, CMD_TOURNAMENT_LIST,
+    CMD_TOURNAMENT_ROUND, CMD_TOURNAMENT_END
+)}
+
 def create_message(command, *args):
     """Crea un mensaje con el formato del protocolo."""
     return f"{command}{SEP}{SEP.join(str(arg) for arg in args)}"
@@ -31,6 +76,9 @@ def create_message(command, *args):
 def parse_message(message):
     """Analiza un mensaje recibido según el protocolo."""
     parts = message.strip().split(SEP)
-    command = parts[0]
+    # Un comando conocido se sustituye por su constante, de modo que los mensajes no
+    # retienen cada uno su copia; el resto son datos de la red y no se internan (sys.intern
+    # los añadiría a la tabla de cadenas del intérprete)
+    command = KNOWN_COMMANDS.get(parts[0], parts[0])
     args = parts[1:] if len(parts) > 1 else []
     return command, args 
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Códigos cortos de sala.
+Cada sala se identifica con un código de 5 caracteres de un alfabeto sin símbolos
+ambiguos (sin 0/O ni 1/I), fácil de dictar y de compartir en un enlace de invitación.
+Los códigos salen de un contador permutado (no son consecutivos a simple vista), no
+se repiten mientras estén en uso y se reciclan al cerrarse la sala.
+"""
+
+import random
+import threading
+from collections import deque
+
+# Alfabeto de 32 símbolos y longitud del código (32**5 = 33.554.432 códigos)
+ALPHABET = "23456789ABCDEFGHJKLMNPQRSTUVWXYZ"
+CODE_LENGTH = 5
+CODE_SPACE = len(ALPHABET) ** CODE_LENGTH
+
+# Multiplicador impar: con un espacio potencia de dos, n -> n * M + desplazamiento es una biyección
+PERMUTATION_MULTIPLIER = 0x9E3779B1 % CODE_SPACE | 1
+
+# Códigos liberados que deben acumularse antes de reutilizar el más antiguo
+RECYCLE_AFTER = 1024
+
+def encode(number):
+    """Convierte un número del espacio de códigos en su código de sala."""
+    chars = []
+    for _ in range(CODE_LENGTH):
+        number, digit = divmod(number, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+def normalize(code):
+    """Normaliza un código escrito por un usuario (mayúsculas, sin espacios)."""
+    return code.strip().upper()
+
+def is_code(code):
+    """Indica si una cadena tiene el formato de un código de sala."""
+    return len(code) == CODE_LENGTH and all(char in ALPHABET for char in code)
+
+class RoomCodeAllocator:
+    """Asigna códigos de sala únicos y recicla los de las salas cerradas."""
+    
+    def __init__(self, offset=None):
+        """Inicializa el contador con un desplazamiento aleatorio por proceso."""
+        self.offset = random.randrange(CODE_SPACE) if offset is None else offset
+        self.counter = 0
+        self.in_use = set()
+        self.released = deque()
+        self.lock = threading.Lock()
+    
+    def allocate(self):
+        """Devuelve un código libre."""
+        with self.lock:
+            while True:
+                if len(self.released) > RECYCLE_AFTER or self.counter >= CODE_SPACE:
+                    if not self.released:
+                        raise RuntimeError("No quedan códigos de sala disponibles")
+                    code = self.released.popleft()
+                else:
+                    code = encode((self.counter * PERMUTATION_MULTIPLIER + self.offset) % CODE_SPACE)
+                    self.counter += 1
+                
+                # Un código reservado (sala restaurada) no puede asignarse de nuevo
+                if code not in self.in_use:
+                    self.in_use.add(code)
+                    return code
+    
+    def reserve(self, code):
+        """Marca como usado un código existente (salas restauradas de una instantánea)."""
+        with self.lock:
+            if is_code(code):
+                self.in_use.add(code)
+    
+    def release(self, code):
+        """Libera el código de una sala cerrada para reutilizarlo más adelante."""
+        with self.lock:
+            if code in self.in_use:
+                self.in_use.discard(code)
+                self.released.append(code)
@@ -0,0 +1,61 @@
+"""
+Reserva de salas de juego.
+Las salas cerradas no terminan su hilo: quedan en espera y se reasignan a la
+siguiente sala que se cree, evitando crear un hilo y un objeto nuevos por partida.
+"""
+
+import threading
+from collections import deque
+
+from game_room import GameRoom
+
+class RoomPool:
+    """Reserva de salas cerradas cuyos hilos esperan ser reasignados."""
+    
+    def __init__(self, max_idle=64):
+        """Inicializa la reserva vacía con un máximo de salas en espera."""
+        self.max_idle = max_idle
+        self.idle = deque()
+        self.lock = threading.Lock()
+        
+        # Contadores de salas creadas y reutilizadas
+        self.created = 0
+        self.reused = 0
+    
+    def acquire(self, room_id, room_name, creator_socket, creator_name, on_room_closed=None,
+                allow_rematch=True):
+        """Devuelve una sala en marcha para el creador, reutilizando una en espera si la hay."""
+        with self.lock:
+            room = self.idle.pop() if self.idle else None
+            if room is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        
+        if room is not None:
+            room.reassign(room_id, room_name, creator_socket, creator_name, on_room_closed, allow_rematch)
+            self.launch(room, reused=True)
+            return room
+        
+        room = GameRoom(room_id, room_name, creator_socket, creator_name, on_room_closed, allow_rematch)
+        room.pool = self
+        self.launch(room, reused=False)
+        return room
+    
+    def launch(self, room, reused):
+        """Pone en marcha una sala: arranca su hilo (una reutilizada ya lo tiene y reassign lo despierta)."""
+        if not reused:
+            room.start()
+    
+    def release(self, room):
+        """Devuelve a la reserva una sala cerrada. False si la reserva está llena (el hilo termina)."""
+        with self.lock:
+            if len(self.idle) >= self.max_idle:
+                return False
+            self.idle.append(room)
+            return True
+    
+    def stats(self):
+        """Devuelve los contadores de la reserva."""
+        with self.lock:
+            return {"idle": len(self.idle), "created": self.created, "reused": self.reused}
@@ -0,0 +1,603 @@
+"""
+Escenarios de protocolo deterministas sobre el transporte en memoria.
+
+Cada escenario monta un servidor sin sockets reales ni hilos de sala: los clientes se
+conectan con MemoryTransport y sus mensajes se procesan en el acto, las salas avanzan
+con GameRoom.step() y el tiempo es un VirtualClock que solo avanza cuando el escenario
+lo pide. Una semilla genera una secuencia aleatoria de acciones (crear, unirse, mover,
+salir, desconectar, perder la conexión sin aviso, chat, revancha, SYNC, avanzar el
+reloj...) y tras cada acción se
+comprueban invariantes del servidor y de la vista de cada cliente. La misma semilla
+produce siempre la misma transcripción, así que un fallo se reproduce con --replay.
+
+Además de los escenarios aleatorios hay guiones (SCRIPTS) que recorren paso a paso los
+caminos con más estado, que el azar rara vez alcanza (un envío fallido al terminar la
+partida, la reanudación con token tras un reinicio en caliente, un torneo completo); se
+ejecutan con varias semillas (cambia quién empieza) y se reproducen con
+--replay SEMILLA --script NOMBRE.
+"""
+
+import io
+import os
+import json
+import sys
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import contextlib
+
+from events import EventBus, get_bus, set_bus, ROOM_CLOSED, GAME_ENDED
+from game_room import PLAYING_POLL, STATUS_PLAYING, STATUS_WIN, STATUS_DRAW, CELL_WEIGHTS, SYMBOL_VALUES
+from move_table import get_move_table
+from room_pool import RoomPool
+from server import TicTacToeServer
+from tournament import KNOCKOUT_REPLAYS
+from transport import MemoryTransport, VirtualClock, set_clock
+
+# Acciones de los escenarios y su peso relativo
+ACTIONS = {
+    "connect": 3,
+    "create": 4,
+    "join": 5,
+    "move": 20,
+    "leave": 2,
+    "disconnect": 1,
+    "drop": 1,
+    "chat": 3,
+    "rematch": 3,
+    "list": 1,
+    "sync": 1,
+    "hint": 1,
+    "advance": 4
+}
+
+# Saltos del reloj virtual (segundos): sondeo, límite de chat, revancha y reanudación
+ADVANCE_STEPS = (0.1, 1, 11, 31, 61)
+
+# Líneas de la salida del servidor que indican un fallo interno
+ERROR_MARKERS = ("Error al procesar mensaje", "Error en sala", "Error al manejar cliente",
+                 "Error al entregar el evento")
+
+# Campos aleatorios en cada ejecución (token de reanudación, identificador de torneo) de los
+# mensajes recibidos y enviados: {comando: (posición, sustituto)}
+RECEIVED_SECRETS = {
+    "CREATE": (3, "<token>"),
+    "JOIN": (3, "<token>"),
+    "UPDATE": (7, "<token>"),
+    "TOURNAMENT_CREATE": (1, "<torneo>"),
+    "TOURNAMENT_JOIN": (1, "<torneo>"),
+    "TOURNAMENT_ROUND": (1, "<torneo>"),
+    "TOURNAMENT_END": (1, "<torneo>")
+}
+SENT_SECRETS = {
+    "RESUME": (2, "<token>"),
+    "TOURNAMENT_JOIN": (1, "<torneo>"),
+    "TOURNAMENT_START": (1, "<torneo>")
+}
+
+def redact(line, secrets):
+    """Sustituye el campo aleatorio de un mensaje para que la transcripción sea reproducible."""
+    parts = line.split("|")
+    field, placeholder = secrets.get(parts[0], (None, None))
+    if field is None or len(parts) <= field:
+        return line
+    parts[field] = placeholder
+    return "|".join(parts)
+
+class ScenarioError(Exception):
+    """Invariante incumplida en un escenario."""
+
+class SteppedRoomPool(RoomPool):
+    """Reserva de salas sin hilos: el escenario avanza cada sala en marcha con step()."""
+    
+    def __init__(self, max_idle=64):
+        """Inicializa la reserva sin salas en marcha."""
+        super().__init__(max_idle)
+        self.live = []
+    
+    def launch(self, room, reused):
+        """Registra la sala para avanzarla en cada paso, en lugar de arrancar su hilo."""
+        self.live.append(room)
+    
+    def step_rooms(self):
+        """Avanza un paso cada sala; las que terminan vuelven a la reserva."""
+        for room in list(self.live):
+            if not room.step():
+                self.live.remove(room)
+                room.release_to_pool()
+
+class ClientView:
+    """Conexión de un cliente del escenario y el estado de la partida tal como lo ve."""
+    
+    def __init__(self, name, sock, server_socket, session):
+        """Asocia el cliente a sus dos extremos de conexión."""
+        self.name = name
+        self.socket = sock
+        self.server_socket = server_socket
+        self.session = session
+        self.connected = True
+        self.partial = b""
+        self.board = None
+        self.seq = 0
+        self.token = None
+        self.tournament_end = None
+        self.room_closed = False
+        self.errors = []
+    
+    def receive(self, data):
+        """Aplica a la vista las líneas completas recibidas. Devuelve las líneas."""
+        data = self.partial + data
+        data, _, self.partial = data.rpartition(b"\n")
+        lines = [line for line in data.decode("utf-8").split("\n") if line] if data else []
+        self.room_closed = False
+        for line in lines:
+            parts = line.split("|")
+            if parts[0] == "ROOM_CLOSED":
+                self.room_closed = True
+            elif parts[0] in ("CREATE", "JOIN"):
+                self.token = parts[3]
+            elif parts[0] == "UPDATE":
+                self.board = parts[2].split(",")
+                self.seq = int(parts[5])
+                self.token = parts[7]
+            elif parts[0] == "TOURNAMENT_END":
+                self.tournament_end = parts[2]
+            elif parts[0] == "DELTA":
+                seq = int(parts[1])
+                if self.board is None or seq != self.seq + 1:
+                    self.errors.append(f"DELTA fuera de secuencia: {line} (última {self.seq})")
+                    continue
+                self.board[int(parts[2])] = parts[3]
+                self.seq = seq
+        return lines
+
+class Scenario:
+    """Servidor en memoria con reloj virtual y clientes guiados por una semilla."""
+    
+    def __init__(self, seed, max_clients=6, output=None):
+        """Prepara el servidor del escenario con su propio reloj y bus de eventos."""
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.max_clients = max_clients
+        # Aleatoriedad del servidor (quién empieza, desplazamiento de los códigos de sala)
+        random.seed(seed)
+        
+        self.clock = VirtualClock()
+        self.previous_clock = set_clock(self.clock)
+        self.previous_bus = get_bus()
+        
+        self.clients = []
+        self.transcript = []
+        
+        # Conexiones perdidas que el servidor aún no ha detectado
+        self.unnoticed = []
+        
+        # Invariantes comprobadas al cerrarse cada sala (se reportan en check())
+        self.failures = []
+        
+        # Resultados publicados [(sala, ganador)], tal como los reciben los observadores
+        self.results = []
+        
+        # Salida del servidor ya revisada por settle()
+        self.output = output or io.StringIO()
+        self.checked = 0
+        
+        self.start_server()
+    
+    def start_server(self, snapshot_path=None):
+        """Crea el servidor en memoria con un bus de eventos nuevo (como un proceso nuevo)."""
+        self.bus = EventBus()
+        set_bus(self.bus)
+        self.bus.subscribe(ROOM_CLOSED, self.on_room_closed, sync=True)
+        self.bus.subscribe(GAME_ENDED, lambda event: self.results.append((event.room_id, event.data["winner"])))
+        
+        self.transport = MemoryTransport()
+        self.server = TicTacToeServer(snapshot_path=snapshot_path, transport=self.transport)
+        self.pool = self.server.room_pool = SteppedRoomPool()
+        # En marcha aunque no acepte conexiones: los clientes se conectan con connect()
+        self.server.running = True
+    
+    def close(self):
+        """Restaura el reloj y el bus del proceso."""
+        set_clock(self.previous_clock)
+        set_bus(self.previous_bus)
+    
+    # ---------- Acciones ----------
+    
+    def connect(self):
+        """Conecta un cliente nuevo por el transporte en memoria."""
+        name = f"p{len(self.clients)}"
+        sock = self.transport.connect()
+        server_socket, address = self.transport.accept()
+        session = self.server.register_client(server_socket, address, name)
+        client = ClientView(name, sock, server_socket, session)
+        self.clients.append(client)
+        self.transcript.append(f"{name} conecta")
+        return client
+    
+    def send(self, client, message):
+        """Procesa un mensaje del cliente como si llegara por su conexión."""
+        self.transcript.append(f"{client.name} > {redact(message, SENT_SECRETS)}")
+        self.server.process_block(client.server_socket, message, client.name, client.session)
+    
+    def disconnect(self, client):
+        """Cierra la conexión del cliente."""
+        self.transcript.append(f"{client.name} desconecta")
+        client.connected = False
+        client.socket.close()
+        self.server.disconnect_client(client.server_socket)
+    
+    def drop(self, client):
+        """
+        Pierde la conexión del cliente sin que el servidor lo sepa: sus envíos a ese cliente
+        fallan hasta que detecta el cierre, tras la siguiente acción.
+        """
+        self.transcript.append(f"{client.name} pierde la conexión")
+        client.connected = False
+        client.socket.close()
+        self.unnoticed.append(client)
+    
+    def notice_drops(self):
+        """El servidor detecta las conexiones perdidas (como al leer fin de conexión)."""
+        dropped, self.unnoticed = self.unnoticed, []
+        for client in dropped:
+            self.transcript.append(f"{client.name} detectado sin conexión")
+            self.server.disconnect_client(client.server_socket)
+    
+    def restart(self):
+        """
+        Reinicio en caliente: el servidor drena sus salas a una instantánea, los clientes
+        pierden la conexión y un servidor nuevo restaura las salas a la espera de RESUME.
+        """
+        self.transcript.append("~ reinicio del servidor")
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_path = os.path.join(directory, "salas.json")
+            self.server.snapshot_path = snapshot_path
+            self.server.drain()
+            self.pool.step_rooms()
+            for client in self.clients:
+                if client.connected:
+                    client.connected = False
+                    client.socket.close()
+            self.start_server(snapshot_path)
+            self.server.restore_snapshot()
+    
+    def on_room_closed(self, event):
+        """Una partida terminada tiene que haber publicado su resultado antes de cerrar la sala."""
+        room = next((r for r in self.pool.live if r.room_id == event.room_id), None)
+        if room and room.status in (STATUS_WIN, STATUS_DRAW) and not room.result_reported:
+            self.failures.append(f"Sala {event.room_id} cerrada con la partida terminada sin publicar el resultado")
+    
+    def advance(self, seconds):
+        """Avanza el reloj virtual dando a las salas un paso por cada intervalo de sondeo."""
+        self.transcript.append(f"~ {seconds} s")
+        if not self.pool.live:
+            # Sin salas en marcha no hay plazos que vigilar
+            self.clock.advance(seconds)
+            return
+        elapsed = 0.0
+        while elapsed < seconds:
+            step = min(PLAYING_POLL, seconds - elapsed)
+            self.clock.advance(step)
+            elapsed += step
+            self.pool.step_rooms()
+    
+    def deliver(self):
+        """Entrega los eventos pendientes y lee lo recibido por cada cliente."""
+        self.bus.flush()
+        # Resultados y rondas de torneo, sin el hilo del planificador
+        self.server.tournaments.step()
+        self.pool.step_rooms()
+        for client in self.clients:
+            if client.connected:
+                for line in client.receive(client.socket.read_available()):
+                    self.transcript.append(f"{client.name} < {redact(line, RECEIVED_SECRETS)}")
+    
+    def random_action(self):
+        """Ejecuta una acción elegida al azar."""
+        rng = self.rng
+        connected = [c for c in self.clients if c.connected]
+        action = rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+        unnoticed = bool(self.unnoticed)
+        
+        if action == "connect" or not connected:
+            if len(self.clients) < self.max_clients or not connected:
+                self.connect()
+        else:
+            self.run_action(action, rng.choice(connected))
+        
+        # Las conexiones perdidas en una acción anterior se detectan tras esta
+        if unnoticed:
+            self.notice_drops()
+    
+    def run_action(self, action, client):
+        """Ejecuta una acción de un cliente conectado."""
+        rng = self.rng
+        if action == "create":
+            self.send(client, f"CREATE|sala{rng.randrange(100)}")
+        elif action == "join":
+            codes = sorted(self.server.rooms) + ["ZZZZZ"]
+            self.send(client, f"JOIN|{rng.choice(codes).lower() if rng.random() < 0.2 else rng.choice(codes)}")
+        elif action == "move":
+            # Casi siempre una casilla válida; a veces fuera de rango o no numérica
+            position = rng.choice([str(rng.randrange(9))] * 8 + ["9", "x"])
+            self.send(client, f"MOVE|{position}")
+        elif action == "leave":
+            self.send(client, "LEAVE")
+        elif action == "disconnect":
+            self.disconnect(client)
+        elif action == "drop":
+            self.drop(client)
+        elif action == "chat":
+            self.send(client, f"CHAT|hola {rng.randrange(10)}")
+        elif action == "rematch":
+            self.send(client, "REMATCH")
+        elif action == "list":
+            self.send(client, "LIST")
+        elif action == "sync":
+            self.send(client, "SYNC")
+        elif action == "hint":
+            self.send(client, "HINT")
+        elif action == "advance":
+            self.advance(rng.choice(ADVANCE_STEPS))
+    
+    def settle(self):
+        """Entrega lo pendiente y comprueba las invariantes y la salida nueva del servidor."""
+        self.deliver()
+        self.check()
+        
+        new_output = self.output.getvalue()[self.checked:]
+        self.checked += len(new_output)
+        for line in new_output.splitlines():
+            if line.startswith(ERROR_MARKERS):
+                raise ScenarioError(f"Salida del servidor: {line}")
+    
+    # ---------- Guiones ----------
+    
+    def start_game(self, room_name):
+        """Conecta dos clientes y los sienta en una sala nueva. Devuelve (sala, primero, segundo)."""
+        a, b = self.connect(), self.connect()
+        self.send(a, f"CREATE|{room_name}")
+        self.settle()
+        room_id = self.server.client_rooms[a.server_socket]
+        self.send(b, f"JOIN|{room_id}")
+        self.settle()
+        room = self.server.rooms[room_id]
+        players = {1: a, 2: b}
+        return room, players[room.current_turn], players[3 - room.current_turn]
+    
+    def play(self, moves):
+        """Envía una serie de (cliente, casilla) comprobando el estado tras cada una."""
+        for client, position in moves:
+            self.send(client, f"MOVE|{position}")
+            self.settle()
+    
+    def script_send_failure(self):
+        """
+        El rival pierde la conexión justo antes del movimiento ganador: el envío del último
+        DELTA falla y la sala se cierra, pero la partida publica igualmente su resultado.
+        """
+        room, first, second = self.start_game("final")
+        room_id, winner = room.room_id, room.current_turn
+        self.play(((first, 0), (second, 3), (first, 1), (second, 4)))
+        self.drop(second)
+        self.settle()
+        self.play(((first, 2),))
+        self.notice_drops()
+        self.advance(1)
+        self.settle()
+        if (room_id, winner) not in self.results:
+            raise ScenarioError(f"Sala {room_id}: la victoria con el envío fallido no publicó {GAME_ENDED}")
+    
+    def script_resume(self):
+        """
+        Reinicio en caliente a mitad de partida: cada jugador recupera su puesto con RESUME y
+        su token (uno inventado o el de un puesto ya ocupado no sirven) y la partida sigue.
+        """
+        room, first, second = self.start_game("reinicio")
+        room_id, winner = room.room_id, room.current_turn
+        self.play(((first, 4), (second, 0)))
+        board = list(room.board)
+        
+        self.restart()
+        first_again, second_again = self.connect(), self.connect()
+        for client, token in ((first_again, "falso"), (first_again, first.token), (second_again, first.token)):
+            self.send(client, f"RESUME|{room_id}|{token}")
+        self.settle()
+        if second_again.server_socket in self.server.client_rooms:
+            raise ScenarioError(f"Sala {room_id}: RESUME con el token de un puesto ocupado")
+        self.send(second_again, f"RESUME|{room_id}|{second.token}")
+        self.settle()
+        
+        for client in (first_again, second_again):
+            if self.server.client_rooms.get(client.server_socket) != room_id or client.board != board:
+                raise ScenarioError(f"{client.name} no recupera la partida de la sala {room_id} "
+                                    f"(ve {client.board}, esperado {board})")
+        self.play(((first_again, 1), (second_again, 8), (first_again, 7)))
+        self.advance(1)
+        self.settle()
+        if (room_id, winner) not in self.results:
+            raise ScenarioError(f"Sala {room_id}: la partida reanudada no publicó su resultado")
+    
+    def script_tournament(self):
+        """
+        Torneo de eliminación directa entre cuatro jugadores perfectos: todas las partidas
+        acaban en tablas, cada eliminatoria se repite hasta el límite y la decide el desempate.
+        """
+        players = [self.connect() for _ in range(4)]
+        creator = players[0]
+        self.send(creator, "TOURNAMENT_CREATE|copa|knockout||second")
+        self.settle()
+        tournament_id = next(iter(self.server.tournaments.tournaments))
+        for client in players[1:]:
+            self.send(client, f"TOURNAMENT_JOIN|{tournament_id}")
+        self.send(creator, f"TOURNAMENT_START|{tournament_id}")
+        self.settle()
+        
+        clients = {client.server_socket: client for client in players}
+        move_table = get_move_table()
+        for _ in range(200):
+            if all(client.tournament_end for client in players):
+                break
+            moves = []
+            for room_id in sorted(self.server.rooms):
+                room = self.server.rooms[room_id]
+                if room.running and room.status == STATUS_PLAYING:
+                    player = room.player1 if room.current_turn == 1 else room.player2
+                    best_move = move_table.lookup(room.board_key, room.current_turn)[1]
+                    moves.append((clients[player.socket], best_move))
+            if moves:
+                self.play(moves)
+            else:
+                self.advance(1)
+                self.settle()
+        else:
+            raise ScenarioError(f"El torneo {tournament_id} no termina")
+        
+        # Dos eliminatorias y la final, cada una con la partida original y sus repeticiones
+        games = 3 * (KNOCKOUT_REPLAYS + 1)
+        if len(self.results) != games or any(winner != 0 for _, winner in self.results):
+            raise ScenarioError(f"Torneo {tournament_id}: resultados {self.results}, esperadas {games} tablas")
+        standings = {client.tournament_end for client in players}
+        if len(standings) != 1:
+            raise ScenarioError(f"Torneo {tournament_id}: clasificaciones distintas {sorted(standings)}")
+        champion = json.loads(standings.pop())[0]
+        if champion[2] != 2:
+            raise ScenarioError(f"Torneo {tournament_id}: campeón {champion} sin ganar por desempate")
+    
+    # ---------- Invariantes ----------
+    
+    def check(self):
+        """Comprueba las invariantes del servidor y de las vistas de los clientes."""
+        server = self.server
+        rooms = {room.room_id: room for room in self.pool.live}
+        
+        if self.failures:
+            raise ScenarioError(self.failures[0])
+        
+        for room in rooms.values():
+            key = sum(SYMBOL_VALUES[cell] * weight for cell, weight in zip(room.board, CELL_WEIGHTS))
+            if key != room.board_key:
+                raise ScenarioError(f"Sala {room.room_id}: clave de tablero {room.board_key} != {key}")
+            if room.move_seq != 9 - room.board.count(" "):
+                raise ScenarioError(f"Sala {room.room_id}: secuencia {room.move_seq} con tablero {room.board}")
+        
+        for room_id in server.rooms:
+            if room_id not in rooms:
+                raise ScenarioError(f"Sala {room_id} registrada pero sin avanzar")
+        
+        # Cada sala registrada tiene un único mensajero y las cerradas no conservan el suyo
+        subscribed = [room_id for _, room_id in self.bus.sync_subscribers if room_id is not None]
+        if sorted(subscribed) != sorted(server.rooms):
+            raise ScenarioError(f"Mensajeros suscritos {sorted(subscribed)} != salas {sorted(server.rooms)}")
+        
+        for client in self.clients:
+            if client.errors:
+                raise ScenarioError(f"{client.name}: {client.errors[0]}")
+            if not client.connected:
+                if client.server_socket in server.client_rooms and client not in self.unnoticed:
+                    raise ScenarioError(f"{client.name} desconectado sigue asignado a una sala")
+                continue
+            
+            room_id = server.client_rooms.get(client.server_socket)
+            if room_id is None:
+                continue
+            room = rooms.get(room_id)
+            if room is None:
+                raise ScenarioError(f"{client.name} asignado a la sala {room_id}, que no existe")
+            
+            players = [p.socket for p in (room.player1, room.player2) if p]
+            if room.running and client.server_socket not in players:
+                raise ScenarioError(f"{client.name} asignado a la sala {room_id} sin ser jugador")
+            if room.running and client.room_closed:
+                raise ScenarioError(f"{client.name} recibe ROOM_CLOSED estando en la sala {room_id}")
+            
+            # La vista del cliente coincide con la sala mientras se juega
+            if room.running and room.status == STATUS_PLAYING and client.board is not None:
+                if client.board != room.board or client.seq != room.move_seq:
+                    raise ScenarioError(f"{client.name} ve {client.board} (secuencia {client.seq}); "
+                                        f"la sala tiene {room.board} (secuencia {room.move_seq})")
+
+# Guiones por nombre (métodos script_* de Scenario)
+SCRIPTS = {
+    "send_failure": Scenario.script_send_failure,
+    "resume": Scenario.script_resume,
+    "tournament": Scenario.script_tournament
+}
+
+# Semillas con las que se ejecuta cada guion
+SCRIPT_SEEDS = 20
+
+def run_scenario(seed, steps=60, max_clients=6, script=None):
+    """
+    Ejecuta un escenario (aleatorio o un guion) y comprueba sus invariantes tras cada acción.
+    
+    Returns:
+        tuple: (transcripción, salida del servidor, error o None)
+    """
+    output = io.StringIO()
+    scenario = Scenario(seed, max_clients, output)
+    error = None
+    try:
+        with contextlib.redirect_stdout(output):
+            if script:
+                SCRIPTS[script](scenario)
+            else:
+                for _ in range(steps):
+                    scenario.random_action()
+                    scenario.settle()
+    except ScenarioError as e:
+        error = str(e)
+    finally:
+        scenario.close()
+    return scenario.transcript, output.getvalue(), error
+
+def digest(transcript):
+    """Huella de una transcripción, para comparar ejecuciones de la misma semilla."""
+    return hashlib.sha1("\n".join(transcript).encode("utf-8")).hexdigest()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Escenarios de protocolo deterministas en memoria')
+    parser.add_argument('--scenarios', type=int, default=2000, help='Número de escenarios')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla del primer escenario')
+    parser.add_argument('--steps', type=int, default=60, help='Acciones por escenario')
+    parser.add_argument('--clients', type=int, default=6, help='Máximo de clientes por escenario')
+    parser.add_argument('--replay', type=int, default=None, help='Reproduce un escenario y muestra su transcripción')
+    parser.add_argument('--script', choices=sorted(SCRIPTS), default=None, help='Guion que reproduce --replay')
+    parser.add_argument('--check-determinism', type=int, default=20,
+                        help='Escenarios que se ejecutan dos veces comparando la transcripción')
+    args = parser.parse_args()
+    
+    if args.replay is not None:
+        transcript, output, error = run_scenario(args.replay, args.steps, args.clients, args.script)
+        print("\n".join(transcript))
+        print(f"\nSalida del servidor:\n{output}")
+        print(f"Resultado: {error or 'correcto'}")
+        sys.exit(1 if error else 0)
+    
+    start = time.perf_counter()
+    failures = []
+    for seed in range(args.seed, args.seed + args.scenarios):
+        transcript, _, error = run_scenario(seed, args.steps, args.clients)
+        if error:
+            failures.append((seed, error))
+        elif seed - args.seed < args.check_determinism:
+            if digest(run_scenario(seed, args.steps, args.clients)[0]) != digest(transcript):
+                failures.append((seed, "La transcripción cambia al repetir la semilla"))
+    for script in SCRIPTS:
+        for seed in range(args.seed, args.seed + SCRIPT_SEEDS):
+            error = run_scenario(seed, script=script)[2]
+            if error:
+                failures.append((seed, f"guion {script}: {error}"))
+    elapsed = time.perf_counter() - start
+    
+    print(f"Escenarios: {args.scenarios} ({args.steps} acciones cada uno) y {len(SCRIPTS)} guiones "
+          f"({SCRIPT_SEEDS} semillas) en {elapsed:.2f} s ({args.scenarios / elapsed:.0f} escenarios/s)")
+    for seed, error in failures[:10]:
+        print(f"  semilla {seed}: {error}")
+    if failures:
+        print(f"{len(failures)} escenarios fallidos (reprodúcelos con --replay SEMILLA [--script GUION])")
+        sys.exit(1)
+    print("Todos los escenarios correctos")
@@ -1,52 +1,112 @@
-import socket
 import threading
 import uuid
-import sys
 import json
 import os
+import signal
+import argparse
 
 # Importaciones de módulos del servidor
+import lock_profiler
+from lock_profiler import make_lock
 from game_room import GameRoom
+from messenger import PlayerMessenger
+from move_table import get_move_table
+from room_pool import RoomPool
+from room_codes import RoomCodeAllocator, normalize
+from admin import AdminServer, SessionRegistry, ServerStats
+from events import get_bus, MOVE_MADE, GAME_ENDED, PLAYER_LEFT
+from tournament import TournamentManager, TIEBREAK_SEED
+from transport import TcpTransport
 from protocol import (
-    CMD_CREATE, CMD_JOIN, CMD_MOVE, CMD_LIST, CMD_LEAVE,
+    CMD_CREATE, CMD_JOIN, CMD_MOVE, CMD_LIST, CMD_LEAVE, CMD_RESUME, CMD_HINT, CMD_REMATCH, CMD_CHAT,
+    CMD_SYNC, CMD_TOURNAMENT_CREATE, CMD_TOURNAMENT_JOIN, CMD_TOURNAMENT_START, CMD_TOURNAMENT_LIST,
+    REJECT_MESSAGES, REJECT_BAD_POSITION, REJECT_NOT_IN_ROOM,
     parse_message, create_message
 )
 
+# Tamaño del búfer de recepción que reutiliza cada conexión
+RECV_BUFFER_SIZE = 1024
+
+# Máximo de bytes sin salto de línea que se acumulan de un cliente
+MAX_PENDING_BYTES = 64 * 1024
+
+# Pila de los hilos del servidor (una por conexión y por sala); la de 8 MB por defecto
+# es memoria virtual reservada por hilo que el servidor nunca llega a usar
+THREAD_STACK_SIZE = 256 * 1024
+
+# Archivo de instantánea de salas usado en los reinicios en caliente
+DEFAULT_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rooms_snapshot.json')
+
 class TicTacToeServer:
     
-    def __init__(self, host='0.0.0.0', port=9000):
-        """Inicializa el servidor."""
+    def __init__(self, host='0.0.0.0', port=9000, snapshot_path=None, admin_port=None, transport=None,
+                 admin_socket=None):
+        """Inicializa el servidor (por defecto acepta conexiones TCP en host:port)."""
         self.host = host
         self.port = port
-        self.server_socket = None
+        self.transport = transport or TcpTransport(host, port)
         self.running = False
         
+        # Canal de administración local, solo si se pide: socket Unix o puerto de 127.0.0.1
+        self.admin = None
+        if admin_socket or admin_port:
+            self.admin = AdminServer(self, path=admin_socket, port=admin_port)
+        
+        # Sesiones de clientes y contadores agregados, consultados por el canal de administración
+        self.sessions = SessionRegistry()
+        self.stats = ServerStats()
+        
+        # Bus de eventos de las salas: estadísticas y registro se suscriben por lotes, no los llama
+        # la sala; los mensajes a los jugadores los envía el PlayerMessenger síncrono de cada sala
+        self.bus = get_bus()
+        self.bus.subscribe(MOVE_MADE, lambda events: self.stats.incr("moves", len(events)), batch=True)
+        self.bus.subscribe(GAME_ENDED, lambda events: self.stats.incr("games_finished", len(events)), batch=True)
+        self.bus.subscribe(GAME_ENDED, self.log_event)
+        self.bus.subscribe(PLAYER_LEFT, self.log_event)
+        
+        # Ruta de la instantánea para el drenado y la restauración de salas
+        self.snapshot_path = snapshot_path
+        
         # Diccionario de salas {room_id: GameRoom}
         self.rooms = {}
-        self.rooms_lock = threading.Lock()
+        self.rooms_lock = make_lock("rooms_lock")
+        
+        # Códigos cortos de sala, reciclados al cerrarse
+        self.room_codes = RoomCodeAllocator()
+        
+        # Reserva de salas cerradas que se reutilizan en lugar de crear hilos nuevos
+        self.room_pool = RoomPool()
         
         # Diccionario para mapear sockets a salas {socket: room_id}
         self.client_rooms = {}
-        self.client_lock = threading.Lock()
+        self.client_lock = make_lock("client_lock")
+        
+        # Torneos: emparejamientos y creación de salas por lotes
+        self.tournaments = TournamentManager(self)
     
     def start(self):
         """Inicia el servidor y comienza a escuchar conexiones."""
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
+            self.transport.listen()
             
             self.running = True
+            # La tabla de jugadas se construye en segundo plano: no retrasa la escucha y suele
+            # estar lista antes del primer movimiento (si no, ese movimiento la espera)
+            threading.Thread(target=get_move_table, daemon=True).start()
+            self.restore_snapshot()
+            self.bus.start()
+            self.tournaments.start()
+            if self.admin:
+                self.admin.start()
             print(f"Servidor iniciado en {self.host}:{self.port}")
             
             while self.running:
-                client_socket, client_address = self.server_socket.accept()
+                client_socket, client_address = self.transport.accept()
                 print(f"Nueva conexión desde {client_address}")
                 
                 client_thread = threading.Thread(
                     target=self.handle_client,
-                    args=(client_socket,)
+                    args=(client_socket, client_address)
                 )
                 client_thread.daemon = True
                 client_thread.start()
@@ -54,55 +114,159 @@ class TicTacToeServer:
         except KeyboardInterrupt:
             print("Servidor detenido por el usuario")
         except Exception as e:
-            print(f"Error en el servidor: {e}")
+            if self.running:
+                print(f"Error en el servidor: {e}")
         finally:
             self.stop()
     
+    def drain(self, signum=None, frame=None):
+        """
+        Deja de aceptar conexiones y guarda el estado de las salas activas
+        para que un nuevo proceso las restaure sin forfeits.
+        """
+        if not self.running:
+            return
+        self.running = False
+        self.transport.close()
+        
+        with self.rooms_lock:
+            rooms = [room for room in self.rooms.values()
+                     if room.running and room.status in ("WAITING", "PLAYING")]
+            for room in rooms:
+                room.suspend()
+            self.rooms.clear()
+        
+        snapshot = [room.to_snapshot() for room in rooms]
+        
+        if self.snapshot_path and snapshot:
+            tmp_path = self.snapshot_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(tmp_path, self.snapshot_path)
+            print(f"Instantánea de {len(snapshot)} salas guardada en {self.snapshot_path}")
+    
+    def restore_snapshot(self):
+        """Restaura las salas guardadas por un proceso anterior, si existe instantánea."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+            
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer la instantánea de salas: {e}")
+            return
+        finally:
+            try:
+                os.remove(self.snapshot_path)
+            except OSError:
+                pass
+        
+        with self.rooms_lock:
+            for data in snapshot:
+                room = GameRoom.from_snapshot(data, self.on_room_closed)
+                PlayerMessenger(room).attach()
+                self.room_codes.reserve(room.room_id)
+                self.rooms[room.room_id] = room
+                self.room_pool.launch(room, reused=False)
+        
+        print(f"Restauradas {len(snapshot)} salas desde la instantánea")
+    
     def stop(self):
         """Detiene el servidor y libera los recursos."""
         self.running = False
+        self.tournaments.stop()
+        self.bus.stop()
+        if self.admin:
+            self.admin.stop()
         
         with self.rooms_lock:
             for room in self.rooms.values():
                 room.running = False
             self.rooms.clear()
         
-        if self.server_socket:
-            try:
-                self.server_socket.close()
-            except:
-                pass
+        self.transport.close()
                 
         print("Servidor detenido y recursos liberados")
     
-    def handle_client(self, client_socket):
+    def handle_client(self, client_socket, client_address=None):
         """Maneja la comunicación con un cliente."""
+        # Búfer de recepción reservado una vez por conexión y reutilizado en cada lectura
+        buffer = bytearray(RECV_BUFFER_SIZE)
         try:
-            player_name = client_socket.recv(1024).decode('utf-8').strip()
+            size = client_socket.recv_into(buffer)
+            if not size:
+                # Conexión cerrada sin identificarse (p. ej. sonda de disponibilidad)
+                return
+                
+            # El nombre llega en el primer mensaje; lo que siga a su salto de línea ya son comandos
+            newline = buffer.find(b"\n", 0, size)
+            end = size if newline < 0 else newline
+            partial = b"" if newline < 0 else bytes(buffer[newline + 1:size])
+            
+            player_name = buffer[:end].decode('utf-8').strip()
             if not player_name:
                 player_name = f"Jugador_{uuid.uuid4().hex[:6]}"
                 
-            print(f"Jugador conectado: {player_name}")
+            session = self.register_client(client_socket, client_address, player_name)
             
             while self.running:
-                data = client_socket.recv(1024).decode('utf-8')
-                if not data:
+                if b"\n" in partial:
+                    data, _, partial = partial.rpartition(b"\n")
+                    self.process_block(client_socket, data.decode('utf-8'), player_name, session)
+                    continue
+                    
+                size = client_socket.recv_into(buffer)
+                if not size:
                     break
+                session.touch(size)
+                
+                # Solo se procesan líneas completas; el resto espera a la siguiente lectura
+                newline = buffer.rfind(b"\n", 0, size)
+                if newline < 0:
+                    partial += buffer[:size]
+                    if len(partial) > MAX_PENDING_BYTES:
+                        print(f"Mensaje demasiado largo de {player_name}; se descarta")
+                        partial = b""
+                    continue
                     
-                for message in data.strip().split('\n'):
-                    if not message:
-                        continue
-                        
-                    self.process_message(client_socket, message, player_name)
+                data = (partial + buffer[:newline]).decode('utf-8')
+                partial = bytes(buffer[newline + 1:size])
+                self.process_block(client_socket, data, player_name, session)
                     
+        except ConnectionResetError:
+            # El cliente cerró la conexión con datos sin leer: es una desconexión normal
+            pass
         except Exception as e:
             print(f"Error al manejar cliente: {e}")
         finally:
-            self.remove_client(client_socket)
-            try:
-                client_socket.close()
-            except:
-                pass
+            self.disconnect_client(client_socket)
+    
+    def register_client(self, client_socket, client_address, player_name):
+        """Registra la sesión de un cliente identificado."""
+        print(f"Jugador conectado: {player_name}")
+        session = self.sessions.register(client_socket, client_address, player_name)
+        self.stats.incr("connections")
+        return session
+    
+    def disconnect_client(self, client_socket):
+        """Saca al cliente de su sala y torneo y cierra su conexión."""
+        self.sessions.unregister(client_socket)
+        self.remove_client(client_socket)
+        try:
+            client_socket.close()
+        except:
+            pass
+    
+    def process_block(self, client_socket, data, player_name, session):
+        """Procesa las líneas completas recibidas en una lectura."""
+        for message in data.split('\n'):
+            if not message.strip():
+                continue
+                
+            session.messages_in += 1
+            self.stats.incr("messages")
+            self.process_message(client_socket, message, player_name)
     
     def process_message(self, client_socket, message, player_name):
         """Procesa un mensaje recibido de un cliente."""
@@ -119,6 +283,24 @@ class TicTacToeServer:
                 self.list_rooms(client_socket)
             elif command == CMD_LEAVE:
                 self.leave_room(client_socket)
+            elif command == CMD_RESUME:
+                self.resume_room(client_socket, args, player_name)
+            elif command == CMD_HINT:
+                self.request_hint(client_socket)
+            elif command == CMD_REMATCH:
+                self.request_rematch(client_socket)
+            elif command == CMD_CHAT:
+                self.send_chat(client_socket, args)
+            elif command == CMD_SYNC:
+                self.sync_state(client_socket)
+            elif command == CMD_TOURNAMENT_CREATE:
+                self.create_tournament(client_socket, args, player_name)
+            elif command == CMD_TOURNAMENT_JOIN:
+                self.join_tournament(client_socket, args, player_name)
+            elif command == CMD_TOURNAMENT_START:
+                self.start_tournament(client_socket, args)
+            elif command == CMD_TOURNAMENT_LIST:
+                self.send_message(client_socket, CMD_TOURNAMENT_LIST, json.dumps(self.tournaments.list_open()))
             else:
                 print(f"Comando desconocido: {command}")
                 
@@ -131,49 +313,150 @@ class TicTacToeServer:
             return
             
         room_name = args[0]
-        room_id = str(uuid.uuid4())
+        room_id = self.room_codes.allocate()
+        
+        # Salir de la sala actual antes de tomar rooms_lock (leave_current_room también lo toma)
+        self.leave_current_room(client_socket)
         
         with self.rooms_lock:
-            self.leave_current_room(client_socket)
-            
-            room = GameRoom(room_id, room_name, client_socket, player_name, self.on_room_closed)
+            room = self.room_pool.acquire(room_id, room_name, client_socket, player_name, self.on_room_closed)
+            PlayerMessenger(room).attach()
             self.rooms[room_id] = room
+            self.stats.incr("rooms_created")
             
             with self.client_lock:
                 self.client_rooms[client_socket] = room_id
             
-            room.start()
-            
             print(f"Sala creada: {room_name} (ID: {room_id}) por {player_name}")
             
-            self.send_message(client_socket, "CREATE", room_id, room_name)
+            # El token de reanudación solo lo recibe quien ocupa el puesto
+            self.send_message(client_socket, "CREATE", room_id, room_name, room.player1.token)
     
     def join_room(self, client_socket, args, player_name):
         """Une a un jugador a una sala existente."""
         if len(args) < 1:
             return
             
-        room_id = args[0]
+        # Se acepta el código tal como lo escribe el usuario (p. ej. en minúsculas)
+        room_id = normalize(args[0])
         
         with self.rooms_lock:
-            if room_id not in self.rooms:
+            room_exists = room_id in self.rooms
+            
+        if not room_exists:
+            self.send_message(client_socket, "ERROR", "Sala no encontrada")
+            return
+            
+        # Salir de la sala actual antes de tomar rooms_lock (leave_current_room también lo toma)
+        self.leave_current_room(client_socket)
+        
+        with self.rooms_lock:
+            room = self.rooms.get(room_id)
+            if room is None:
                 self.send_message(client_socket, "ERROR", "Sala no encontrada")
                 return
                 
-            room = self.rooms[room_id]
-            
-            self.leave_current_room(client_socket)
-            
             if room.add_player(client_socket, player_name):
                 with self.client_lock:
                     self.client_rooms[client_socket] = room_id
                     
                 print(f"Jugador {player_name} unido a sala {room.room_name} (ID: {room_id})")
-                
-                self.send_message(client_socket, "JOIN", room_id, room.room_name)
             else:
                 self.send_message(client_socket, "ERROR", "Sala llena")
     
+    def create_match_room(self, socket1, name1, socket2, name2, room_name, starter=None):
+        """
+        Crea una sala con ambos jugadores ya asignados (partidas de torneo). starter fija
+        quién empieza (1 o 2); sin él se sortea.
+        """
+        room_id = self.room_codes.allocate()
+        
+        for client_socket in (socket1, socket2):
+            self.leave_current_room(client_socket)
+        
+        with self.rooms_lock:
+            # Las partidas de torneo cuentan un único resultado: sin revancha
+            room = self.room_pool.acquire(room_id, room_name, socket1, name1, self.on_room_closed,
+                                          allow_rematch=False)
+            PlayerMessenger(room).attach()
+            self.rooms[room_id] = room
+            self.stats.incr("rooms_created")
+            
+            with self.client_lock:
+                self.client_rooms[socket1] = room_id
+                self.client_rooms[socket2] = room_id
+            
+            # Ambos reciben JOIN antes de la primera actualización del tablero (add_player
+            # lo envía al segundo jugador)
+            self.send_message(socket1, "JOIN", room_id, room_name, room.player1.token)
+            room.add_player(socket2, name2, starter)
+        
+        return room
+    
+    def create_tournament(self, client_socket, args, player_name):
+        """Crea un torneo: TOURNAMENT_CREATE|nombre|modo[|rondas[|desempate]]."""
+        if len(args) < 2:
+            return
+            
+        rounds = int(args[2]) if len(args) > 2 and args[2].isdigit() else None
+        tiebreak = args[3] if len(args) > 3 and args[3] else TIEBREAK_SEED
+        tournament = self.tournaments.create(client_socket, player_name, args[0], args[1], rounds, tiebreak)
+        
+        if tournament is None:
+            self.send_message(client_socket, "ERROR", "Modalidad o desempate de torneo no válido")
+            return
+            
+        print(f"Torneo creado: {tournament.name} ({tournament.mode}, desempate {tournament.tiebreak}) por {player_name}")
+        self.send_message(client_socket, CMD_TOURNAMENT_CREATE, tournament.tournament_id, tournament.name,
+                          tournament.mode, tournament.tiebreak)
+    
+    def join_tournament(self, client_socket, args, player_name):
+        """Inscribe al jugador en un torneo: TOURNAMENT_JOIN|id."""
+        if len(args) < 1:
+            return
+            
+        tournament = self.tournaments.join(args[0], client_socket, player_name)
+        if tournament is None:
+            self.send_message(client_socket, "ERROR", "No es posible inscribirse en el torneo")
+            return
+            
+        self.send_message(client_socket, CMD_TOURNAMENT_JOIN, tournament.tournament_id, tournament.name, len(tournament.players))
+    
+    def start_tournament(self, client_socket, args):
+        """Inicia un torneo (solo su creador): TOURNAMENT_START|id."""
+        if len(args) < 1:
+            return
+            
+        if self.tournaments.begin(args[0], client_socket) is None:
+            self.send_message(client_socket, "ERROR", "No es posible iniciar el torneo")
+    
+    def resume_room(self, client_socket, args, player_name):
+        """
+        Reconecta a un jugador con la sala en la que estaba antes de un reinicio:
+        RESUME|código|token, con el token recibido en CREATE, JOIN o UPDATE.
+        """
+        if len(args) < 2:
+            self.send_message(client_socket, "ERROR", "No se pudo reanudar la partida")
+            return
+            
+        room_id, token = args[0], args[1]
+        
+        with self.rooms_lock:
+            room = self.rooms.get(room_id)
+            player_num = room.resume_player(token, client_socket) if room else None
+            
+            if not player_num:
+                self.send_message(client_socket, "ERROR", "No se pudo reanudar la partida")
+                return
+                
+            with self.client_lock:
+                self.client_rooms[client_socket] = room_id
+        
+        print(f"Jugador {player_name} reanudó la sala {room.room_name} (ID: {room_id})")
+        
+        self.send_message(client_socket, CMD_RESUME, room_id, room.room_name)
+        room.send_state(player_num)
+    
     def process_move(self, client_socket, args):
         """Procesa un movimiento de un jugador."""
         if len(args) < 1:
@@ -181,43 +464,86 @@ class TicTacToeServer:
             
         try:
             position = int(args[0])
+        except ValueError:
+            self.reject(client_socket, REJECT_BAD_POSITION)
+            return
             
-            room_id = self.get_client_room(client_socket)
-            if not room_id:
+        with self.rooms_lock:
+            room, player_num = self.find_player_room(client_socket)
+            if not player_num:
+                self.reject(client_socket, REJECT_NOT_IN_ROOM)
                 return
                 
-            with self.rooms_lock:
-                if room_id not in self.rooms:
-                    return
-                    
-                room = self.rooms[room_id]
+            room.process_move(player_num, position)
+    
+    def request_hint(self, client_socket):
+        """Responde a una petición de sugerencia desde la tabla precalculada."""
+        with self.rooms_lock:
+            room, player_num = self.find_player_room(client_socket)
+            if not player_num:
+                self.reject(client_socket, REJECT_NOT_IN_ROOM)
+                return
                 
-                player_num = None
-                if room.player1 and room.player1["socket"] == client_socket:
-                    player_num = 1
-                elif room.player2 and room.player2["socket"] == client_socket:
-                    player_num = 2
+            room.hint(player_num)
+    
+    def request_rematch(self, client_socket):
+        """Registra la petición de revancha del jugador en su sala."""
+        with self.rooms_lock:
+            room, player_num = self.find_player_room(client_socket)
+            if not player_num:
+                self.reject(client_socket, REJECT_NOT_IN_ROOM)
+                return
                 
-                if player_num:
-                    room.process_move(player_num, position)
+            room.request_rematch(player_num)
+    
+    def send_chat(self, client_socket, args):
+        """Entrega un mensaje de chat a la sala del jugador (el texto puede contener separadores)."""
+        if len(args) < 1:
+            return
+            
+        with self.rooms_lock:
+            room, player_num = self.find_player_room(client_socket)
+            if not player_num:
+                self.reject(client_socket, REJECT_NOT_IN_ROOM)
+                return
                 
-        except ValueError:
-            pass
+            room.chat(player_num, " ".join(args))
+    
+    def sync_state(self, client_socket):
+        """Reenvía el estado completo de la partida a un cliente que detectó un salto de secuencia."""
+        with self.rooms_lock:
+            room, player_num = self.find_player_room(client_socket)
+            if not player_num:
+                self.reject(client_socket, REJECT_NOT_IN_ROOM)
+                return
+                
+            room.send_state(player_num)
+    
+    def find_player_room(self, client_socket):
+        """Devuelve (sala, número de jugador) del cliente, o (None, None) (requiere rooms_lock)."""
+        room_id = self.get_client_room(client_socket)
+        room = self.rooms.get(room_id) if room_id else None
+        if room:
+            if room.player1 and room.player1.socket == client_socket:
+                return room, 1
+            if room.player2 and room.player2.socket == client_socket:
+                return room, 2
+        return None, None
+    
+    def reject(self, client_socket, reason):
+        """Envía al cliente un error con el motivo del rechazo."""
+        self.send_message(client_socket, "ERROR", REJECT_MESSAGES[reason], reason)
     
     def list_rooms(self, client_socket):
-        """Envía la lista de salas disponibles al cliente."""
+        """Envía la lista de salas disponibles al cliente: [[código, nombre, creador], ...]."""
         available_rooms = []
         
         with self.rooms_lock:
             for room_id, room in self.rooms.items():
                 if room.status == "WAITING":
-                    available_rooms.append({
-                        "id": room_id,
-                        "name": room.room_name,
-                        "creator": room.player1["name"]
-                    })
+                    available_rooms.append((room_id, room.room_name, room.player1.name))
         
-        self.send_message(client_socket, "LIST", json.dumps(available_rooms))
+        self.send_message(client_socket, "LIST", json.dumps(available_rooms, separators=(',', ':')))
     
     def leave_room(self, client_socket):
         """Saca a un jugador de su sala actual."""
@@ -235,10 +561,14 @@ class TicTacToeServer:
             if room_id in self.rooms:
                 room = self.rooms[room_id]
                 
+                # Sala sin más jugadores conectados (se comprueba antes de que player_left
+                # desvincule el socket del jugador que sale)
+                alone = (not room.player1 or room.player1.socket in (client_socket, None)) and \
+                        (not room.player2 or room.player2.socket in (client_socket, None))
+                
                 room.player_left(client_socket)
                 
-                if (not room.player1 or room.player1["socket"] == client_socket) and \
-                   (not room.player2 or room.player2["socket"] == client_socket):
+                if alone:
                     del self.rooms[room_id]
         
         with self.client_lock:
@@ -252,6 +582,7 @@ class TicTacToeServer:
     
     def remove_client(self, client_socket):
         """Elimina a un cliente del servidor."""
+        self.tournaments.player_disconnected(client_socket)
         self.leave_current_room(client_socket)
     
     def send_message(self, client_socket, command, *args):
@@ -262,6 +593,15 @@ class TicTacToeServer:
         except Exception as e:
             print(f"Error al enviar mensaje: {e}")
 
+    def log_event(self, event):
+        """Registra en la salida los finales de partida y las salidas de jugadores."""
+        if event.name == GAME_ENDED:
+            winner = event.data["winner"]
+            result = "sin resultado" if winner is None else "empate" if winner == 0 else f"gana el jugador {winner}"
+            print(f"Partida terminada en sala {event.room_id}: {result}")
+        elif event.name == PLAYER_LEFT:
+            print(f"El jugador {event.data['name']} salió de la sala {event.room_id} ({event.data['status']})")
+    
     def on_room_closed(self, room_id, players):
         """Maneja la notificación de que una sala ha sido cerrada."""
         print(f"Sala {room_id} cerrada, liberando jugadores...")
@@ -270,6 +610,10 @@ class TicTacToeServer:
             if room_id in self.rooms:
                 del self.rooms[room_id]
         
+        # Sin mensajero antes de reciclar el código: la próxima sala con él tendrá el suyo
+        self.bus.unsubscribe_room(room_id)
+        self.room_codes.release(room_id)
+        
         # Liberar a los jugadores de la asignación a sala
         with self.client_lock:
             for socket, _ in players:
@@ -279,9 +623,38 @@ class TicTacToeServer:
         print(f"Jugadores liberados de la sala {room_id}, ahora pueden unirse a otras salas.")
 
 if __name__ == "__main__":
-    # Obtener puerto del primer argumento, o usar 9000 por defecto
-    port = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+    parser = argparse.ArgumentParser(description='Servidor TCP del juego Tic-Tac-Toe')
+    parser.add_argument('port', type=int, nargs='?', default=9000, help='Puerto del servidor (predeterminado: 9000)')
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT, help='Archivo de instantánea para reinicios en caliente')
+    parser.add_argument('--admin-socket', default=None,
+                        help='Socket Unix (permisos 0600) del canal de administración (predeterminado: desactivado)')
+    parser.add_argument('--admin-port', type=int, default=None,
+                        help='Puerto del canal de administración en 127.0.0.1, sin autenticación '
+                             '(predeterminado: desactivado; preferible --admin-socket)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Perfilar la contención de locks (también con LAVIEJA_PROFILE=1); SIGUSR1 guarda el informe')
+    parser.add_argument('--profile-dir', default=None, help='Directorio de los informes de perfilado (predeterminado: actual)')
+    args = parser.parse_args()
+    
+    # Pilas pequeñas para los hilos de conexiones y salas (debe fijarse antes de crearlos)
+    threading.stack_size(THREAD_STACK_SIZE)
+    
+    # El perfilador debe activarse antes de crear los locks del servidor y de las salas
+    profiler = None
+    if args.profile or os.environ.get('LAVIEJA_PROFILE') == '1':
+        profiler = lock_profiler.enable(output_dir=args.profile_dir)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, profiler.request_dump)
+        print("Perfilado de locks activado")
     
     # Crear e iniciar el servidor
-    server = TicTacToeServer(port=port)
-    server.start() 
\ No newline at end of file
+    server = TicTacToeServer(port=args.port, snapshot_path=args.snapshot, admin_port=args.admin_port,
+                             admin_socket=args.admin_socket)
+    
+    # SIGTERM drena el servidor y guarda las salas para el siguiente proceso
+    signal.signal(signal.SIGTERM, server.drain)
+    
+    server.start()
+    
+    if profiler:
+        profiler.dump() 
\ No newline at end of file
@@ -0,0 +1,174 @@
+"""
+Simulador masivo de partidas para planificación de capacidad.
+Ejecuta la lógica real de GameRoom (process_move / _check_game_state) sin red,
+con jugadores automáticos y sockets en memoria, opcionalmente en varios procesos.
+"""
+
+import sys
+import time
+import random
+import argparse
+import cProfile
+import pstats
+from collections import Counter
+from multiprocessing import Pool
+
+from game_room import GameRoom, STATUS_PLAYING, STATUS_WIN
+from messenger import PlayerMessenger
+from transport import socket_pair
+
+# Combinaciones ganadoras (filas, columnas y diagonales)
+WIN_LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6)
+)
+
+def random_bot(board, symbol, rng):
+    """Elige una casilla libre al azar."""
+    return rng.choice([i for i, cell in enumerate(board) if cell == " "])
+
+def greedy_bot(board, symbol, rng):
+    """Gana si puede, bloquea si debe; si no, prefiere centro, esquinas y lados."""
+    opponent = "O" if symbol == "X" else "X"
+    for target in (symbol, opponent):
+        for a, b, c in WIN_LINES:
+            line = (board[a], board[b], board[c])
+            if line.count(target) == 2 and line.count(" ") == 1:
+                return (a, b, c)[line.index(" ")]
+    for group in ((4,), (0, 2, 6, 8), (1, 3, 5, 7)):
+        free = [i for i in group if board[i] == " "]
+        if free:
+            return rng.choice(free)
+    return None
+
+BOTS = {
+    "random": random_bot,
+    "greedy": greedy_bot
+}
+
+# Jugador perfecto a partir de las tablas de análisis (opcional, requiere NumPy)
+try:
+    from analysis import get_tables, board_key
+    
+    def perfect_bot(board, symbol, rng):
+        """Juega la mejor casilla según las tablas minimax precalculadas."""
+        return int(get_tables().best_move[0 if symbol == "X" else 1, board_key(board)])
+    
+    BOTS["perfect"] = perfect_bot
+except ImportError:
+    pass
+
+def play_game(bot1, bot2, rng, game_id=0):
+    """
+    Juega una partida completa en una GameRoom sin hilo ni red.
+    
+    Returns:
+        tuple: (resultado, jugador inicial, movimientos, bytes enviados)
+    """
+    # La sala escribe en los extremos del servidor; lo recibido por los clientes mide el protocolo
+    client1, socket1 = socket_pair()
+    client2, socket2 = socket_pair()
+    room = GameRoom(game_id, "sim", socket1, "bot1")
+    messenger = PlayerMessenger(room).attach()
+    try:
+        room.add_player(socket2, "bot2")
+        starter = room.current_turn
+        bots = {1: bot1, 2: bot2}
+        moves = 0
+        
+        while room.status == STATUS_PLAYING:
+            player_num = room.current_turn
+            symbol = "X" if player_num == 1 else "O"
+            position = bots[player_num](room.board, symbol, rng)
+            room.process_move(player_num, position)
+            moves += 1
+    finally:
+        messenger.detach()
+        sent = len(client1.read_available()) + len(client2.read_available())
+        for sock in (socket1, socket2, client1, client2):
+            sock.close()
+    
+    if room.status == STATUS_WIN:
+        outcome = "p1" if room.winner == 1 else "p2"
+    else:
+        outcome = "draw"
+    return outcome, starter, moves, sent
+
+def run_batch(task):
+    """Juega un lote de partidas y devuelve los contadores agregados."""
+    games, bot1_name, bot2_name, seed = task
+    rng = random.Random(seed)
+    # GameRoom sortea el turno inicial con el módulo random global
+    random.seed(seed)
+    bot1, bot2 = BOTS[bot1_name], BOTS[bot2_name]
+    
+    stats = Counter()
+    for game_id in range(games):
+        outcome, starter, moves, sent = play_game(bot1, bot2, rng, game_id)
+        stats["games"] += 1
+        stats[outcome] += 1
+        stats["starter_won" if outcome == f"p{starter}" else "starter_not_won"] += 1
+        stats["moves"] += moves
+        stats["bytes"] += sent
+    return stats
+
+def simulate(total_games, batch_size=10000, workers=1, bot1="random", bot2="random", seed=0):
+    """
+    Ejecuta `total_games` partidas en lotes, opcionalmente en un pool de procesos.
+    
+    Returns:
+        tuple: (contadores agregados, segundos transcurridos)
+    """
+    tasks = []
+    remaining = total_games
+    batch_index = 0
+    while remaining > 0:
+        games = min(batch_size, remaining)
+        tasks.append((games, bot1, bot2, seed + batch_index))
+        remaining -= games
+        batch_index += 1
+    
+    stats = Counter()
+    start = time.perf_counter()
+    if workers > 1:
+        with Pool(workers) as pool:
+            for batch_stats in pool.imap_unordered(run_batch, tasks):
+                stats.update(batch_stats)
+    else:
+        for task in tasks:
+            stats.update(run_batch(task))
+    return stats, time.perf_counter() - start
+
+def print_report(stats, elapsed):
+    """Imprime el rendimiento y las estadísticas de resultados."""
+    games = stats["games"] or 1
+    print(f"Partidas: {stats['games']} en {elapsed:.2f} s ({stats['games'] / elapsed:,.0f} partidas/s)")
+    print(f"Movimientos: {stats['moves']} ({stats['moves'] / elapsed:,.0f} movimientos/s, "
+          f"{stats['moves'] / games:.2f} por partida)")
+    print(f"Bytes de protocolo generados: {stats['bytes']} ({stats['bytes'] / games:.0f} por partida)")
+    print(f"Gana jugador 1: {stats['p1'] / games:.2%}  Gana jugador 2: {stats['p2'] / games:.2%}  "
+          f"Empates: {stats['draw'] / games:.2%}")
+    print(f"Victorias del jugador que empieza: {stats['starter_won'] / games:.2%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Simulador masivo de partidas de Tic-Tac-Toe')
+    parser.add_argument('--games', type=int, default=100000, help='Número total de partidas')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Partidas por lote')
+    parser.add_argument('--workers', type=int, default=1, help='Procesos del pool (1 = sin pool)')
+    parser.add_argument('--bot1', choices=sorted(BOTS), default='random', help='Jugador automático 1')
+    parser.add_argument('--bot2', choices=sorted(BOTS), default='random', help='Jugador automático 2')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla base de los lotes')
+    parser.add_argument('--profile', action='store_true', help='Perfilar la simulación con cProfile (un solo proceso)')
+    args = parser.parse_args()
+    
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        stats, elapsed = simulate(args.games, args.batch_size, 1, args.bot1, args.bot2, args.seed)
+        profiler.disable()
+        print_report(stats, elapsed)
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(20)
+    else:
+        stats, elapsed = simulate(args.games, args.batch_size, args.workers, args.bot1, args.bot2, args.seed)
+        print_report(stats, elapsed)
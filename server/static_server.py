@@ -0,0 +1,214 @@
+"""
+Servidor HTTP de archivos estáticos para la interfaz web.
+Carga los archivos en memoria al iniciar, precomprime los recursos de texto
+y responde con ETag/Cache-Control atendiendo cada petición en su propio hilo.
+"""
+
+import os
+import sys
+import gzip
+import hashlib
+import mimetypes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Directorio web predeterminado
+DEFAULT_WEB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'web')
+
+# Tipos de contenido que vale la pena comprimir
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+# Cabeceras de caché: el HTML siempre se revalida, el resto se reutiliza unos minutos
+CACHE_HTML = "no-cache"
+CACHE_ASSET = "public, max-age=300"
+
+# Codificaciones comprimidas en orden de preferencia ante igual valor q
+ENCODINGS = ("br", "gzip")
+
+# Sufijo de la ETag de cada codificación
+ETAG_SUFFIXES = {"identity": "", "gzip": "-gz", "br": "-br"}
+
+def parse_accept_encoding(header):
+    """
+    Analiza Accept-Encoding en {codificación: q}, p. ej. "gzip, br;q=0" -> {"gzip": 1.0, "br": 0.0}.
+    Los tokens se comparan enteros y sin distinguir mayúsculas; un q no válido cuenta como 0.
+    """
+    weights = {}
+    for item in header.split(","):
+        token, _, params = item.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        weights[token] = q
+    return weights
+
+def etag_matches(if_none_match, etag):
+    """
+    Indica si If-None-Match incluye la ETag: admite listas separadas por comas, "*" y
+    validadores débiles (W/), que If-None-Match compara de forma débil (RFC 7232).
+    """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+class StaticAsset:
+    """Archivo cargado en memoria con sus variantes comprimidas."""
+    
+    __slots__ = ("content_type", "etags", "cache_control", "bodies")
+    
+    def __init__(self, path, data):
+        """Prepara las variantes del archivo (identidad, gzip y brotli si está disponible)."""
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        
+        self.content_type = content_type
+        self.cache_control = CACHE_HTML if path.endswith('.html') else CACHE_ASSET
+        self.bodies = {"identity": data}
+        
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            if BROTLI_AVAILABLE:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    self.bodies["br"] = compressed
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                self.bodies["gzip"] = compressed
+        
+        # ETag fuerte por representación: cada codificación es un cuerpo distinto y una
+        # caché no debe confundirlos (RFC 7232)
+        digest = hashlib.sha1(data).hexdigest()[:16]
+        self.etags = {encoding: f'"{digest}{ETAG_SUFFIXES[encoding]}"' for encoding in self.bodies}
+    
+    def select(self, accept_encoding):
+        """
+        Elige la variante con mayor q según la cabecera Accept-Encoding del cliente ("*" cubre
+        las no nombradas; q=0 las excluye). Sin ninguna aceptable se envía sin comprimir.
+        """
+        weights = parse_accept_encoding(accept_encoding)
+        default = weights.get("*", 0.0)
+        best, best_q = "identity", 0.0
+        for encoding in ENCODINGS:
+            q = weights.get(encoding, default)
+            if encoding in self.bodies and q > best_q:
+                best, best_q = encoding, q
+        return best, self.bodies[best]
+
+def load_assets(web_dir):
+    """Carga todos los archivos del directorio web, indexados por ruta URL."""
+    assets = {}
+    for root, _, files in os.walk(web_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            url_path = '/' + os.path.relpath(path, web_dir).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                assets[url_path] = StaticAsset(path, f.read())
+    
+    if '/index.html' in assets:
+        assets['/'] = assets['/index.html']
+    return assets
+
+class StaticRequestHandler(BaseHTTPRequestHandler):
+    """Atiende GET/HEAD desde los archivos precargados del servidor."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        """Responde a una petición GET."""
+        self._serve(send_body=True)
+    
+    def do_HEAD(self):
+        """Responde a una petición HEAD."""
+        self._serve(send_body=False)
+    
+    def _serve(self, send_body):
+        """Envía el recurso solicitado (o 304 si el cliente ya lo tiene)."""
+        path = self.path.split('?', 1)[0].split('#', 1)[0]
+        asset = self.server.assets.get(path)
+        
+        if asset is None:
+            body = b"No encontrado"
+            self.send_response(404)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+            return
+        
+        # La representación se elige antes de validar: la ETag depende de la codificación
+        encoding, body = asset.select(self.headers.get("Accept-Encoding", ""))
+        etag = asset.etags[encoding]
+        
+        if etag_matches(self.headers.get("If-None-Match", ""), etag):
+            self.send_response(304)
+            self._send_cache_headers(asset, etag)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self._send_cache_headers(asset, etag)
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        
+        if send_body:
+            self.wfile.write(body)
+    
+    def _send_cache_headers(self, asset, etag):
+        """Cabeceras de validación y caché, iguales en las respuestas 200 y 304."""
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", asset.cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+    
+    def log_message(self, format, *args):
+        """Registra las peticiones solo en modo detallado."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class StaticServer(ThreadingHTTPServer):
+    """Servidor HTTP concurrente que sirve la interfaz web desde memoria."""
+    
+    daemon_threads = True
+    
+    def __init__(self, port=8000, web_dir=DEFAULT_WEB_DIR, host='', verbose=False):
+        """Carga los archivos web y abre el puerto de escucha."""
+        self.assets = load_assets(os.path.abspath(web_dir))
+        self.verbose = verbose
+        super().__init__((host, port), StaticRequestHandler)
+
+if __name__ == "__main__":
+    # Obtener puerto y directorio de los argumentos o usar valores por defecto
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    web_dir = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_WEB_DIR
+    
+    server = StaticServer(port, web_dir)
+    print(f"Servidor HTTP de archivos estáticos en el puerto {port} ({len(server.assets)} recursos en memoria)")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Servidor HTTP detenido por el usuario")
+    finally:
+        server.server_close()
@@ -0,0 +1,416 @@
+"""
+Torneos: inscripción de jugadores, emparejamientos suizos o por eliminación directa,
+creación de salas por lotes y avance automático de rondas a partir de los resultados.
+"""
+
+import json
+import math
+import queue
+import threading
+import uuid
+from collections import deque
+
+from events import get_bus, GAME_ENDED
+
+# Modalidades de torneo
+MODE_SWISS = "swiss"
+MODE_KNOCKOUT = "knockout"
+
+# Estados del torneo
+STATE_REGISTERING = "REGISTERING"
+STATE_RUNNING = "RUNNING"
+STATE_FINISHED = "FINISHED"
+
+# Puntos por resultado (sistema suizo)
+POINTS_WIN = 1.0
+POINTS_DRAW = 0.5
+
+# Eliminación directa: un empate (lo normal entre buenos jugadores) se repite cambiando
+# quién empieza, hasta KNOCKOUT_REPLAYS veces; si persiste, decide el desempate del torneo
+KNOCKOUT_REPLAYS = 2
+
+# Desempates de la eliminación directa
+TIEBREAK_SEED = "seed"      # Pasa la mejor cabeza de serie (inscripción más temprana)
+TIEBREAK_SECOND = "second"  # Pasa quien no empezó la última partida (empezar es la ventaja)
+TIEBREAKS = (TIEBREAK_SEED, TIEBREAK_SECOND)
+
+class TournamentPlayer:
+    """Jugador inscrito en un torneo."""
+    
+    __slots__ = ("socket", "name", "seed", "score", "opponents", "had_bye", "eliminated", "withdrawn",
+                 "tiebreaks")
+    
+    def __init__(self, socket, name, seed):
+        """Inicializa el jugador con su orden de inscripción como cabeza de serie."""
+        self.socket = socket
+        self.name = name
+        self.seed = seed
+        self.score = 0.0
+        self.opponents = set()
+        self.had_bye = False
+        self.eliminated = False
+        self.withdrawn = False
+        self.tiebreaks = 0
+
+class Match:
+    """Partida de una ronda del torneo."""
+    
+    __slots__ = ("tournament", "round", "player1", "player2", "room_id", "winner", "starter", "replays")
+    
+    def __init__(self, tournament, round_number, player1, player2):
+        """Inicializa la partida sin resultado (el primer turno se sortea al crear la sala)."""
+        self.tournament = tournament
+        self.round = round_number
+        self.player1 = player1
+        self.player2 = player2
+        self.room_id = None
+        self.winner = None
+        self.starter = None
+        self.replays = 0
+
+class Tournament:
+    """Estado y reglas de emparejamiento de un torneo."""
+    
+    def __init__(self, tournament_id, name, mode, creator_socket, rounds=None, tiebreak=TIEBREAK_SEED):
+        """Crea un torneo en fase de inscripción."""
+        self.tournament_id = tournament_id
+        self.name = name
+        self.mode = mode
+        self.creator_socket = creator_socket
+        self.rounds = rounds
+        self.tiebreak = tiebreak
+        self.state = STATE_REGISTERING
+        self.round = 0
+        self.players = []
+        self.by_socket = {}
+        self.pending = set()
+    
+    def add_player(self, socket, name):
+        """Inscribe a un jugador. Devuelve False si ya está inscrito o el torneo comenzó."""
+        if self.state != STATE_REGISTERING or socket in self.by_socket:
+            return False
+        player = TournamentPlayer(socket, name, len(self.players))
+        self.players.append(player)
+        self.by_socket[socket] = player
+        return True
+    
+    def withdraw(self, socket):
+        """Retira a un jugador (desconexión): pierde las partidas que le queden."""
+        player = self.by_socket.get(socket)
+        if player:
+            player.withdrawn = True
+        return player
+    
+    def start(self):
+        """Cierra la inscripción y fija el número de rondas del sistema suizo."""
+        self.state = STATE_RUNNING
+        if self.mode == MODE_SWISS and not self.rounds:
+            self.rounds = max(1, math.ceil(math.log2(max(2, len(self.players)))))
+    
+    def next_round(self):
+        """
+        Genera los emparejamientos de la siguiente ronda.
+        
+        Returns:
+            list: partidas de la ronda (vacía si el torneo terminó)
+        """
+        if self.mode == MODE_KNOCKOUT:
+            active = [p for p in self.players if not p.eliminated]
+            if len(active) <= 1:
+                self.state = STATE_FINISHED
+                return []
+            matches = self._pair_knockout(active)
+        else:
+            if self.round >= self.rounds:
+                self.state = STATE_FINISHED
+                return []
+            active = [p for p in self.players if not p.withdrawn]
+            if len(active) < 2:
+                self.state = STATE_FINISHED
+                return []
+            matches = self._pair_swiss(active)
+        
+        self.round += 1
+        for match in matches:
+            match.round = self.round
+        self.pending = set(matches)
+        return matches
+    
+    def _pair_knockout(self, active):
+        """Empareja por orden de cabeza de serie; con número impar pasa directamente la mejor sin descanso previo."""
+        active.sort(key=lambda p: p.seed)
+        if len(active) % 2:
+            bye = next((p for p in active if not p.had_bye), active[0])
+            bye.had_bye = True
+            active.remove(bye)
+        return [Match(self, 0, active[i], active[i + 1]) for i in range(0, len(active), 2)]
+    
+    def _pair_swiss(self, active):
+        """Empareja por puntuación evitando repetir rivales; con número impar, descanso al último."""
+        active.sort(key=lambda p: (-p.score, p.seed))
+        if len(active) % 2:
+            bye = next((p for p in reversed(active) if not p.had_bye), active[-1])
+            bye.had_bye = True
+            bye.score += POINTS_WIN
+            active.remove(bye)
+        
+        matches = []
+        unpaired = deque(active)
+        while unpaired:
+            player = unpaired.popleft()
+            rival = next((p for p in unpaired if p not in player.opponents), unpaired[0])
+            unpaired.remove(rival)
+            matches.append(Match(self, 0, player, rival))
+        return matches
+    
+    def replay_draw(self, match, winner):
+        """
+        En eliminación directa, un empate se repite con el otro jugador empezando mientras
+        queden repeticiones. Devuelve True si la partida se repite (sigue pendiente).
+        """
+        if (self.mode != MODE_KNOCKOUT or winner != 0 or match not in self.pending
+                or match.replays >= KNOCKOUT_REPLAYS or match.player1.withdrawn or match.player2.withdrawn):
+            return False
+        match.replays += 1
+        if match.starter:
+            match.starter = 2 if match.starter == 1 else 1
+        return True
+    
+    def _tiebreak(self, match):
+        """Ganador (1 o 2) de una eliminatoria sin resultado según el desempate del torneo."""
+        p1, p2 = match.player1, match.player2
+        if self.tiebreak == TIEBREAK_SECOND and match.starter:
+            return 2 if match.starter == 1 else 1
+        return 1 if p1.seed < p2.seed else 2
+    
+    def record_result(self, match, winner):
+        """
+        Registra el resultado de una partida (0 empate, 1/2 ganador, None sin resultado).
+        
+        Returns:
+            bool: True si con este resultado se completó la ronda
+        """
+        if match not in self.pending:
+            return False
+        self.pending.discard(match)
+        
+        p1, p2 = match.player1, match.player2
+        p1.opponents.add(p2)
+        p2.opponents.add(p1)
+        
+        # Sin resultado (o empate tras las repeticiones en eliminación directa): decide la
+        # retirada y, si no, el desempate del torneo, que se cuenta en la clasificación
+        if winner is None or (winner == 0 and self.mode == MODE_KNOCKOUT):
+            if p1.withdrawn != p2.withdrawn:
+                winner = 2 if p1.withdrawn else 1
+            elif self.mode == MODE_KNOCKOUT:
+                winner = self._tiebreak(match)
+                (p1 if winner == 1 else p2).tiebreaks += 1
+            else:
+                winner = 0
+        match.winner = winner
+        
+        if winner == 0:
+            p1.score += POINTS_DRAW
+            p2.score += POINTS_DRAW
+        else:
+            winner_player, loser_player = (p1, p2) if winner == 1 else (p2, p1)
+            winner_player.score += POINTS_WIN
+            if self.mode == MODE_KNOCKOUT:
+                loser_player.eliminated = True
+        
+        return not self.pending
+    
+    def standings(self):
+        """Clasificación actual: lista de (nombre, puntos, eliminatorias ganadas por desempate) ordenada."""
+        ranked = sorted(self.players, key=lambda p: (p.eliminated, -p.score, p.seed))
+        return [(p.name, p.score, p.tiebreaks) for p in ranked]
+
+class TournamentManager:
+    """
+    Gestiona los torneos del servidor. Un único hilo procesa los resultados y crea
+    las salas de cada ronda por lotes, repartiendo en el tiempo la creación de hilos.
+    """
+    
+    def __init__(self, server, batch_size=100, batch_interval=0.05):
+        """Inicializa el gestor sin torneos."""
+        self.server = server
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        
+        self.tournaments = {}
+        self.lock = threading.Lock()
+        
+        # Eventos (resultados, arranques) y partidas pendientes de crear sala
+        self.events = queue.Queue()
+        self.pending_matches = deque()
+        self.running = False
+        
+        # Partidas en juego por código de sala; los resultados llegan por el bus de eventos
+        self.match_rooms = {}
+        self.match_lock = threading.Lock()
+        get_bus().subscribe(GAME_ENDED, self._on_game_ended)
+    
+    def start(self):
+        """Arranca el hilo del planificador."""
+        self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+    
+    def stop(self):
+        """Detiene el planificador."""
+        self.running = False
+    
+    def create(self, creator_socket, creator_name, name, mode, rounds=None, tiebreak=TIEBREAK_SEED):
+        """Crea un torneo e inscribe a su creador."""
+        if mode not in (MODE_SWISS, MODE_KNOCKOUT) or tiebreak not in TIEBREAKS:
+            return None
+        tournament = Tournament(uuid.uuid4().hex[:8], name, mode, creator_socket, rounds, tiebreak)
+        tournament.add_player(creator_socket, creator_name)
+        with self.lock:
+            self.tournaments[tournament.tournament_id] = tournament
+        return tournament
+    
+    def join(self, tournament_id, socket, name):
+        """Inscribe a un jugador en un torneo abierto."""
+        with self.lock:
+            tournament = self.tournaments.get(tournament_id)
+            if not tournament or not tournament.add_player(socket, name):
+                return None
+            return tournament
+    
+    def begin(self, tournament_id, socket):
+        """Inicia un torneo (solo su creador, con al menos dos jugadores)."""
+        with self.lock:
+            tournament = self.tournaments.get(tournament_id)
+            if (not tournament or tournament.creator_socket != socket
+                    or tournament.state != STATE_REGISTERING or len(tournament.players) < 2):
+                return None
+            tournament.start()
+        self.events.put(("round", tournament))
+        return tournament
+    
+    def list_open(self):
+        """Devuelve los torneos en inscripción."""
+        with self.lock:
+            return [
+                {"id": t.tournament_id, "name": t.name, "mode": t.mode, "players": len(t.players)}
+                for t in self.tournaments.values() if t.state == STATE_REGISTERING
+            ]
+    
+    def player_disconnected(self, socket):
+        """
+        Retira al jugador de los torneos en los que participe. Un torneo en inscripción
+        cuyo creador se desconecta ya no puede empezar y se descarta.
+        """
+        with self.lock:
+            for tournament in list(self.tournaments.values()):
+                if tournament.state == STATE_REGISTERING and tournament.creator_socket == socket:
+                    del self.tournaments[tournament.tournament_id]
+                elif tournament.state != STATE_FINISHED:
+                    tournament.withdraw(socket)
+    
+    def _on_game_ended(self, event):
+        """Encola el resultado si la partida terminada pertenece a un torneo."""
+        with self.match_lock:
+            match = self.match_rooms.pop(event.room_id, None)
+        if match is not None:
+            self.events.put(("result", match, event.data["winner"]))
+    
+    def _run(self):
+        """Bucle del planificador: espera eventos y crea salas por lotes."""
+        while self.running:
+            timeout = self.batch_interval if self.pending_matches else 0.5
+            try:
+                self._handle_event(self.events.get(timeout=timeout))
+            except queue.Empty:
+                pass
+            except Exception as e:
+                print(f"Error en el planificador de torneos: {e}")
+            self.step()
+    
+    def step(self):
+        """
+        Procesa sin esperar los eventos acumulados y crea el siguiente lote de salas
+        (los escenarios deterministas lo llaman en lugar de arrancar el hilo).
+        """
+        try:
+            while True:
+                self._handle_event(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        except Exception as e:
+            print(f"Error en el planificador de torneos: {e}")
+        
+        try:
+            self._start_batch()
+        except Exception as e:
+            print(f"Error al crear las salas del torneo: {e}")
+    
+    def _handle_event(self, event):
+        """Procesa un evento del planificador."""
+        kind = event[0]
+        if kind == "round":
+            self._schedule_round(event[1])
+        elif kind == "result":
+            _, match, winner = event
+            tournament = match.tournament
+            with self.lock:
+                replay = tournament.replay_draw(match, winner)
+                round_complete = not replay and tournament.record_result(match, winner)
+            if replay:
+                print(f"Torneo {tournament.name}: empate en la ronda {match.round}, "
+                      f"se repite ({match.replays}/{KNOCKOUT_REPLAYS})")
+                self.pending_matches.append(match)
+            elif round_complete:
+                self._schedule_round(tournament)
+    
+    def _schedule_round(self, tournament):
+        """Genera la siguiente ronda y encola sus partidas (o cierra el torneo)."""
+        with self.lock:
+            matches = tournament.next_round()
+            standings = tournament.standings()
+            players = list(tournament.players)
+            if not matches:
+                # Torneo terminado: la clasificación se envía ahora y no se vuelve a consultar
+                self.tournaments.pop(tournament.tournament_id, None)
+        
+        if not matches:
+            self._broadcast(players, "TOURNAMENT_END", tournament.tournament_id,
+                            json.dumps(standings, separators=(',', ':')))
+            print(f"Torneo {tournament.name} finalizado. Campeón: {standings[0][0]}")
+            return
+        
+        print(f"Torneo {tournament.name}: ronda {tournament.round} con {len(matches)} partidas")
+        self._broadcast(players, "TOURNAMENT_ROUND", tournament.tournament_id, tournament.round, len(matches))
+        
+        for match in matches:
+            # Un jugador retirado pierde sin llegar a crear sala
+            if match.player1.withdrawn or match.player2.withdrawn:
+                self.events.put(("result", match, None))
+            else:
+                self.pending_matches.append(match)
+    
+    def _start_batch(self):
+        """Crea hasta `batch_size` salas de las partidas pendientes."""
+        for _ in range(min(self.batch_size, len(self.pending_matches))):
+            match = self.pending_matches.popleft()
+            room_name = f"{match.tournament.name} R{match.round}"
+            # Registrar la sala antes de que el bus pueda entregar su resultado
+            with self.match_lock:
+                room = self.server.create_match_room(
+                    match.player1.socket, match.player1.name,
+                    match.player2.socket, match.player2.name,
+                    room_name, starter=match.starter
+                )
+                if room is not None:
+                    match.room_id = room.room_id
+                    match.starter = room.starting_turn
+                    self.match_rooms[room.room_id] = match
+            if room is None:
+                self.events.put(("result", match, None))
+    
+    def _broadcast(self, players, command, *args):
+        """Envía una notificación del torneo a los jugadores que siguen conectados."""
+        for player in players:
+            if not player.withdrawn:
+                self.server.send_message(player.socket, command, *args)
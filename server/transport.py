@@ -0,0 +1,228 @@
+"""
+Transportes de conexiones y relojes del servidor.
+
+El servidor acepta conexiones a través de un transporte: `TcpTransport` escucha en un
+puerto real y `MemoryTransport` entrega pares de sockets en memoria, sin pasar por el
+kernel. Las salas miden el tiempo con el reloj del proceso: `RealClock` en producción y
+`VirtualClock` para reproducir escenarios de forma determinista (el tiempo solo avanza
+cuando se pide).
+"""
+
+import errno
+import itertools
+import socket
+import threading
+import time
+from collections import deque
+
+class RealClock:
+    """Reloj del sistema."""
+    
+    def time(self):
+        """Instante actual en segundos."""
+        return time.time()
+    
+    def sleep(self, seconds):
+        """Bloquea el hilo durante los segundos indicados."""
+        time.sleep(seconds)
+
+class VirtualClock:
+    """Reloj simulado: el tiempo solo avanza con advance() (sleep() avanza sin bloquear)."""
+    
+    def __init__(self, start=0.0):
+        """Inicializa el reloj en el instante indicado."""
+        self.now = start
+        self.lock = threading.Lock()
+    
+    def time(self):
+        """Instante simulado en segundos."""
+        return self.now
+    
+    def sleep(self, seconds):
+        """Avanza el reloj en lugar de esperar."""
+        self.advance(seconds)
+    
+    def advance(self, seconds):
+        """Avanza el reloj los segundos indicados."""
+        with self.lock:
+            self.now += seconds
+
+_clock = RealClock()
+
+def get_clock():
+    """Devuelve el reloj del proceso."""
+    return _clock
+
+def set_clock(clock):
+    """Sustituye el reloj del proceso (las salas lo toman al crearse). Devuelve el anterior."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+class MemorySocket:
+    """Extremo de una conexión en memoria con la parte de la interfaz de socket que usa el servidor."""
+    
+    def __init__(self, address):
+        """Crea el extremo sin conectar."""
+        self.address = address
+        self.peer = None
+        self.inbox = bytearray()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.eof = False
+        self.timeout = None
+    
+    def sendall(self, data):
+        """Entrega los datos al otro extremo."""
+        if self.closed:
+            raise OSError(errno.EBADF, "Socket cerrado")
+        peer = self.peer
+        with peer.cond:
+            if peer.closed:
+                raise BrokenPipeError(errno.EPIPE, "Conexión cerrada por el otro extremo")
+            peer.inbox += data
+            peer.cond.notify()
+    
+    def send(self, data):
+        """Como sendall; devuelve los bytes enviados."""
+        self.sendall(data)
+        return len(data)
+    
+    def _wait(self):
+        """Espera a que haya datos o se cierre la conexión (requiere cond)."""
+        ready = self.cond.wait_for(lambda: self.inbox or self.eof or self.closed, self.timeout)
+        if not ready:
+            raise socket.timeout("timed out")
+        if self.closed:
+            raise OSError(errno.EBADF, "Socket cerrado")
+    
+    def recv_into(self, buffer, nbytes=0):
+        """Copia en el búfer los datos recibidos. 0 si el otro extremo cerró."""
+        with self.cond:
+            self._wait()
+            size = min(len(self.inbox), nbytes or len(buffer))
+            buffer[:size] = self.inbox[:size]
+            del self.inbox[:size]
+            return size
+    
+    def recv(self, bufsize):
+        """Devuelve los datos recibidos. b'' si el otro extremo cerró."""
+        with self.cond:
+            self._wait()
+            data = bytes(self.inbox[:bufsize])
+            del self.inbox[:bufsize]
+            return data
+    
+    def read_available(self):
+        """Devuelve sin bloquear todos los datos recibidos hasta ahora."""
+        with self.cond:
+            data = bytes(self.inbox)
+            self.inbox.clear()
+            return data
+    
+    def close(self):
+        """Cierra este extremo; el otro recibe fin de conexión."""
+        with self.cond:
+            if self.closed:
+                return
+            self.closed = True
+            self.cond.notify_all()
+        peer = self.peer
+        with peer.cond:
+            peer.eof = True
+            peer.cond.notify_all()
+    
+    def settimeout(self, timeout):
+        """Tiempo máximo de espera de recv (None = sin límite)."""
+        self.timeout = timeout
+    
+    def setsockopt(self, *args):
+        """Sin efecto en memoria."""
+    
+    def fileno(self):
+        """Un socket en memoria no tiene descriptor."""
+        return -1
+    
+    def getpeername(self):
+        """Dirección del otro extremo."""
+        return self.peer.address
+
+def socket_pair(client_address=("memory", 0), server_address=("memory", 0)):
+    """Crea dos extremos conectados: (cliente, servidor)."""
+    client, server = MemorySocket(client_address), MemorySocket(server_address)
+    client.peer, server.peer = server, client
+    return client, server
+
+class TcpTransport:
+    """Transporte TCP: escucha en un puerto real."""
+    
+    def __init__(self, host, port):
+        """Prepara el transporte sin abrir el puerto."""
+        self.host = host
+        self.port = port
+        self.listener = None
+    
+    def listen(self):
+        """Abre el puerto de escucha."""
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((self.host, self.port))
+        # Cola de conexiones amplia: con ráfagas de conexiones una cola corta pierde SYN
+        # y el cliente espera un segundo al reintento
+        self.listener.listen(socket.SOMAXCONN)
+    
+    def accept(self):
+        """Espera una conexión. Devuelve (socket, dirección)."""
+        client_socket, address = self.listener.accept()
+        # Sin algoritmo de Nagle: el servidor envía mensajes cortos seguidos a clientes que no
+        # responden (el rival recibe DELTA tras DELTA) y cada uno esperaría el ACK retardado
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return client_socket, address
+    
+    def close(self):
+        """Cierra el puerto de escucha (accept termina con OSError)."""
+        if self.listener:
+            try:
+                self.listener.close()
+            except OSError:
+                pass
+
+class MemoryTransport:
+    """Transporte en memoria: connect() crea un par de sockets y accept() entrega el extremo del servidor."""
+    
+    def __init__(self):
+        """Inicializa el transporte sin conexiones pendientes."""
+        self.pending = deque()
+        self.cond = threading.Condition()
+        self.ports = itertools.count(1)
+        self.closed = False
+    
+    def listen(self):
+        """Empieza a aceptar conexiones."""
+        with self.cond:
+            self.closed = False
+    
+    def connect(self):
+        """Abre una conexión con el servidor y devuelve el extremo del cliente."""
+        client, server = socket_pair(("memory", next(self.ports)), ("memory", 0))
+        with self.cond:
+            if self.closed:
+                raise ConnectionRefusedError(errno.ECONNREFUSED, "Transporte cerrado")
+            self.pending.append(server)
+            self.cond.notify()
+        return client
+    
+    def accept(self):
+        """Espera una conexión. Devuelve (socket, dirección)."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.pending or self.closed)
+            if not self.pending:
+                raise OSError(errno.EBADF, "Transporte cerrado")
+            server = self.pending.popleft()
+        return server, server.getpeername()
+    
+    def close(self):
+        """Deja de aceptar conexiones (accept termina con OSError)."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
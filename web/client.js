@@ -8,8 +8,27 @@ let currentRoom = null;
 let mySymbol = '';
 let isMyTurn = false;
 let gameBoard = Array(9).fill(' ');
+
+// Jugadas optimistas: último tablero confirmado por el servidor, su número de
+// movimientos y la jugada propia pendiente de confirmación ({position, seq})
+let confirmedBoard = Array(9).fill(' ');
+let moveSeq = 0;
+let pendingMove = null;
+
+// Códigos de rechazo (ERROR|mensaje|código) que no responden a un movimiento; cualquier
+// otro código con una jugada pendiente la deshace, así un código nuevo no la deja bloqueada
+const NON_MOVE_REJECTIONS = ['CHAT_RATE', 'NO_REMATCH'];
+// Rechazos por la casilla elegida: el turno sigue siendo del jugador
+const POSITION_REJECTIONS = ['OUT_OF_RANGE', 'OCCUPIED', 'BAD_POSITION'];
 let reconnectAttempts = 0;
 let maxReconnectAttempts = 5;
+let myTournamentId = null;
+
+// Código de sala recibido en un enlace de invitación (?room=CÓDIGO)
+let pendingInviteCode = new URLSearchParams(window.location.search).get('room');
+
+// Mensajes de chat que se conservan en pantalla
+const MAX_CHAT_MESSAGES = 50;
 
 // Estado actual del juego
 const GameState = {
@@ -38,6 +57,10 @@ const elements = {
     refreshRoomsBtn: document.getElementById('refreshRoomsBtn'),
     roomList: document.getElementById('roomList'),
     currentRoomName: document.getElementById('currentRoomName'),
+    currentRoomCode: document.getElementById('currentRoomCode'),
+    inviteBtn: document.getElementById('inviteBtn'),
+    roomCodeInput: document.getElementById('roomCode'),
+    joinCodeBtn: document.getElementById('joinCodeBtn'),
     gameStatus: document.getElementById('gameStatus'),
     player1: document.getElementById('player1'),
     player2: document.getElementById('player2'),
@@ -45,7 +68,18 @@ const elements = {
     board: document.getElementById('board'),
     boardCells: document.querySelectorAll('.board-cell'),
     leaveGameBtn: document.getElementById('leaveGameBtn'),
+    hintBtn: document.getElementById('hintBtn'),
+    chatMessages: document.getElementById('chatMessages'),
+    chatInput: document.getElementById('chatInput'),
+    sendChatBtn: document.getElementById('sendChatBtn'),
+    tournamentNameInput: document.getElementById('tournamentName'),
+    tournamentModeSelect: document.getElementById('tournamentMode'),
+    createTournamentBtn: document.getElementById('createTournamentBtn'),
+    startTournamentBtn: document.getElementById('startTournamentBtn'),
+    refreshTournamentsBtn: document.getElementById('refreshTournamentsBtn'),
+    tournamentList: document.getElementById('tournamentList'),
     endMessage: document.getElementById('endMessage'),
+    rematchBtn: document.getElementById('rematchBtn'),
     backToMenuBtn: document.getElementById('backToMenuBtn'),
     notifications: document.getElementById('notifications')
 };
@@ -58,8 +92,16 @@ function init() {
     elements.connectBtn.addEventListener('click', connectToServer);
     elements.createRoomBtn.addEventListener('click', createRoom);
     elements.refreshRoomsBtn.addEventListener('click', requestRoomList);
+    elements.joinCodeBtn.addEventListener('click', joinRoomByCode);
+    elements.inviteBtn.addEventListener('click', copyInviteLink);
     elements.leaveGameBtn.addEventListener('click', leaveGame);
-    elements.backToMenuBtn.addEventListener('click', backToMenu);
+    elements.hintBtn.addEventListener('click', requestHint);
+    elements.sendChatBtn.addEventListener('click', sendChat);
+    elements.createTournamentBtn.addEventListener('click', createTournament);
+    elements.startTournamentBtn.addEventListener('click', startTournament);
+    elements.refreshTournamentsBtn.addEventListener('click', requestTournamentList);
+    elements.rematchBtn.addEventListener('click', requestRematch);
+    elements.backToMenuBtn.addEventListener('click', leaveEndScreen);
     
     // Configurar eventos de las celdas del tablero
     elements.boardCells.forEach(cell => {
@@ -73,6 +115,25 @@ function init() {
         }
     });
 
+    // Permitir usar Enter para enviar mensajes de chat
+    elements.chatInput.addEventListener('keyup', (event) => {
+        if (event.key === 'Enter') {
+            sendChat();
+        }
+    });
+
+    // Permitir usar Enter para unirse con código
+    elements.roomCodeInput.addEventListener('keyup', (event) => {
+        if (event.key === 'Enter') {
+            joinRoomByCode();
+        }
+    });
+
+    // Rellenar el código de un enlace de invitación
+    if (pendingInviteCode) {
+        elements.roomCodeInput.value = pendingInviteCode;
+    }
+
     // Permitir usar Enter para crear sala
     elements.roomNameInput.addEventListener('keyup', (event) => {
         if (event.key === 'Enter') {
@@ -121,14 +182,30 @@ function connectToServer() {
             // Enviar nombre de jugador como primer mensaje
             socket.send(playerName);
             
+            // Si estábamos en una partida (p. ej. reinicio del servidor), intentar reanudarla
+            // con el token secreto de nuestro puesto
+            if (currentRoom && currentRoom.token &&
+                (currentState === GameState.PLAYING || currentState === GameState.WAITING)) {
+                socket.send(`RESUME|${currentRoom.id}|${currentRoom.token}`);
+                showNotification('Reconectado. Reanudando partida...', 'info');
+                return;
+            }
+            
             // Cambiar a la pantalla de menú
             currentState = GameState.MENU;
             showScreen('menu');
             
-            // Solicitar lista de salas
+            // Solicitar listas de salas y torneos
             requestRoomList();
+            requestTournamentList();
             
             showNotification('Conexión establecida', 'success');
+            
+            // Entrar directamente en la sala de un enlace de invitación
+            if (pendingInviteCode) {
+                joinRoom(pendingInviteCode);
+                pendingInviteCode = null;
+            }
         };
         
         socket.onmessage = (event) => {
@@ -190,6 +267,10 @@ function handleMessage(event) {
                 handleGameUpdate(args);
                 break;
                 
+            case 'DELTA':
+                handleGameDelta(args);
+                break;
+                
             case 'END':
                 handleGameEnd(args);
                 break;
@@ -210,6 +291,42 @@ function handleMessage(event) {
                 handleRoomClosed(args);
                 break;
                 
+            case 'RESUME':
+                handleResumeResponse(args);
+                break;
+                
+            case 'HINT':
+                handleHint(args);
+                break;
+                
+            case 'REMATCH':
+                handleRematch(args);
+                break;
+                
+            case 'CHAT':
+                handleChat(args);
+                break;
+                
+            case 'TOURNAMENT_CREATE':
+                handleTournamentCreated(args);
+                break;
+                
+            case 'TOURNAMENT_JOIN':
+                handleTournamentJoined(args);
+                break;
+                
+            case 'TOURNAMENT_LIST':
+                handleTournamentList(args);
+                break;
+                
+            case 'TOURNAMENT_ROUND':
+                handleTournamentRound(args);
+                break;
+                
+            case 'TOURNAMENT_END':
+                handleTournamentEnd(args);
+                break;
+                
             default:
                 console.warn('Comando desconocido:', command);
         }
@@ -227,15 +344,20 @@ function handleCreateResponse(args) {
     const roomId = args[0];
     const roomName = args[1];
     
+    // El token de reanudación identifica nuestro puesto tras un reinicio del servidor
     currentRoom = {
         id: roomId,
-        name: roomName
+        name: roomName,
+        token: args[2] || null
     };
+    resetMoveState();
     
     // Cambiar a modo de espera
     currentState = GameState.WAITING;
     elements.currentRoomName.textContent = roomName;
-    elements.gameStatus.innerHTML = '<p>Esperando a otro jugador...</p>';
+    elements.currentRoomCode.textContent = roomId;
+    elements.gameStatus.innerHTML = `<p>Esperando a otro jugador... Comparte el código ${roomId}</p>`;
+    elements.chatMessages.innerHTML = '';
     
     showScreen('game');
     showNotification(`Sala "${roomName}" creada correctamente`, 'success');
@@ -250,15 +372,38 @@ function handleJoinResponse(args) {
     
     currentRoom = {
         id: roomId,
-        name: roomName
+        name: roomName,
+        token: args[2] || null
     };
+    resetMoveState();
     
-    // Preparar pantalla de juego
+    // Preparar pantalla de juego (el servidor reenvía el historial del chat)
     elements.currentRoomName.textContent = roomName;
+    elements.currentRoomCode.textContent = roomId;
+    elements.chatMessages.innerHTML = '';
     showScreen('game');
     showNotification(`Te has unido a la sala "${roomName}"`, 'success');
 }
 
+// Manejar respuesta a la reanudación de una partida
+function handleResumeResponse(args) {
+    if (args.length < 2) return;
+    
+    // El token no cambia al reanudar
+    currentRoom = {
+        id: args[0],
+        name: args[1],
+        token: currentRoom ? currentRoom.token : null
+    };
+    resetMoveState();
+    
+    elements.currentRoomName.textContent = currentRoom.name;
+    elements.currentRoomCode.textContent = currentRoom.id;
+    elements.chatMessages.innerHTML = '';
+    showScreen('game');
+    showNotification(`Partida reanudada en "${currentRoom.name}"`, 'success');
+}
+
 // Manejar actualizaciones del estado del juego
 function handleGameUpdate(args) {
     if (args.length < 4) return;
@@ -267,25 +412,37 @@ function handleGameUpdate(args) {
     const boardState = args[1];
     const isTurn = args[2] === 'True';
     const opponentName = args[3];
+    const seq = parseInt(args[4], 10) || 0;
+    
+    // El servidor indica nuestro símbolo (con la revancha cambia quién empieza, no el símbolo)
+    if (args[5]) {
+        mySymbol = args[5];
+    }
+    
+    // Token de reanudación de nuestro puesto
+    if (args[6] && currentRoom) {
+        currentRoom.token = args[6];
+    }
+    
+    // Revancha aceptada: la sala reinicia la partida y volvemos al tablero
+    if (status === 'PLAYING' && currentState === GameState.ENDED) {
+        showScreen('game');
+        showNotification('¡Comienza la revancha!', 'success');
+    }
     
     // Actualizar estado del juego
     currentState = status === 'WAITING' ? GameState.WAITING : GameState.PLAYING;
     isMyTurn = isTurn;
     
-    // Actualizar tablero
-    updateBoard(boardState);
+    // Actualizar tablero confirmado y reconciliar la jugada pendiente
+    confirmedBoard = boardState.split(',');
+    moveSeq = seq;
+    renderConfirmedBoard(status);
     
     // Actualizar información de jugadores
     if (status !== 'WAITING') {
         elements.player1.querySelector('.player-name').textContent = playerName;
         elements.player2.querySelector('.player-name').textContent = opponentName;
-        
-        // Determinar mi símbolo
-        if (!mySymbol) {
-            // Si no tengo símbolo asignado, asumo X para el primer jugador
-            // esto es una simplificación, idealmente el servidor debería informarlo
-            mySymbol = isMyTurn ? 'X' : 'O';
-        }
     }
     
     // Actualizar indicador de turno
@@ -295,6 +452,135 @@ function handleGameUpdate(args) {
     updateGameStatus(status);
 }
 
+// Manejar el cambio de un movimiento: DELTA|secuencia|casilla|símbolo|turno|estado
+function handleGameDelta(args) {
+    if (args.length < 5) return;
+    
+    const seq = parseInt(args[0], 10);
+    const position = parseInt(args[1], 10);
+    const status = args[4];
+    
+    // Cambio ya aplicado (p. ej. incluido en un UPDATE completo)
+    if (seq <= moveSeq) return;
+    
+    // Falta algún cambio intermedio: pedir el estado completo
+    if (seq !== moveSeq + 1) {
+        requestSync();
+        return;
+    }
+    
+    confirmedBoard[position] = args[2];
+    moveSeq = seq;
+    isMyTurn = args[3] === 'True';
+    renderConfirmedBoard(status);
+    
+    updateTurnIndicator();
+    updateGameStatus(status);
+}
+
+// Dibujar el último tablero confirmado, con la jugada propia pendiente si aún no está incluida
+function renderConfirmedBoard(status) {
+    if (pendingMove && (moveSeq >= pendingMove.seq || status !== 'PLAYING')) {
+        pendingMove = null;
+    }
+    
+    if (pendingMove) {
+        const board = confirmedBoard.slice();
+        board[pendingMove.position] = mySymbol;
+        isMyTurn = false;
+        updateBoard(board.join(','));
+    } else {
+        updateBoard(confirmedBoard.join(','));
+    }
+}
+
+// Pedir al servidor el estado completo de la partida
+function requestSync() {
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send('SYNC');
+    }
+}
+
+// Manejar una sugerencia de jugada
+function handleHint(args) {
+    if (args.length < 3) return;
+    
+    const bestMove = parseInt(args[0], 10);
+    const expected = args[2];
+    
+    const outcomes = {
+        WIN: 'puedes ganar',
+        LOSS: 'el oponente puede ganar',
+        DRAW: 'empate con juego perfecto'
+    };
+    
+    // Resaltar la casilla sugerida durante unos segundos
+    const cell = elements.boardCells[bestMove];
+    if (cell) {
+        cell.classList.add('hint');
+        setTimeout(() => cell.classList.remove('hint'), 2000);
+    }
+    
+    showNotification(`Sugerencia: casilla ${bestMove + 1} (${outcomes[expected] || expected})`, 'info');
+}
+
+// Manejar la creación de un torneo propio
+function handleTournamentCreated(args) {
+    if (args.length < 2) return;
+    
+    myTournamentId = args[0];
+    elements.startTournamentBtn.classList.remove('hidden');
+    showNotification(`Torneo "${args[1]}" creado. Inícialo cuando se inscriban los jugadores.`, 'success');
+}
+
+// Manejar la inscripción en un torneo
+function handleTournamentJoined(args) {
+    if (args.length < 3) return;
+    
+    showNotification(`Inscrito en el torneo "${args[1]}" (${args[2]} jugadores)`, 'success');
+    requestTournamentList();
+}
+
+// Manejar lista de torneos abiertos
+function handleTournamentList(args) {
+    if (args.length < 1) return;
+    
+    try {
+        const tournaments = JSON.parse(args.join('|'));
+        displayTournamentList(tournaments);
+    } catch (error) {
+        console.error('Error al procesar lista de torneos:', error);
+    }
+}
+
+// Manejar el inicio de una ronda del torneo
+function handleTournamentRound(args) {
+    if (args.length < 2) return;
+    
+    if (args[0] === myTournamentId) {
+        elements.startTournamentBtn.classList.add('hidden');
+    }
+    showNotification(`Torneo: comienza la ronda ${args[1]}`, 'info');
+}
+
+// Manejar el fin del torneo con la clasificación final
+function handleTournamentEnd(args) {
+    if (args.length < 2) return;
+    
+    try {
+        const standings = JSON.parse(args.slice(1).join('|'));
+        const champion = standings.length > 0 ? standings[0][0] : '-';
+        showNotification(`Torneo finalizado. Campeón: ${champion}`, 'success');
+    } catch (error) {
+        console.error('Error al procesar la clasificación del torneo:', error);
+    }
+    
+    if (args[0] === myTournamentId) {
+        myTournamentId = null;
+        elements.startTournamentBtn.classList.add('hidden');
+    }
+}
+
 // Manejar fin del juego
 function handleGameEnd(args) {
     if (args.length < 1) return;
@@ -303,15 +589,59 @@ function handleGameEnd(args) {
     elements.endMessage.textContent = endMessage;
     
     currentState = GameState.ENDED;
+    elements.rematchBtn.textContent = 'Revancha';
+    elements.rematchBtn.disabled = false;
     showScreen('end');
 }
 
+// Manejar un mensaje de chat de la sala
+function handleChat(args) {
+    if (args.length < 2) return;
+    
+    const entry = document.createElement('div');
+    const author = document.createElement('span');
+    author.className = 'chat-author';
+    author.textContent = `${args[0]}:`;
+    entry.appendChild(author);
+    entry.appendChild(document.createTextNode(args.slice(1).join('|')));
+    elements.chatMessages.appendChild(entry);
+    
+    // Conservar solo los mensajes más recientes
+    while (elements.chatMessages.children.length > MAX_CHAT_MESSAGES) {
+        elements.chatMessages.firstChild.remove();
+    }
+    elements.chatMessages.scrollTop = elements.chatMessages.scrollHeight;
+}
+
+// Manejar el estado de una petición de revancha
+function handleRematch(args) {
+    if (args.length < 1) return;
+    
+    if (args[0] === 'PENDING') {
+        elements.rematchBtn.disabled = true;
+        showNotification('Esperando a que el oponente acepte la revancha', 'info');
+    } else if (args[0] === 'OFFERED') {
+        elements.rematchBtn.textContent = 'Aceptar Revancha';
+        showNotification(`${args[1] || 'El oponente'} quiere la revancha`, 'info');
+    }
+}
+
 // Manejar errores
 function handleError(args) {
     if (args.length < 1) return;
     
     const errorMessage = args[0];
     showNotification(errorMessage, 'error');
+    
+    // Movimiento rechazado: deshacer la jugada optimista
+    if (pendingMove && args[1] && !NON_MOVE_REJECTIONS.includes(args[1])) {
+        rollbackMove(args[1]);
+    }
+    
+    // Si no se pudo reanudar la partida, volver al menú
+    if (errorMessage === 'No se pudo reanudar la partida') {
+        backToMenu();
+    }
 }
 
 // Manejar lista de salas
@@ -366,25 +696,57 @@ function displayRoomList(rooms) {
         return;
     }
     
-    // Agregar cada sala a la lista
-    rooms.forEach(room => {
-        const roomItem = document.createElement('div');
-        roomItem.className = 'room-item';
-        
-        roomItem.innerHTML = `
-            <div class="room-info">
-                <span class="room-name">${room.name}</span>
-                <span class="room-creator">Creada por: ${room.creator}</span>
-            </div>
-            <button class="btn accent-btn join-btn">Unirse</button>
-        `;
-        
-        // Agregar evento para unirse a la sala
-        roomItem.querySelector('.join-btn').addEventListener('click', () => {
-            joinRoom(room.id);
-        });
-        
-        roomList.appendChild(roomItem);
+    // Agregar cada sala a la lista (cada sala es [código, nombre, creador])
+    rooms.forEach(([code, name, creator]) => {
+        roomList.appendChild(createListItem(`${name} (${code})`, `Creada por: ${creator}`, 'Unirse',
+                                            () => joinRoom(code)));
+    });
+}
+
+// Crear una fila de lista (sala o torneo). Los textos vienen de otros jugadores:
+// se asignan con textContent, nunca como HTML
+function createListItem(title, subtitle, buttonLabel, onClick) {
+    const item = document.createElement('div');
+    item.className = 'room-item';
+    
+    const info = document.createElement('div');
+    info.className = 'room-info';
+    
+    const titleSpan = document.createElement('span');
+    titleSpan.className = 'room-name';
+    titleSpan.textContent = title;
+    
+    const subtitleSpan = document.createElement('span');
+    subtitleSpan.className = 'room-creator';
+    subtitleSpan.textContent = subtitle;
+    
+    info.append(titleSpan, subtitleSpan);
+    
+    const button = document.createElement('button');
+    button.className = 'btn accent-btn join-btn';
+    button.textContent = buttonLabel;
+    button.addEventListener('click', onClick);
+    
+    item.append(info, button);
+    return item;
+}
+
+// Mostrar lista de torneos abiertos
+function displayTournamentList(tournaments) {
+    const list = elements.tournamentList;
+    list.innerHTML = '';
+    
+    if (tournaments.length === 0) {
+        list.innerHTML = '<p class="no-rooms">No hay torneos abiertos.</p>';
+        return;
+    }
+    
+    const modes = { swiss: 'Suizo', knockout: 'Eliminación' };
+    
+    tournaments.forEach(tournament => {
+        const mode = modes[tournament.mode] || tournament.mode;
+        list.appendChild(createListItem(tournament.name, `${mode} · ${tournament.players} jugadores`,
+                                        'Inscribirse', () => joinTournament(tournament.id)));
     });
 }
 
@@ -482,6 +844,32 @@ function joinRoom(roomId) {
     }
 }
 
+// Unirse a una sala escribiendo su código
+function joinRoomByCode() {
+    const code = elements.roomCodeInput.value.trim().toUpperCase();
+    if (!code) {
+        showNotification('Ingresa el código de la sala', 'error');
+        return;
+    }
+    
+    joinRoom(code);
+    elements.roomCodeInput.value = '';
+}
+
+// Copiar el enlace de invitación de la sala actual
+function copyInviteLink() {
+    if (!currentRoom) return;
+    
+    const link = `${window.location.origin}${window.location.pathname}?room=${currentRoom.id}`;
+    if (navigator.clipboard) {
+        navigator.clipboard.writeText(link)
+            .then(() => showNotification('Enlace de invitación copiado', 'success'))
+            .catch(() => showNotification(`Invitación: ${link}`, 'info'));
+    } else {
+        showNotification(`Invitación: ${link}`, 'info');
+    }
+}
+
 // Solicitar lista de salas disponibles
 function requestRoomList() {
     if (socket && socket.readyState === WebSocket.OPEN) {
@@ -503,9 +891,115 @@ function makeMove(cell) {
         return;
     }
     
-    // Enviar movimiento al servidor
+    // Solo una jugada en vuelo: el turno pasa al oponente hasta la confirmación
+    if (pendingMove || !socket || socket.readyState !== WebSocket.OPEN) {
+        return;
+    }
+    
+    // Aplicar la jugada localmente sin esperar al servidor
+    pendingMove = { position: Number(position), seq: moveSeq + 1 };
+    gameBoard[position] = mySymbol;
+    isMyTurn = false;
+    updateBoard(gameBoard.join(','));
+    updateTurnIndicator();
+    updateGameStatus('PLAYING');
+    
+    socket.send(`MOVE|${position}`);
+}
+
+// Deshacer la jugada pendiente volviendo al último tablero confirmado
+function rollbackMove(reason) {
+    pendingMove = null;
+    updateBoard(confirmedBoard.join(','));
+    
+    if (POSITION_REJECTIONS.includes(reason)) {
+        isMyTurn = true;
+    }
+    updateTurnIndicator();
+    if (currentState === GameState.PLAYING) {
+        updateGameStatus('PLAYING');
+    }
+}
+
+// Olvidar el estado de la partida anterior al entrar en otra sala
+function resetMoveState() {
+    confirmedBoard = Array(9).fill(' ');
+    moveSeq = 0;
+    pendingMove = null;
+    mySymbol = '';
+}
+
+// Pedir una sugerencia de jugada al servidor
+function requestHint() {
+    if (currentState !== GameState.PLAYING || !isMyTurn) {
+        showNotification('Solo puedes pedir una sugerencia en tu turno', 'error');
+        return;
+    }
+    
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send('HINT');
+    }
+}
+
+// Crear un torneo
+function createTournament() {
+    const name = elements.tournamentNameInput.value.trim();
+    
+    if (!name) {
+        showNotification('Ingresa un nombre para el torneo', 'error');
+        return;
+    }
+    
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(`TOURNAMENT_CREATE|${name}|${elements.tournamentModeSelect.value}`);
+    }
+}
+
+// Inscribirse en un torneo
+function joinTournament(tournamentId) {
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(`TOURNAMENT_JOIN|${tournamentId}`);
+    }
+}
+
+// Iniciar el torneo propio
+function startTournament() {
+    if (myTournamentId && socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(`TOURNAMENT_START|${myTournamentId}`);
+    }
+}
+
+// Solicitar lista de torneos abiertos
+function requestTournamentList() {
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send('TOURNAMENT_LIST');
+    }
+}
+
+// Enviar un mensaje de chat a la sala
+function sendChat() {
+    const text = elements.chatInput.value.replace(/[|\n]/g, ' ').trim();
+    if (!text) return;
+    
     if (socket && socket.readyState === WebSocket.OPEN) {
-        socket.send(`MOVE|${position}`);
+        socket.send(`CHAT|${text}`);
+        elements.chatInput.value = '';
+    }
+}
+
+// Pedir la revancha en la misma sala
+function requestRematch() {
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send('REMATCH');
+    }
+}
+
+// Salir de la pantalla de fin: abandona la sala (si sigue abierta) y vuelve al menú
+function leaveEndScreen() {
+    if (currentRoom && socket && socket.readyState === WebSocket.OPEN) {
+        socket.send('LEAVE');
+    } else {
+        backToMenu();
     }
 }
 
@@ -520,6 +1014,7 @@ function leaveGame() {
 function backToMenu() {
     currentRoom = null;
     currentState = GameState.MENU;
+    resetMoveState();
     
     // Limpiar tablero
     gameBoard = Array(9).fill(' ');